@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from django.contrib.auth.models import Group, Permission
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+        from . import checks  # noqa: F401
+        from .jwt import on_user_deleted, on_user_groups_changed, on_user_saved
+        from .models import User
+        from .roles import on_matrix_changed, on_memberships_changed
+
+        post_save.connect(on_user_saved, sender=User, dispatch_uid='auth_user_cache_save')
+        post_delete.connect(on_user_deleted, sender=User, dispatch_uid='auth_user_cache_delete')
+        m2m_changed.connect(on_user_groups_changed, sender=User.groups.through, dispatch_uid='auth_user_cache_groups')
+
+        for model in (Group, Permission):
+            post_save.connect(on_matrix_changed, sender=model, dispatch_uid=f'permission_registry_save_{model.__name__}')
+            post_delete.connect(on_matrix_changed, sender=model, dispatch_uid=f'permission_registry_delete_{model.__name__}')
+        m2m_changed.connect(on_matrix_changed, sender=Group.permissions.through, dispatch_uid='permission_registry_grants')
+        for through in (User.groups.through, User.user_permissions.through):
+            m2m_changed.connect(on_memberships_changed, sender=through, dispatch_uid=f'permission_registry_{through.__name__}')
@@ -0,0 +1,17 @@
+from django.contrib.auth.backends import ModelBackend
+
+from .roles import permission_registry
+
+
+class RegistryPermissionBackend(ModelBackend):
+    """ModelBackend answering permission checks from the permission registry's bitsets"""
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return permission_registry.permission_names(user_obj)
+
+    def has_perm(self, user_obj, perm, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return False
+        return permission_registry.has_perm(user_obj, perm)
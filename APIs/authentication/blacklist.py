@@ -0,0 +1,164 @@
+"""
+Revoked-token store that answers most lookups from memory.
+
+The shared cache (Redis in production) is authoritative: one key per
+revoked jti, expiring with the token, plus a numbered revocation log that
+workers replay. Each worker mirrors the log into Bloom filters bucketed by
+token expiry, so checking a token that was never revoked (nearly all of
+them) is a few bit tests. A Bloom hit is confirmed against the shared key,
+which also absorbs false positives. Tokens revoked by this worker are also
+kept in an exact set per bucket and answered from it alone, so they stay
+revoked even if the cache evicts their key. Buckets whose tokens have all
+expired are dropped, so nothing grows without bound.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+BLACKLIST_DEFAULTS = {
+    # Revocations made by other workers are picked up within this many seconds
+    'SYNC_INTERVAL': 1.0,
+    'BUCKET_SECONDS': 3600,
+    'BUCKET_CAPACITY': 10000,
+    'ERROR_RATE': 0.001,
+}
+
+SEQUENCE_KEY = 'auth:blacklist:seq'
+SYNC_BATCH = 1000
+
+
+def blacklist_setting(name: str):
+    return getattr(settings, 'TOKEN_BLACKLIST', {}).get(name, BLACKLIST_DEFAULTS[name])
+
+
+def _jti_key(jti: str) -> str:
+    return f'auth:blacklist:jti:{jti}'
+
+
+def _log_key(sequence: int) -> str:
+    return f'auth:blacklist:log:{sequence}'
+
+
+def _leeway_seconds() -> float:
+    leeway = api_settings.LEEWAY
+    return leeway.total_seconds() if isinstance(leeway, timedelta) else float(leeway)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, sized for capacity at error_rate"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenBlacklist:
+    def __init__(self):
+        self._buckets: Dict[int, BloomFilter] = {}
+        # jtis this worker revoked, by bucket; authoritative for them
+        self._revoked: Dict[int, Set[str]] = {}
+        self._sequence = 0
+        # Log entries numbered but not yet written when last read; retried once
+        self._pending: Set[int] = set()
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+
+    def _bucket(self, exp: int) -> int:
+        return int(exp) // blacklist_setting('BUCKET_SECONDS')
+
+    def _remember(self, jti: str, exp: int) -> None:
+        bucket = self._bucket(exp)
+        if bucket not in self._buckets:
+            self._buckets[bucket] = BloomFilter(
+                blacklist_setting('BUCKET_CAPACITY'), blacklist_setting('ERROR_RATE')
+            )
+        self._buckets[bucket].add(jti)
+
+    def _prune(self) -> None:
+        current = self._bucket(time.time())
+        for bucket in [b for b in self._buckets if b < current]:
+            del self._buckets[bucket]
+        for bucket in [b for b in self._revoked if b < current]:
+            del self._revoked[bucket]
+
+    def _sync(self, force: bool = False) -> None:
+        """Replay revocations other workers appended to the shared log"""
+        now = time.monotonic()
+        if not force and now - self._synced_at < blacklist_setting('SYNC_INTERVAL'):
+            return
+        with self._lock:
+            latest = cache.get(SEQUENCE_KEY) or 0
+            if latest < self._sequence:
+                # The log was reset (cache flushed or evicted): rebuild from scratch
+                self._buckets.clear()
+                self._sequence = 0
+                self._pending.clear()
+            retry, self._pending = sorted(self._pending), set()
+            wanted = retry + list(range(self._sequence + 1, latest + 1))
+            for start in range(0, len(wanted), SYNC_BATCH):
+                numbers = wanted[start:start + SYNC_BATCH]
+                entries = cache.get_many([_log_key(n) for n in numbers])
+                for number in numbers:
+                    entry = entries.get(_log_key(number))
+                    if entry is not None:
+                        self._remember(*entry)
+                    elif number > self._sequence:
+                        # A writer takes its number before storing the entry
+                        self._pending.add(number)
+            self._sequence = latest
+            self._synced_at = now
+            self._prune()
+
+    def revoke(self, jti: str, exp: int) -> None:
+        """Blacklist a token until it would have expired anyway"""
+        ttl = math.ceil(exp + _leeway_seconds() - time.time())
+        if ttl <= 0:
+            return
+        cache.set(_jti_key(jti), exp, ttl)
+        cache.add(SEQUENCE_KEY, 0, None)
+        cache.set(_log_key(cache.incr(SEQUENCE_KEY)), (jti, exp), ttl)
+        with self._lock:
+            self._revoked.setdefault(self._bucket(exp), set()).add(jti)
+            self._remember(jti, exp)
+
+    def is_revoked(self, jti: str, exp: int) -> bool:
+        self._sync()
+        bucket = self._bucket(exp)
+        if jti in self._revoked.get(bucket, ()):
+            return True
+        bloom: Optional[BloomFilter] = self._buckets.get(bucket)
+        if bloom is None or jti not in bloom:
+            return False
+        # Revoked by another worker: confirm against the shared key
+        return cache.get(_jti_key(jti)) is not None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._revoked.clear()
+            self._sequence = 0
+            self._pending.clear()
+            self._synced_at = 0.0
+
+
+token_blacklist = TokenBlacklist()
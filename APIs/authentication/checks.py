@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from rest_framework_simplejwt.settings import api_settings
+
+from core.shared_cache import is_shared_cache
+
+
+@register()
+def check_blacklist_cache(app_configs, **kwargs):
+    """Revocations live in the default cache, so a per-process one only revokes in the worker that saw it"""
+    # The development server runs a single process
+    if settings.DEBUG or not api_settings.BLACKLIST_AFTER_ROTATION or is_shared_cache():
+        return []
+    return [
+        Warning(
+            'BLACKLIST_AFTER_ROTATION is on but the default cache is per process; '
+            'rotated and logged-out refresh tokens stay usable on other workers.',
+            hint='Set REDIS_URL so revocations are shared between workers.',
+            id='authentication.W001',
+        )
+    ]
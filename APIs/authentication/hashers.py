@@ -0,0 +1,52 @@
+"""
+Password hashers whose cost parameters come from settings.PASSWORD_HASHING.
+
+They keep the stock algorithm names, so hashes made with older parameters
+still verify and are upgraded by the login rehash (see login.py) once the
+parameters change. Argon2 needs the argon2-cffi package.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+HASHING_DEFAULTS = {
+    'SCRYPT': {'WORK_FACTOR': 2 ** 14, 'BLOCK_SIZE': 8, 'PARALLELISM': 1},
+    'ARGON2': {'TIME_COST': 2, 'MEMORY_COST': 102400, 'PARALLELISM': 8},
+}
+
+
+def hashing_setting(algorithm: str, name: str):
+    configured = getattr(settings, 'PASSWORD_HASHING', {}).get(algorithm, {})
+    return configured.get(name, HASHING_DEFAULTS[algorithm][name])
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return hashing_setting('SCRYPT', 'WORK_FACTOR')
+
+    @property
+    def block_size(self):
+        return hashing_setting('SCRYPT', 'BLOCK_SIZE')
+
+    @property
+    def parallelism(self):
+        return hashing_setting('SCRYPT', 'PARALLELISM')
+
+    # OpenSSL refuses scrypt over 32 MiB unless given a ceiling. It must also
+    # cover hashes verified with older, larger parameters; it is a limit,
+    # not an allocation.
+    maxmem = 1 << 30
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return hashing_setting('ARGON2', 'TIME_COST')
+
+    @property
+    def memory_cost(self):
+        return hashing_setting('ARGON2', 'MEMORY_COST')
+
+    @property
+    def parallelism(self):
+        return hashing_setting('ARGON2', 'PARALLELISM')
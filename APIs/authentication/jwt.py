@@ -0,0 +1,159 @@
+"""
+JWT authentication without a user query on every request.
+
+Access tokens carry the user's role and flags as signed claims (see
+tokens.py). Requests get a TokenClaimsUser that answers id, role and the
+flags from those claims and only loads the full user, through a short-TTL
+in-process cache, when other attributes are touched or the object is used
+as a model instance (e.g. filter(clinician=request.user)).
+
+Saving a user evicts them from this process's cache. When a claim
+changed (role, flags, is_active), or the user was deleted or their groups
+changed, their existing claims are also marked stale in the shared cache;
+tokens issued before that are then served from the database until
+refreshed. That marker only reaches other workers through a shared cache,
+so claims are never trusted while the default cache is per process.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.shared_cache import is_shared_cache
+
+from .roles import changed_user_ids
+from .tokens import USER_CLAIMS, claim_values, is_revoked
+
+TOKEN_USER_DEFAULTS = {
+    'CLAIMS': True,  # trust role/flag claims instead of loading the user (shared cache only)
+    'CACHE_TTL': 60,  # seconds a loaded user is reused in-process; 0 disables
+    'CACHE_SIZE': 10000,
+}
+
+# Keyed by str(user id): tokens carry the id as a string
+_users: 'OrderedDict[str, tuple]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def token_user_setting(name: str):
+    return getattr(settings, 'AUTH_TOKEN_USER', {}).get(name, TOKEN_USER_DEFAULTS[name])
+
+
+def _stale_key(user_id) -> str:
+    return f'auth:claims-stale:{user_id}'
+
+
+def forget_user(user_id) -> None:
+    """Drop a user from the in-process cache"""
+    with _lock:
+        _users.pop(str(user_id), None)
+
+
+def evict_user(user_id) -> None:
+    """Drop a user from the in-process cache and distrust claims issued before now"""
+    forget_user(user_id)
+    cache.set(_stale_key(user_id), time.time(), api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+
+def load_user(user_id):
+    """The user, from the in-process cache when fresh; each caller gets its own copy"""
+    key = str(user_id)
+    ttl = token_user_setting('CACHE_TTL')
+    now = time.monotonic()
+    if ttl:
+        with _lock:
+            entry = _users.get(key)
+            if entry and entry[0] > now:
+                _users.move_to_end(key)
+                return copy.copy(entry[1])
+
+    user_model = get_user_model()
+    try:
+        user = user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+    except user_model.DoesNotExist:
+        raise AuthenticationFailed(_('User not found'), code='user_not_found')
+    if ttl:
+        with _lock:
+            _users[key] = (now + ttl, user)
+            _users.move_to_end(key)
+            while len(_users) > token_user_setting('CACHE_SIZE'):
+                _users.popitem(last=False)
+    return copy.copy(user)
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """Lazy user answering claim attributes without loading the row"""
+
+    def __init__(self, user_id, claims):
+        super().__init__(lambda: load_user(user_id))
+        pk = get_user_model()._meta.pk.to_python(user_id)
+        # Set on the wrapper itself so reading them never triggers a load
+        self.__dict__.update(claims, id=pk, pk=pk, is_authenticated=True, is_anonymous=False)
+
+    def __bool__(self):
+        return True
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if api_settings.JTI_CLAIM in validated_token and is_revoked(validated_token):
+            raise InvalidToken(_('Token is blacklisted'))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        claims = self._trusted_claims(validated_token, user_id)
+        if claims is not None:
+            return TokenClaimsUser(user_id, claims)
+
+        user = load_user(user_id)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+    def _trusted_claims(self, validated_token, user_id) -> Optional[dict]:
+        if not token_user_setting('CLAIMS') or any(claim not in validated_token for claim in USER_CLAIMS):
+            return None
+        # A per-process cache would only carry stale markers set by this worker
+        if not is_shared_cache():
+            return None
+        stale_since = cache.get(_stale_key(user_id))
+        if stale_since is not None and validated_token.get('iat', 0) <= stale_since:
+            return None
+        if api_settings.CHECK_USER_IS_ACTIVE and not validated_token['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return {claim: validated_token[claim] for claim in USER_CLAIMS}
+
+
+def on_user_saved(sender, instance, created, **kwargs):
+    loaded = getattr(instance, '_loaded_claims', None)
+    instance._loaded_claims = claim_values(instance)
+    if created or loaded == instance._loaded_claims:
+        # Nothing signed into existing tokens changed
+        forget_user(instance.pk)
+    else:
+        evict_user(instance.pk)
+
+
+def on_user_deleted(sender, instance, **kwargs):
+    evict_user(instance.pk)
+
+
+def on_user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    for user_id in changed_user_ids(instance, action, reverse, pk_set):
+        evict_user(user_id)
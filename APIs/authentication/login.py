@@ -0,0 +1,119 @@
+"""
+Login attempts on a bounded pool of hashing threads.
+
+Verifying a password is nearly all of a login's cost, and the hashers
+release the GIL while they work, so a pool sized to the cores verifies
+that many passwords at once. Attempts beyond that wait a short while for
+a slot instead of piling onto the CPU during a login storm; when none
+frees up in time the caller gets LoginBusy. Attempts are also counted
+per username and client address before any hashing is done, so one
+client guessing a password cannot lock its owner out everywhere else.
+
+Hashes made with a non-preferred hasher or outdated parameters are
+re-encoded by a background task after the login succeeds.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connections
+
+from core.tasks import enqueue
+
+logger = logging.getLogger(__name__)
+
+LOGIN_DEFAULTS = {
+    'WORKERS': None,  # hashing threads; None uses the CPU count
+    'QUEUE_SIZE': 64,  # attempts allowed to wait for a hashing thread
+    'QUEUE_TIMEOUT': 5.0,  # seconds an attempt waits for a place in the queue
+    'RATE_LIMIT': 10,  # attempts per username and client address per window
+    'RATE_WINDOW': 300,
+}
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+
+class LoginBusy(Exception):
+    """Every hashing thread and queue slot stayed taken"""
+
+
+class LoginThrottled(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f'Too many login attempts, retry in {retry_after}s')
+        self.retry_after = retry_after
+
+
+def login_setting(name: str):
+    return getattr(settings, 'LOGIN', {}).get(name, LOGIN_DEFAULTS[name])
+
+
+def _get_executor():
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            workers = login_setting('WORKERS') or os.cpu_count() or 1
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='login')
+            _slots = threading.BoundedSemaphore(workers + login_setting('QUEUE_SIZE'))
+    return _executor, _slots
+
+
+def _attempts_key(username: str, client_ip: str) -> str:
+    return f'auth:login-attempts:{username.lower()}:{client_ip}'
+
+
+def _count_attempt(username: str, client_ip: str) -> None:
+    key, window = _attempts_key(username, client_ip), login_setting('RATE_WINDOW')
+    cache.add(key, 0, window)
+    try:
+        attempts = cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, window)
+        attempts = 1
+    if attempts > login_setting('RATE_LIMIT'):
+        raise LoginThrottled(window)
+
+
+def _authenticate(username: str, password: str):
+    try:
+        return authenticate(username=username, password=password)
+    finally:
+        # Pool threads outlive requests, so never leave a connection open
+        connections.close_all()
+
+
+def attempt_login(username: str, password: str, client_ip: str = '') -> Optional[object]:
+    """The user for these credentials, or None; raises LoginThrottled or LoginBusy"""
+    _count_attempt(username, client_ip)
+    executor, slots = _get_executor()
+    if not slots.acquire(timeout=login_setting('QUEUE_TIMEOUT')):
+        raise LoginBusy()
+    try:
+        user = executor.submit(_authenticate, username, password).result()
+    finally:
+        slots.release()
+    if user is not None:
+        cache.delete(_attempts_key(username, client_ip))
+    return user
+
+
+def _rehash(user_model, pk, raw_password: str, encoded: str) -> None:
+    # Skipped if the password changed since the login that asked for this
+    updated = user_model._default_manager.filter(pk=pk, password=encoded).update(
+        password=make_password(raw_password)
+    )
+    if updated:
+        logger.info("Upgraded password hash for user %s", pk)
+
+
+def schedule_rehash(user, raw_password: str) -> None:
+    """Re-encode user's password with the preferred hasher off the request path"""
+    enqueue(_rehash, type(user), user.pk, raw_password, user.password)
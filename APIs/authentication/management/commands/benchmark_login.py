@@ -0,0 +1,57 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+from authentication.login import login_setting
+
+PASSWORD = 'shift-change-0700'
+
+
+class Command(BaseCommand):
+    help = "Measure password verifications (the cost of a login) per second and per core for each configured hasher"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+        parser.add_argument('--threads', type=int, default=None,
+                            help='Concurrent verifications; defaults to the login pool size')
+        parser.add_argument('--hasher', action='append', dest='hashers',
+                            help='Algorithm to measure (repeatable); defaults to all configured')
+
+    def handle(self, *args, **options):
+        threads = options['threads'] or login_setting('WORKERS') or os.cpu_count() or 1
+        cores = min(threads, os.cpu_count() or 1)
+        self.stdout.write(f"{threads} threads on {os.cpu_count()} CPUs, {options['seconds']}s per run")
+
+        for hasher in get_hashers():
+            if options['hashers'] and hasher.algorithm not in options['hashers']:
+                continue
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as e:
+                # Optional hasher library not installed
+                self.stdout.write(self.style.WARNING(f"{hasher.algorithm}: skipped ({e})"))
+                continue
+            single = self._rate(hasher, encoded, 1, options['seconds'])
+            pooled = self._rate(hasher, encoded, threads, options['seconds'])
+            self.stdout.write(
+                f"{hasher.algorithm:<16} {single:8.1f}/s one thread  "
+                f"{pooled:8.1f}/s {threads} threads  {pooled / cores:8.1f}/s per core"
+            )
+
+    def _rate(self, hasher, encoded, threads, seconds):
+        deadline = time.perf_counter() + seconds
+
+        def verify_until_deadline():
+            count = 0
+            while time.perf_counter() < deadline:
+                hasher.verify(PASSWORD, encoded)
+                count += 1
+            return count
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            total = sum(executor.map(lambda _: verify_until_deadline(), range(threads)))
+        return total / (time.perf_counter() - started)
@@ -1,6 +1,9 @@
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from .login import schedule_rehash
+
 
 class Role(models.TextChoices):
     ADMIN = 'admin', 'Admin'
@@ -21,3 +24,16 @@ class User(AbstractUser):
 
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Compared on save, so only claim changes distrust the user's tokens (authentication/jwt.py)
+        from .tokens import USER_CLAIMS, claim_values
+        if not set(USER_CLAIMS) & instance.get_deferred_fields():
+            instance._loaded_claims = claim_values(instance)
+        return instance
+
+    def check_password(self, raw_password):
+        # Outdated hashes are upgraded in the background, not during login
+        return check_password(raw_password, self.password, lambda raw: schedule_rehash(self, raw))
@@ -0,0 +1,203 @@
+"""
+Process-wide registry of roles (auth groups) and permissions.
+
+The permission matrix (every permission, every role and the permissions each
+role grants) is loaded once per process and reloaded when PERMISSION_REGISTRY
+TTL passes or a generation counter in the shared cache moves, which any
+change to groups, permissions or their links does. Each permission owns one
+bit, so a role's grants and a user's effective permissions are plain ints.
+
+A user's role and direct permission ids are kept in the shared cache and
+dropped when those memberships change; the user's effective mask is then
+built from the matrix without touching the database.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+REGISTRY_DEFAULTS = {
+    'TTL': 300,  # seconds a worker serves the matrix before reloading it
+    'USER_TIMEOUT': 3600,  # seconds a user's memberships stay cached
+}
+
+GENERATION_KEY = 'auth:permission-registry:generation'
+
+
+def registry_setting(name: str):
+    return getattr(settings, 'PERMISSION_REGISTRY', {}).get(name, REGISTRY_DEFAULTS[name])
+
+
+def _memberships_key(user_id) -> str:
+    return f'auth:memberships:{user_id}'
+
+
+@dataclass
+class PermissionMatrix:
+    """Permissions in bit order plus each role's permission mask"""
+    permissions: List[Dict[str, Any]]
+    bits: Dict[str, int]  # 'app_label.codename' -> bit
+    permission_bits: Dict[int, int]  # permission id -> bit
+    roles: Dict[str, int]  # role name -> group id
+    role_masks: Dict[int, int]  # group id -> mask
+    generation: int
+    loaded_at: float
+
+    @property
+    def all_mask(self) -> int:
+        return (1 << len(self.permissions)) - 1
+
+    def names(self, mask: int) -> Set[str]:
+        return {f"{p['app_label']}.{p['codename']}" for bit, p in enumerate(self.permissions) if mask >> bit & 1}
+
+
+class PermissionRegistry:
+    def __init__(self):
+        self._matrix: Optional[PermissionMatrix] = None
+        self._lock = threading.Lock()
+
+    def matrix(self) -> PermissionMatrix:
+        generation = cache.get(GENERATION_KEY, 0)
+        matrix = self._matrix
+        if matrix and matrix.generation == generation and time.monotonic() - matrix.loaded_at < registry_setting('TTL'):
+            return matrix
+        matrix = self._load(generation)
+        with self._lock:
+            self._matrix = matrix
+        return matrix
+
+    def _load(self, generation: int) -> PermissionMatrix:
+        permissions = list(
+            Permission.objects.order_by('id').values('id', 'name', 'codename', app_label=F('content_type__app_label'))
+        )
+        permission_bits = {p['id']: bit for bit, p in enumerate(permissions)}
+        roles = dict(Group.objects.order_by('id').values_list('name', 'id'))
+        role_masks = dict.fromkeys(roles.values(), 0)
+        for group_id, permission_id in Group.permissions.through.objects.values_list('group_id', 'permission_id'):
+            role_masks[group_id] |= 1 << permission_bits[permission_id]
+        return PermissionMatrix(
+            permissions=permissions,
+            bits={f"{p['app_label']}.{p['codename']}": bit for bit, p in enumerate(permissions)},
+            permission_bits=permission_bits,
+            roles=roles,
+            role_masks=role_masks,
+            generation=generation,
+            loaded_at=time.monotonic(),
+        )
+
+    def invalidate(self) -> None:
+        """Drop this worker's matrix and tell other workers to reload theirs"""
+        with self._lock:
+            self._matrix = None
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, timeout=None)
+
+    def roles(self) -> List[Dict[str, Any]]:
+        return [{'id': group_id, 'name': name} for name, group_id in self.matrix().roles.items()]
+
+    def permissions(self) -> List[Dict[str, Any]]:
+        return [{'id': p['id'], 'name': p['name'], 'codename': p['codename']} for p in self.matrix().permissions]
+
+    def role_id(self, name: str) -> Optional[int]:
+        return self.matrix().roles.get(name)
+
+    def ensure_role(self, name: str) -> int:
+        role_id = self.role_id(name)
+        if role_id is None:
+            role_id = Group.objects.get_or_create(name=name)[0].pk
+        return role_id
+
+    def memberships(self, user_id) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """The user's group ids and direct permission ids"""
+        key = _memberships_key(user_id)
+        entry = cache.get(key)
+        if entry is None:
+            user_model = get_user_model()
+            entry = (
+                tuple(user_model.groups.through.objects.filter(user_id=user_id).values_list('group_id', flat=True)),
+                tuple(user_model.user_permissions.through.objects.filter(user_id=user_id)
+                      .values_list('permission_id', flat=True)),
+            )
+            cache.set(key, entry, registry_setting('USER_TIMEOUT'))
+        return entry
+
+    def user_mask(self, user) -> int:
+        """Bitset of every permission user has, through roles or directly"""
+        matrix = self.matrix()
+        if user.is_superuser:
+            return matrix.all_mask
+        group_ids, permission_ids = self.memberships(user.pk)
+        mask = 0
+        for group_id in group_ids:
+            mask |= matrix.role_masks.get(group_id, 0)
+        for permission_id in permission_ids:
+            if permission_id in matrix.permission_bits:
+                mask |= 1 << matrix.permission_bits[permission_id]
+        return mask
+
+    def has_perm(self, user, perm: str) -> bool:
+        bit = self.matrix().bits.get(perm)
+        return bit is not None and bool(self.user_mask(user) >> bit & 1)
+
+    def permission_names(self, user) -> Set[str]:
+        return self.matrix().names(self.user_mask(user))
+
+
+permission_registry = PermissionRegistry()
+
+
+def _existing_user_ids(user_ids: Iterable[int]) -> List[int]:
+    return list(get_user_model().objects.filter(pk__in=set(user_ids)).values_list('pk', flat=True))
+
+
+def assign_role(role: str, user_ids: Iterable[int]) -> List[int]:
+    """Give role to every listed user in one transaction, creating it if needed; returns the ids found"""
+    with transaction.atomic():
+        group = Group.objects.get(pk=permission_registry.ensure_role(role))
+        found = _existing_user_ids(user_ids)
+        group.user_set.add(*found)
+    return found
+
+
+def remove_role(role: str, user_ids: Iterable[int]) -> List[int]:
+    """Take role from every listed user in one transaction; raises Group.DoesNotExist for unknown roles"""
+    role_id = permission_registry.role_id(role)
+    with transaction.atomic():
+        group = Group.objects.get(pk=role_id) if role_id is not None else Group.objects.get(name=role)
+        found = _existing_user_ids(user_ids)
+        group.user_set.remove(*found)
+    return found
+
+
+def changed_user_ids(instance, action: str, reverse: bool, pk_set) -> List:
+    """Users whose groups or permissions an m2m_changed signal affects"""
+    # Clears are handled before they run, while the members can still be listed
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return []
+    if reverse:
+        # group.user_set or permission.user_set changed: instance is not a user
+        return list(pk_set) if pk_set is not None else list(instance.user_set.values_list('pk', flat=True))
+    return [instance.pk]
+
+
+def on_matrix_changed(sender, **kwargs):
+    action = kwargs.get('action')
+    if action is None or action in ('post_add', 'post_remove', 'post_clear'):
+        # After commit, so no worker reloads the old rows and caches them again
+        transaction.on_commit(permission_registry.invalidate)
+
+
+def on_memberships_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    user_ids = changed_user_ids(instance, action, reverse, pk_set)
+    if user_ids:
+        keys = [_memberships_key(user_id) for user_id in user_ids]
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import token_blacklist
+
+# User attributes signed into every token so hot paths can authorize
+# without loading the user row
+USER_CLAIMS = ('role', 'is_verified', 'is_staff', 'is_superuser', 'is_active')
+
+
+def claim_values(user) -> tuple:
+    return tuple(getattr(user, claim) for claim in USER_CLAIMS)
+
+
+def add_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def revoke(token) -> None:
+    token_blacklist.revoke(token[api_settings.JTI_CLAIM], token['exp'])
+
+
+def is_revoked(token) -> bool:
+    return token_blacklist.is_revoked(token[api_settings.JTI_CLAIM], token['exp'])
+
+
+class ClinicianRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the user's role and flags.
+    Revocation goes through the cache-backed token_blacklist rather than
+    simplejwt's database blacklist app.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+    def verify(self, *args, **kwargs):
+        if is_revoked(self):
+            raise TokenError(_('Token is blacklisted'))
+        super().verify(*args, **kwargs)
+
+    def blacklist(self):
+        revoke(self)
+
+    def outstand(self):
+        # Only revoked tokens are tracked; there is no outstanding-token table
+        return None
+
+
+class ClinicianTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Re-stamps claims from the database on refresh, so a role change reaches
+    the client's next access token instead of living as long as the
+    refresh token.
+    """
+    token_class = ClinicianRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is not None:
+            add_user_claims(refresh, user)
+            attrs['refresh'] = str(refresh)
+        return super().validate(attrs)
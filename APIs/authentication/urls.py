@@ -18,4 +18,5 @@ urlpatterns = [
     path('roles/', views.RoleListView.as_view(), name='role_list'),
     path('permissions/', views.PermissionListView.as_view(), name='permission_list'),
     path('users/<int:user_id>/assign-role/', views.AssignRoleView.as_view(), name='assign_role'),
+    path('users/assign-role/', views.BulkAssignRoleView.as_view(), name='bulk_assign_role'),
 ]
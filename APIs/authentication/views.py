@@ -2,22 +2,33 @@ from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate
-from django.contrib.auth.models import Group, Permission
+from django.contrib.auth.models import Group
+from .login import LoginBusy, LoginThrottled, attempt_login
 from .models import User
+from .roles import assign_role, permission_registry, remove_role
+from core.ratelimit import rate_limited
+from .tokens import ClinicianRefreshToken, revoke
 from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer, UserSerializer
 
 
 class LoginView(APIView):
+    permission_classes = [permissions.AllowAny]
+
     def post(self, request):
         username = request.data.get('username')
         password = request.data.get('password')
         
         if username and password:
-            user = authenticate(username=username, password=password)
+            try:
+                user = attempt_login(username, password, request.META.get('REMOTE_ADDR', ''))
+            except LoginThrottled as e:
+                return Response({'error': 'Too many login attempts'}, status=status.HTTP_429_TOO_MANY_REQUESTS,
+                                headers={'Retry-After': str(e.retry_after)})
+            except LoginBusy:
+                return Response({'error': 'Login is busy, please retry'}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                headers={'Retry-After': '1'})
             if user:
-                refresh = RefreshToken.for_user(user)
+                refresh = ClinicianRefreshToken.for_user(user)
                 return Response({
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
@@ -27,11 +38,13 @@ class LoginView(APIView):
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
 class RegisterView(APIView):
+    permission_classes = [permissions.AllowAny]
+
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = ClinicianRefreshToken.for_user(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -45,8 +58,11 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = ClinicianRefreshToken(refresh_token)
             token.blacklist()
+            # End the session now rather than when the access token expires
+            if request.auth is not None and 'jti' in request.auth:
+                revoke(request.auth)
             return Response({'message': 'Successfully logged out'}, status=status.HTTP_205_RESET_CONTENT)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -86,17 +102,13 @@ class RoleListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        groups = Group.objects.all()
-        data = [{'id': g.id, 'name': g.name} for g in groups]
-        return Response(data)
+        return Response(permission_registry.roles())
 
 class PermissionListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        permissions = Permission.objects.all()
-        data = [{'id': p.id, 'name': p.name, 'codename': p.codename} for p in permissions]
-        return Response(data)
+        return Response(permission_registry.permissions())
 
 class AssignRoleView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -107,8 +119,7 @@ class AssignRoleView(APIView):
             role_name = request.data.get('role')
             
             if role_name:
-                group, created = Group.objects.get_or_create(name=role_name)
-                user.groups.add(group)
+                user.groups.add(permission_registry.ensure_role(role_name))
                 return Response({'message': f'Role {role_name} assigned to user {user.username}'})
             
             return Response({'error': 'Role name is required'}, status=status.HTTP_400_BAD_REQUEST)
@@ -124,8 +135,10 @@ class AssignRoleView(APIView):
             role_name = request.data.get('role')
             
             if role_name:
-                group = Group.objects.get(name=role_name)
-                user.groups.remove(group)
+                role_id = permission_registry.role_id(role_name)
+                if role_id is None:
+                    raise Group.DoesNotExist
+                user.groups.remove(role_id)
                 return Response({'message': f'Role {role_name} removed from user {user.username}'})
             
             return Response({'error': 'Role name is required'}, status=status.HTTP_400_BAD_REQUEST)
@@ -134,3 +147,35 @@ class AssignRoleView(APIView):
             return Response({'error': 'User or role not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@rate_limited('bulk')
+class BulkAssignRoleView(APIView):
+    """Add (POST) or remove (DELETE) one role for many users in a single transaction"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        return self._apply(request, assign_role)
+
+    def delete(self, request):
+        return self._apply(request, remove_role)
+
+    def _apply(self, request, operation):
+        if request.user.role != 'admin':
+            return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+        role_name = request.data.get('role')
+        user_ids = request.data.get('user_ids')
+        if not role_name or not isinstance(user_ids, list):
+            return Response({'error': 'role and a list of user_ids are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            user_ids = [int(user_id) for user_id in user_ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'user_ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            updated = operation(role_name, user_ids)
+        except Group.DoesNotExist:
+            return Response({'error': 'Role not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'role': role_name,
+            'updated': sorted(updated),
+            'not_found': sorted(set(user_ids) - set(updated)),
+        })
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CommunicationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'communication'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from .models import Message
+        from .streams import on_message_saved
+
+        post_save.connect(on_message_saved, sender=Message, dispatch_uid='communication_stream_marker')
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from events.capture import ChangeCaptureMixin
 from patients.models import Patient
 
 
@@ -31,7 +32,7 @@ class CommunicationThread(models.Model):
         return f"{self.patient.full_name} - {self.subject}"
 
 
-class Message(models.Model):
+class Message(ChangeCaptureMixin, models.Model):
     """Individual messages within a communication thread"""
     thread = models.ForeignKey(CommunicationThread, on_delete=models.CASCADE, related_name='messages')
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -55,6 +56,9 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='message_sync_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender.get_full_name()} - {self.message_type} ({self.created_at.strftime('%Y-%m-%d %H:%M')})"
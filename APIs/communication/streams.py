@@ -0,0 +1,71 @@
+"""
+New-message markers for thread event streams.
+
+Each thread's newest message id is mirrored in the cache when a message
+commits. An open stream polls that marker and only queries the database
+when it moves past the last message it sent, so idle streams cost a cache
+read per poll interval rather than a held connection and a query.
+"""
+from typing import Any, Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Message
+
+# The database is checked whenever a marker is missing, so expiry only costs a query
+MARKER_TIMEOUT = 3600
+STREAM_BATCH = 100
+STREAM_FIELDS = (
+    'id', 'thread_id', 'sender_id', 'sender__first_name', 'sender__last_name', 'message_type',
+    'content', 'is_ai_generated', 'created_at',
+)
+
+
+def marker_key(thread_id: int) -> str:
+    return f'communication:thread-last:{thread_id}'
+
+
+def on_message_saved(sender, instance, created, **kwargs):
+    if not created:
+        return
+    thread_id, message_id = instance.thread_id, instance.id
+    transaction.on_commit(lambda: cache.set(marker_key(thread_id), message_id, MARKER_TIMEOUT))
+
+
+async def latest_message_id(thread_id: int) -> int:
+    latest = await Message.objects.filter(thread_id=thread_id).order_by('-id').values_list('id', flat=True).afirst()
+    return latest or 0
+
+
+def needs_query(marker: Optional[int], after: int) -> bool:
+    """Whether messages_after() has to read the database for this marker"""
+    return marker is None or marker > after
+
+
+async def messages_after(thread_id: int, after: int, marker: Optional[int]) -> List[Dict[str, Any]]:
+    """Messages newer than after, skipping the query when the marker shows there are none"""
+    if not needs_query(marker, after):
+        return []
+    queryset = Message.objects.filter(thread_id=thread_id, id__gt=after).order_by('id').values(*STREAM_FIELDS)
+    messages = [
+        {
+            'id': row['id'],
+            'thread': row['thread_id'],
+            'sender': row['sender_id'],
+            'sender_name': f"{row['sender__first_name']} {row['sender__last_name']}".strip(),
+            'message_type': row['message_type'],
+            'content': row['content'],
+            'is_ai_generated': row['is_ai_generated'],
+            'created_at': row['created_at'],
+        }
+        async for row in queryset[:STREAM_BATCH]
+    ]
+    if marker is None:
+        # Restore a lost marker; add() so a message committed meanwhile keeps its newer id
+        await cache.aadd(marker_key(thread_id), messages[-1]['id'] if messages else after, MARKER_TIMEOUT)
+    return messages
+
+
+async def current_marker(thread_id: int) -> Optional[int]:
+    return await cache.aget(marker_key(thread_id))
@@ -17,6 +17,7 @@ urlpatterns = [
     # Thread management
     path('threads/<int:patient_id>/', views.PatientCommunicationThreadsView.as_view(), name='patient_threads'),
     path('threads/<int:thread_id>/messages/', views.ThreadMessagesView.as_view(), name='thread_messages'),
+    path('threads/<int:thread_id>/messages/stream/', views.thread_message_stream, name='thread_message_stream'),
     path('threads/<int:thread_id>/participants/', views.ThreadParticipantsView.as_view(), name='thread_participants'),
     
     # AI-generated communications
@@ -40,6 +41,7 @@ urlpatterns = [
     path('urgent-alerts/', views.UrgentAlertsView.as_view(), name='urgent_alerts'),
     path('shift-handoffs/', views.ShiftHandoffsView.as_view(), name='shift_handoffs'),
     path('interdisciplinary-notes/', views.InterdisciplinaryNotesView.as_view(), name='interdisciplinary_notes'),
+    path('templates/', views.MessageTemplateListView.as_view(), name='message_templates'),
     
     # Communication analytics
     path('analytics/response-times/', views.ResponseTimeAnalyticsView.as_view(), name='response_time_analytics'),
@@ -6,26 +6,38 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db.models import Q, Count, Avg
 from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+from core.async_views import (
+    async_api_view, async_view_setting, error_response, is_asgi, json_response, release_connections
+)
+from core.conditional import ConditionalGetMixin
+from core.ratelimit import rate_limited
+from core.response_cache import cache_response
 from .models import CommunicationThread, Message, MessageTemplate, MessageReadStatus
+from .streams import current_marker, latest_message_id, messages_after, needs_query
 from .serializers import (
     CommunicationThreadSerializer, CommunicationThreadDetailSerializer,
     CommunicationThreadCreateSerializer, MessageSerializer, MessageCreateSerializer,
     MessageTemplateSerializer, AIMessageGenerationSerializer, CommunicationStatsSerializer
 )
 from patients.models import Patient
+import asyncio
 import json
+import time
 from datetime import datetime, timedelta
 
 User = get_user_model()
 
 
-class CommunicationThreadViewSet(viewsets.ModelViewSet):
+class CommunicationThreadViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling communication threads.
     """
     queryset = CommunicationThread.objects.all()
     serializer_class = CommunicationThreadSerializer
     permission_classes = [permissions.IsAuthenticated]
+    last_modified_fields = ('updated_at', 'messages__updated_at', 'messages__messagereadstatus__read_at')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -49,9 +61,10 @@ class MessageViewSet(viewsets.ModelViewSet):
         return MessageSerializer
 
 
-class CommunicationThreadListCreateView(generics.ListCreateAPIView):
+class CommunicationThreadListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List all communication threads or create a new one"""
     permission_classes = [permissions.IsAuthenticated]
+    last_modified_fields = ('updated_at', 'messages__updated_at', 'messages__messagereadstatus__read_at')
     
     def get_queryset(self):
         user = self.request.user
@@ -91,9 +104,10 @@ class CommunicationThreadListCreateView(generics.ListCreateAPIView):
         return CommunicationThreadSerializer
 
 
-class CommunicationThreadDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CommunicationThreadDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a specific communication thread"""
     permission_classes = [permissions.IsAuthenticated]
+    last_modified_fields = ('updated_at', 'messages__updated_at', 'messages__messagereadstatus__read_at')
     
     def get_queryset(self):
         return CommunicationThread.objects.filter(
@@ -149,6 +163,10 @@ class MessageTemplateListView(generics.ListAPIView):
     serializer_class = MessageTemplateSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    @cache_response('message_templates', models=[MessageTemplate])
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
         queryset = super().get_queryset()
         
@@ -159,6 +177,7 @@ class MessageTemplateListView(generics.ListAPIView):
         return queryset
 
 
+@rate_limited('ai')
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def generate_ai_message(request, thread_id):
@@ -483,6 +502,67 @@ class ThreadMessagesView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+def _event(message) -> str:
+    return f"id: {message['id']}\nevent: message\ndata: {json.dumps(message, cls=JSONEncoder)}\n\n"
+
+
+async def _message_events(thread_id, after):
+    """Server-sent events for new messages until STREAM_SECONDS, then the client reconnects"""
+    heartbeat = async_view_setting('HEARTBEAT_SECONDS')
+    deadline = time.monotonic() + async_view_setting('STREAM_SECONDS')
+    last_sent = time.monotonic()
+    yield f"retry: {int(async_view_setting('POLL_INTERVAL') * 1000)}\n\n"
+    while time.monotonic() < deadline:
+        marker = await current_marker(thread_id)
+        polled_database = needs_query(marker, after)
+        messages = await messages_after(thread_id, after, marker)
+        if polled_database:
+            # Includes polls that only restored a lost marker
+            await release_connections()
+        if messages:
+            after = messages[-1]['id']
+            last_sent = time.monotonic()
+            yield ''.join(_event(message) for message in messages)
+        elif time.monotonic() - last_sent >= heartbeat:
+            last_sent = time.monotonic()
+            yield ': keepalive\n\n'
+        await asyncio.sleep(async_view_setting('POLL_INTERVAL'))
+
+
+@async_api_view(['GET'])
+async def thread_message_stream(request, thread_id):
+    """
+    Stream a thread's new messages as server-sent events. Resumes after
+    Last-Event-ID (or ?after=); without either, starts from the newest
+    message. Under WSGI, answers with what is pending and closes.
+    """
+    is_participant = await CommunicationThread.objects.filter(
+        id=thread_id, participants__id=request.user.id
+    ).aexists()
+    if not is_participant:
+        return json_response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    after = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    if after is None:
+        after = await latest_message_id(thread_id)
+    else:
+        try:
+            after = int(after)
+        except ValueError:
+            return error_response('after must be a message id', status.HTTP_400_BAD_REQUEST)
+
+    if is_asgi(request):
+        await release_connections()
+        response = StreamingHttpResponse(_message_events(thread_id, after), content_type='text/event-stream')
+    else:
+        messages = await messages_after(thread_id, after, None)
+        response = HttpResponse(''.join(_event(message) for message in messages), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keeps nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 class ThreadParticipantsView(APIView):
     """Get participants for a thread"""
     permission_classes = [permissions.IsAuthenticated]
@@ -494,6 +574,7 @@ class ThreadParticipantsView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+@rate_limited('ai')
 class GenerateMDUpdateView(APIView):
     """Generate MD update"""
     permission_classes = [permissions.IsAuthenticated]
@@ -505,6 +586,7 @@ class GenerateMDUpdateView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+@rate_limited('ai')
 class GenerateSummaryView(APIView):
     """Generate summary"""
     permission_classes = [permissions.IsAuthenticated]
@@ -516,6 +598,7 @@ class GenerateSummaryView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+@rate_limited('ai')
 class GenerateHandoffNoteView(APIView):
     """Generate handoff note"""
     permission_classes = [permissions.IsAuthenticated]
@@ -527,6 +610,7 @@ class GenerateHandoffNoteView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+@rate_limited('ai')
 class GenerateCareSummaryView(APIView):
     """Generate care summary"""
     permission_classes = [permissions.IsAuthenticated]
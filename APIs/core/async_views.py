@@ -0,0 +1,113 @@
+"""
+Helpers for async function views.
+
+DRF's APIView is sync-only, so the I/O-bound endpoints that spend their
+time waiting (downloads, long polls, event streams) are plain async Django
+views. Under ASGI they hold a coroutine rather than a worker thread while
+they wait; under WSGI Django still runs them, one thread per request.
+
+@async_api_view authenticates with the same JWT authentication as the DRF
+views and answers errors in the same shape ({'detail': ...} for auth,
+{'error': ...} otherwise). It leaves the function itself untouched for
+@rate_limited, which should be applied above it.
+"""
+import asyncio
+import functools
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
+
+from authentication.jwt import ClaimsJWTAuthentication
+
+ASYNC_VIEW_DEFAULTS = {
+    'LONG_POLL_SECONDS': 25,  # longest ?wait= a long poll may ask for
+    'POLL_INTERVAL': 1.0,  # seconds between checks while waiting
+    'STREAM_SECONDS': 300,  # an event stream closes after this; clients reconnect
+    'HEARTBEAT_SECONDS': 15,  # comment line sent on idle streams to keep proxies from closing them
+    'DOWNLOAD_CHUNK_SIZE': 64 * 1024,
+}
+
+T = TypeVar('T')
+
+
+def async_view_setting(name: str):
+    return getattr(settings, 'ASYNC_VIEWS', {}).get(name, ASYNC_VIEW_DEFAULTS[name])
+
+
+def is_asgi(request) -> bool:
+    """Whether long-lived responses can be served without holding a thread"""
+    return isinstance(request, ASGIRequest)
+
+
+def json_response(data, status: int = 200) -> JsonResponse:
+    """JSON encoded like DRF's Response, so async and sync views render values the same way"""
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+def error_response(message: str, status: int) -> JsonResponse:
+    return json_response({'error': message}, status=status)
+
+
+async def release_connections() -> None:
+    """Close this request's database connections before a long wait instead of holding them idle"""
+    await sync_to_async(connections.close_all)()
+
+
+async def authenticate(request):
+    """(user, token) from the bearer token, or None; raises DRF auth exceptions"""
+    # Token validation reads the blacklist from the cache, so run it off the event loop
+    return await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+
+
+def async_api_view(methods=('GET',), authenticated: bool = True):
+    """Method check and JWT authentication for an async function view"""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+                response['Allow'] = ', '.join(methods)
+                return response
+            if authenticated:
+                try:
+                    result = await authenticate(request)
+                except APIException as e:
+                    result, detail = None, e.detail
+                else:
+                    detail = 'Authentication credentials were not provided.'
+                if result is None:
+                    response = json_response({'detail': str(detail)}, status=401)
+                    response['WWW-Authenticate'] = ClaimsJWTAuthentication().authenticate_header(request)
+                    return response
+                request.user, request.auth = result
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def wait_seconds(request) -> float:
+    """The ?wait= a long poll asked for, capped at LONG_POLL_SECONDS"""
+    try:
+        wait = float(request.GET.get('wait', 0))
+    except ValueError:
+        return 0.0
+    return max(0.0, min(wait, async_view_setting('LONG_POLL_SECONDS')))
+
+
+async def wait_for(fetch: Callable[[], Awaitable[T]], done: Callable[[T], bool], timeout: float,
+                   interval: Optional[float] = None) -> T:
+    """Await fetch() until done(result) or timeout, sleeping between attempts; returns the last result"""
+    interval = interval or async_view_setting('POLL_INTERVAL')
+    deadline = time.monotonic() + timeout
+    result = await fetch()
+    while not done(result) and time.monotonic() < deadline:
+        await asyncio.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        result = await fetch()
+    return result
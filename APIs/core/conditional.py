@@ -0,0 +1,92 @@
+import hashlib
+from typing import Optional, Sequence, Tuple
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def validators(queryset, scope: str, last_modified_fields: Sequence[str],
+               path: Optional[str] = None) -> Optional[Tuple[str, Optional[float]]]:
+    """(etag, last_modified) for queryset; None for a detail scope with no matching row"""
+    aggregates = {f'm{index}': Max(field) for index, field in enumerate(last_modified_fields)}
+    row = queryset.order_by().aggregate(_count=Count('pk', distinct=True), **aggregates)
+    if scope == 'detail' and not row['_count']:
+        return None
+    stamps = [row[key] for key in aggregates if row[key] is not None]
+    last_modified = max(stamps).timestamp() if stamps else None
+    # Microsecond stamps keep the ETag exact where Last-Modified only has seconds
+    parts = [scope, queryset.model._meta.label_lower, str(row['_count'])]
+    parts += [row[key].isoformat() if row[key] else '-' for key in aggregates]
+    if path is not None:
+        parts.append(path)
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:32], last_modified
+
+
+def detail_etag(queryset, last_modified_fields: Sequence[str]) -> Optional[str]:
+    """
+    The quoted ETag a ConditionalGetMixin detail view with these fields sends
+    for the single row in queryset, so write endpoints can accept it in If-Match
+    """
+    result = validators(queryset, 'detail', last_modified_fields)
+    return quote_etag(result[0]) if result else None
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified validators for generic views, answered with 304 Not
+    Modified when the client's copy is current.
+
+    Validators come from an aggregate over last_modified_fields on the
+    view's own filtered queryset, so no object is loaded or serialized to
+    answer a conditional request. List the timestamps of nested data the
+    serializer embeds (e.g. 'patient__updated_at') so edits to it change
+    the validator too. Collection ETags also cover the row count, which
+    catches deletions that leave Max(updated_at) unchanged.
+    """
+    last_modified_fields: Sequence[str] = ('updated_at',)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self._conditional(request, queryset, 'detail', super().retrieve, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional(request, queryset, 'list', super().list, *args, **kwargs)
+
+    def _validators(self, queryset, scope: str) -> Optional[Tuple[str, Optional[float]]]:
+        path = self.request.get_full_path() if scope == 'list' else None
+        return validators(queryset, scope, self.last_modified_fields, path)
+
+    def _conditional(self, request, queryset, scope, respond, *args, **kwargs):
+        validators = self._validators(queryset, scope)
+        if validators is None:
+            # Missing object: let the regular handler produce the 404
+            return respond(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        headers = {'ETag': f'W/{quote_etag(etag)}'}
+        if last_modified is not None:
+            headers['Last-Modified'] = http_date(last_modified)
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            # Weak comparison, as RFC 9110 requires for If-None-Match
+            tags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(if_none_match)]
+            not_modified = '*' in tags or quote_etag(etag) in tags
+        else:
+            since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+            not_modified = since is not None and last_modified is not None and int(last_modified) <= since
+
+        if not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response = respond(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+        return response
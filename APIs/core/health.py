@@ -0,0 +1,158 @@
+"""
+Liveness and readiness checks.
+
+/health/live/ only says the process is serving requests. /health/ready/
+(and /health/) runs the dependency checks below and answers 503 when a
+critical one fails, so a load balancer stops routing to the instance;
+non-critical failures (the OCR binary, the task broker) report the
+instance as degraded but keep it in rotation. Results are cached per
+process for CACHE_SECONDS so frequent probes don't hammer the database.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import connections
+from django.http import JsonResponse
+
+from .metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+HEALTH_DEFAULTS = {
+    'CACHE_SECONDS': 10,  # how long check results are reused by this process
+    'BROKER_TIMEOUT': 2,  # seconds to wait for the task broker
+}
+
+VERSION = '1.0'
+
+_results: Optional[Dict[str, Dict[str, Any]]] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def health_setting(name: str):
+    return getattr(settings, 'HEALTH', {}).get(name, HEALTH_DEFAULTS[name])
+
+
+class Skipped(Exception):
+    """The dependency isn't configured here; reported as skipped, never as a failure"""
+
+
+def check_database() -> str:
+    for alias in connections:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    return f'{len(connections.all())} database(s) reachable'
+
+
+def check_cache() -> str:
+    key = f'health:{uuid.uuid4().hex}'
+    cache.set(key, 1, 5)
+    if cache.get(key) != 1:
+        raise RuntimeError('cache round trip returned nothing')
+    cache.delete(key)
+    return 'round trip ok'
+
+
+def check_storage() -> str:
+    default_storage.exists('health-check')
+    if isinstance(default_storage, FileSystemStorage):
+        location = default_storage.location
+        if os.path.isdir(location) and not os.access(location, os.W_OK):
+            raise RuntimeError(f'{location} is not writable')
+    return 'reachable'
+
+
+def check_tesseract() -> str:
+    try:
+        import pytesseract
+        command = pytesseract.pytesseract.tesseract_cmd
+    except ImportError:
+        command = 'tesseract'
+    path = shutil.which(command)
+    if path is None:
+        raise RuntimeError(f'{command} not found')
+    return path
+
+
+def check_broker() -> str:
+    url = getattr(settings, 'CELERY_BROKER_URL', None)
+    if not url:
+        raise Skipped('no broker configured')
+    try:
+        from kombu import Connection
+    except ImportError:
+        raise Skipped("checking the broker requires the 'kombu' package")
+    with Connection(url, connect_timeout=health_setting('BROKER_TIMEOUT')) as connection:
+        connection.ensure_connection(max_retries=1)
+    return 'reachable'
+
+
+# name -> (check, critical)
+CHECKS: Dict[str, Tuple[Callable[[], str], bool]] = {
+    'database': (check_database, True),
+    'cache': (check_cache, True),
+    'storage': (check_storage, True),
+    'tesseract': (check_tesseract, False),
+    'broker': (check_broker, False),
+}
+
+
+def run_checks() -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name, (check, critical) in CHECKS.items():
+        started = time.perf_counter()
+        try:
+            result = {'status': 'ok', 'detail': check()}
+        except Skipped as e:
+            result = {'status': 'skipped', 'detail': str(e)}
+        except Exception as e:
+            logger.warning("Health check %s failed: %s", name, e)
+            result = {'status': 'failing', 'detail': str(e)}
+        result.update(critical=critical, duration_ms=round((time.perf_counter() - started) * 1000, 1))
+        results[name] = result
+    return results
+
+
+def cached_results() -> Dict[str, Dict[str, Any]]:
+    global _results, _checked_at
+    with _lock:
+        if _results is None or time.monotonic() - _checked_at >= health_setting('CACHE_SECONDS'):
+            _results = run_checks()
+            _checked_at = time.monotonic()
+        return _results
+
+
+def overall_status(results: Dict[str, Dict[str, Any]]) -> str:
+    failing = [result for result in results.values() if result['status'] == 'failing']
+    if any(result['critical'] for result in failing):
+        return 'unhealthy'
+    return 'degraded' if failing else 'healthy'
+
+
+CallbackMetric('health_check_up', 'Last cached health check result (1 ok, 0 failing)', ['check'],
+               lambda: {(name,): int(result['status'] == 'ok') for name, result in cached_results().items()
+                        if result['status'] != 'skipped'})
+
+
+# Async so that under ASGI a probe never waits for a free worker thread behind slow requests
+async def liveness_view(request):
+    return JsonResponse({'status': 'alive', 'version': VERSION})
+
+
+async def readiness_view(request):
+    results = await sync_to_async(cached_results)()
+    state = overall_status(results)
+    return JsonResponse(
+        {'status': state, 'version': VERSION, 'checks': results},
+        status=503 if state == 'unhealthy' else 200,
+    )
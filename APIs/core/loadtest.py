@@ -0,0 +1,273 @@
+"""
+Concurrent request replay against a running server.
+
+A request mix is a JSON-lines file, one entry per line:
+
+    {"name": "patient detail", "method": "GET", "path": "/api/v1/patients/{patient}/", "weight": 10}
+
+with optional "body" (sent as JSON). {patient}, {visit}, {assessment},
+{thread} and {clinician} in a path or body are replaced per request with a
+random id of that kind. A REST-client .http file such as api_test.http
+also loads, one entry per "###" block at weight 1; its URLs are used as
+written, with the host replaced by the target server.
+
+Workers pick entries by weight and send them with httpx over asyncio, so
+one process keeps hundreds of requests in flight. Query counts come from
+the server's own /api/v1/system/profile/ aggregates (core/profiling.py),
+which are reset before the run; they cover one server process, so run
+the target with a single worker when you want them exact.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import Resolver404, resolve
+
+from .profiling import percentile, route_key
+
+PROFILE_PATH = '/api/v1/system/profile/'
+PLACEHOLDER = re.compile(r'\{(patient|visit|assessment|thread|clinician)\}')
+HTTP_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class MixEntry:
+    name: str
+    method: str
+    path: str
+    weight: float = 1.0
+    body: Any = None
+
+    @property
+    def route(self) -> Optional[str]:
+        """The profiling route key this entry hits, for matching server-side query counts"""
+        path = PLACEHOLDER.sub('1', urlsplit(self.path).path)
+        try:
+            return route_key(self.method, resolve(path))
+        except Resolver404:
+            return None
+
+
+@dataclass
+class EndpointResult:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    failures: int = 0  # connection errors and timeouts
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def ms(seconds):
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            'requests': len(ordered) + self.failures,
+            'rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+            'errors': self.failures + sum(count for code, count in self.statuses.items() if code >= 500),
+            'statuses': dict(sorted(self.statuses.items())),
+            'p50_ms': ms(percentile(ordered, 0.50)),
+            'p95_ms': ms(percentile(ordered, 0.95)),
+            'p99_ms': ms(percentile(ordered, 0.99)),
+            'max_ms': ms(ordered[-1] if ordered else None),
+        }
+
+
+def load_mix(path: str) -> List[MixEntry]:
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    entries = _parse_http(text) if path.endswith('.http') else _parse_jsonl(text)
+    if not entries:
+        raise ValueError(f'{path} contains no requests')
+    return entries
+
+
+def _parse_jsonl(text: str) -> List[MixEntry]:
+    entries = []
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        try:
+            entries.append(MixEntry(
+                name=data.get('name') or f"{data['method']} {data['path']}",
+                method=data['method'].upper(),
+                path=data['path'],
+                weight=float(data.get('weight', 1)),
+                body=data.get('body'),
+            ))
+        except KeyError as e:
+            raise ValueError(f'line {number}: missing {e.args[0]!r}')
+    return entries
+
+
+def _parse_http(text: str) -> List[MixEntry]:
+    entries = []
+    for block in re.split(r'^###', text, flags=re.MULTILINE):
+        title, _, rest = block.partition('\n')
+        lines = rest.splitlines()
+        request_line = next((i for i, line in enumerate(lines) if line.split(' ', 1)[0] in HTTP_METHODS), None)
+        if request_line is None:
+            continue
+        method, url = lines[request_line].split()[:2]
+        # Headers run to the first blank line; the body, if any, follows
+        body_lines = []
+        for i in range(request_line + 1, len(lines)):
+            if not lines[i].strip():
+                body_lines = lines[i + 1:]
+                break
+        body_text = '\n'.join(body_lines).strip()
+        parts = urlsplit(url)
+        entries.append(MixEntry(
+            name=title.strip() or f'{method} {parts.path}',
+            method=method,
+            path=parts.path + (f'?{parts.query}' if parts.query else ''),
+            body=json.loads(body_text) if body_text else None,
+        ))
+    return entries
+
+
+def _fill(value, chosen: Dict[str, int], ids: Dict[str, Sequence[int]], rng: random.Random):
+    """Replace placeholders; a kind used twice in one request gets the same id both times"""
+    if isinstance(value, str):
+        def choose(match):
+            kind = match.group(1)
+            if kind not in chosen:
+                chosen[kind] = rng.choice(ids[kind])
+            return str(chosen[kind])
+        return PLACEHOLDER.sub(choose, value)
+    if isinstance(value, dict):
+        return {key: _fill(item, chosen, ids, rng) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, chosen, ids, rng) for item in value]
+    return value
+
+
+def usable_entries(entries: Sequence[MixEntry], ids: Dict[str, Sequence[int]]) -> List[MixEntry]:
+    """Entries whose placeholders all have ids to fill them with"""
+    usable = []
+    for entry in entries:
+        kinds = set(PLACEHOLDER.findall(entry.path + json.dumps(entry.body)))
+        if all(ids.get(kind) for kind in kinds):
+            usable.append(entry)
+    return usable
+
+
+async def _replay(client, entries: Sequence[MixEntry], ids, concurrency: int, duration: float,
+                  total: Optional[int], seed) -> Dict[str, EndpointResult]:
+    results: Dict[str, EndpointResult] = defaultdict(EndpointResult)
+    weights = [entry.weight for entry in entries]
+    deadline = time.perf_counter() + duration
+    remaining = [total]
+
+    async def worker(rng: random.Random):
+        while time.perf_counter() < deadline:
+            if remaining[0] is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            entry = rng.choices(entries, weights)[0]
+            result = results[entry.name]
+            chosen: Dict[str, int] = {}
+            path = _fill(entry.path, chosen, ids, rng)
+            body = _fill(entry.body, chosen, ids, rng) if entry.body is not None else None
+            started = time.perf_counter()
+            try:
+                response = await client.request(entry.method, path, json=body)
+            except Exception:
+                result.failures += 1
+                continue
+            result.latencies.append(time.perf_counter() - started)
+            result.statuses[response.status_code] += 1
+
+    base = random.Random(seed)
+    await asyncio.gather(*(worker(random.Random(base.random())) for _ in range(concurrency)))
+    return results
+
+
+async def _server_profile(client, method: str) -> Optional[Dict[str, Any]]:
+    try:
+        response = await client.request(method, PROFILE_PATH)
+    except Exception:
+        return None
+    if response.status_code != 200:
+        return None
+    return response.json().get('routes', {})
+
+
+async def _run(base_url: str, token: str, entries, ids, concurrency, duration, total, timeout, seed):
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers={'Authorization': f'Bearer {token}'},
+                                 limits=limits, timeout=timeout) as client:
+        await _server_profile(client, 'DELETE')
+        started = time.perf_counter()
+        results = await _replay(client, entries, ids, concurrency, duration, total, seed)
+        elapsed = time.perf_counter() - started
+        routes = await _server_profile(client, 'GET')
+    return results, elapsed, routes
+
+
+def run(base_url: str, token: str, entries: Sequence[MixEntry], ids: Dict[str, Sequence[int]],
+        concurrency: int = 10, duration: float = 30.0, total: Optional[int] = None,
+        timeout: float = 30.0, seed=None) -> Dict[str, Any]:
+    """Replay entries against base_url; returns per-endpoint throughput, latency and query counts"""
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured("Load testing requires the 'httpx' package")
+
+    results, elapsed, routes = asyncio.run(
+        _run(base_url, token, entries, ids, concurrency, duration, total, timeout, seed)
+    )
+    endpoints = {}
+    for entry in entries:
+        if entry.name not in results:
+            continue
+        summary = results[entry.name].summary(elapsed)
+        server = (routes or {}).get(entry.route)
+        summary['avg_queries'] = server['avg_queries'] if server else None
+        endpoints[entry.name] = summary
+    completed = sum(len(result.latencies) for result in results.values())
+    return {
+        'base_url': base_url,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 2),
+        'requests': completed,
+        'rps': round(completed / elapsed, 1) if elapsed else 0.0,
+        'endpoints': endpoints,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2,
+            min_latency_ms: float = 5.0) -> List[str]:
+    """
+    Regressions against a previous run: p95 latency or throughput worse by
+    more than tolerance (latency changes under min_latency_ms are noise),
+    new server errors, or more queries per request. Throughput is only
+    compared between runs at the same concurrency.
+    """
+    regressions = []
+    same_load = current['concurrency'] == baseline.get('concurrency')
+    for name, now in current['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if before is None:
+            continue
+        if now['p95_ms'] is not None and before['p95_ms'] is not None:
+            if now['p95_ms'] > before['p95_ms'] * (1 + tolerance) and now['p95_ms'] - before['p95_ms'] >= min_latency_ms:
+                regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {now['p95_ms']}ms")
+        if same_load and before['rps'] and now['rps'] < before['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['rps']}/s -> {now['rps']}/s")
+        if now['errors'] and not before['errors']:
+            regressions.append(f"{name}: {now['errors']} errors, none in baseline")
+        if now['avg_queries'] is not None and before.get('avg_queries') is not None \
+                and now['avg_queries'] > before['avg_queries'] + 0.5:
+            regressions.append(f"{name}: queries per request {before['avg_queries']} -> {now['avg_queries']}")
+    return regressions
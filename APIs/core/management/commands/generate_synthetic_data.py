@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import synthetic
+
+KINDS = ('visits', 'visit_notes', 'assessments', 'files', 'threads', 'messages')
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create synthetic patients, visits, visit notes, OASIS assessments, uploaded files, "
+        "threads and messages for scale testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=1000)
+        for kind in KINDS:
+            parser.add_argument(
+                f"--{kind.replace('_', '-')}", dest=kind, type=int, default=None,
+                help=f'Defaults to {synthetic.PER_PATIENT[kind]} per patient',
+            )
+        parser.add_argument('--clinicians', type=int, default=None, help='Defaults to 1 per 25 patients')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per bulk_create')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes, each writing its own shard')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for a repeatable dataset')
+        parser.add_argument('--purge', action='store_true', help='Delete previously generated data first')
+
+    def handle(self, *args, **options):
+        if options['patients'] < 1 or options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--patients, --workers and --batch-size must be positive')
+        if options['purge']:
+            deleted = synthetic.purge(options['batch_size'])
+            self.stdout.write('Deleted ' + (', '.join(f'{count} {label}' for label, count in deleted.items()) or 'nothing'))
+
+        patients = options['patients']
+        counts = {
+            'patients': patients,
+            'clinicians': options['clinicians'] or max(1, patients // 25),
+            'batch_size': options['batch_size'],
+        }
+        for kind in KINDS:
+            counts[kind] = options[kind] if options[kind] is not None else patients * synthetic.PER_PATIENT[kind]
+
+        self.stdout.write('Generating ' + ', '.join(f'{counts[kind]} {kind}' for kind in ('patients', *KINDS)))
+        started = time.perf_counter()
+        if options['workers'] > 1:
+            created = synthetic.generate_parallel(options['workers'], seed=options['seed'], **counts)
+        else:
+            ids = synthetic.generate(seed=options['seed'], progress=self._progress(started), **counts)
+            created = {kind: len(pks) for kind, pks in ids.items()}
+        elapsed = time.perf_counter() - started
+
+        total = sum(created.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s): "
+            + ', '.join(f'{count} {kind}' for kind, count in created.items())
+        ))
+
+    def _progress(self, started):
+        def report(kind, count):
+            self.stdout.write(f'  {count} {kind} ({time.perf_counter() - started:.1f}s)')
+        return report
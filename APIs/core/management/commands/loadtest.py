@@ -0,0 +1,142 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import Role
+from authentication.tokens import ClinicianRefreshToken
+from communication.models import CommunicationThread
+from core import loadtest, synthetic
+from oasis.models import OasisAssessment
+from patients.models import Patient
+from visits.models import Visit
+
+DEFAULT_MIX = os.path.join(os.path.dirname(loadtest.__file__), 'loadtest_mix.jsonl')
+SAMPLE_IDS = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted request mix concurrently against a running server and report per-endpoint "
+        "throughput, latency percentiles and queries per request, optionally against a baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to load')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help='Request mix (.jsonl, or an .http file)')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight')
+        parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run')
+        parser.add_argument('--requests', type=int, default=None, help='Stop after this many requests')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+        parser.add_argument('--random-seed', type=int, default=None, help='Seed for data and request choice')
+
+        data = parser.add_argument_group('synthetic data (created through the ORM, so the server must share this database)')
+        data.add_argument('--seed-data', action='store_true', help='Create a synthetic dataset before the run')
+        data.add_argument('--patients', type=int, default=200)
+        data.add_argument('--visits', type=int, default=2000)
+        data.add_argument('--assessments', type=int, default=400)
+        data.add_argument('--threads', type=int, default=200)
+        data.add_argument('--messages', type=int, default=2000)
+
+        parser.add_argument('--output', help='Write results as JSON (usable as a later --baseline)')
+        parser.add_argument('--baseline', help='Results of an earlier run to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95/throughput change against the baseline (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        try:
+            entries = loadtest.load_mix(options['mix'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not load {options['mix']}: {e}")
+
+        if options['seed_data']:
+            created = synthetic.generate(
+                patients=options['patients'], visits=options['visits'], assessments=options['assessments'],
+                threads=options['threads'], messages=options['messages'], seed=options['random_seed'],
+            )
+            self.stdout.write('Created ' + ', '.join(f'{len(pks)} {kind}' for kind, pks in created.items()))
+        ids = self._ids()
+
+        usable = loadtest.usable_entries(entries, ids)
+        for entry in entries:
+            if entry not in usable:
+                self.stdout.write(self.style.WARNING(f'{entry.name}: skipped, no rows to fill {entry.path}'))
+        if not usable:
+            raise CommandError('No runnable requests; create data with --seed-data')
+
+        limit = f"{options['requests']} requests" if options['requests'] else f"{options['duration']}s"
+        self.stdout.write(
+            f"{len(usable)} endpoints, {options['concurrency']} in flight against {options['base_url']} for {limit}"
+        )
+        try:
+            results = loadtest.run(
+                options['base_url'], self._token(), usable, ids,
+                concurrency=options['concurrency'],
+                duration=options['duration'] if not options['requests'] else float('inf'),
+                total=options['requests'], timeout=options['timeout'], seed=options['random_seed'],
+            )
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+        self._report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('concurrency') != results['concurrency']:
+                self.stdout.write(self.style.WARNING(
+                    f"Baseline ran at concurrency {baseline.get('concurrency')}; comparing latency and queries only"
+                ))
+            regressions = loadtest.compare(results, baseline, options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(regression))
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
+
+    def _ids(self):
+        def latest(queryset):
+            return list(queryset.order_by('-pk').values_list('pk', flat=True)[:SAMPLE_IDS])
+
+        return {
+            'patient': latest(Patient.objects.all()),
+            'visit': latest(Visit.objects.all()),
+            'assessment': latest(OasisAssessment.objects.all()),
+            'thread': latest(CommunicationThread.objects.all()),
+            'clinician': latest(get_user_model().objects.exclude(role=Role.ADMIN)),
+        }
+
+    def _token(self) -> str:
+        """An access token for the load test admin, minted directly so the login limit doesn't apply"""
+        user, _ = get_user_model().objects.get_or_create(
+            username=f'{synthetic.USERNAME_PREFIX}loadtest',
+            defaults={'role': Role.ADMIN, 'is_verified': True, 'password': make_password(None)},
+        )
+        return str(ClinicianRefreshToken.for_user(user).access_token)
+
+    def _report(self, results):
+        self.stdout.write(
+            f"\n{results['requests']} requests in {results['elapsed_s']}s, {results['rps']}/s overall\n"
+        )
+        self.stdout.write(
+            f"{'endpoint':<24} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'max ms':>8} {'queries':>8} {'errors':>7}  statuses"
+        )
+
+        def cell(value):
+            return '-' if value is None else value
+
+        for name, stats in sorted(results['endpoints'].items(), key=lambda item: -(item[1]['p95_ms'] or 0)):
+            statuses = ' '.join(f'{code}x{count}' for code, count in stats['statuses'].items())
+            self.stdout.write(
+                f"{name[:24]:<24} {stats['requests']:>7} {stats['rps']:>8} {cell(stats['p50_ms']):>8} "
+                f"{cell(stats['p95_ms']):>8} {cell(stats['p99_ms']):>8} {cell(stats['max_ms']):>8} "
+                f"{cell(stats['avg_queries']):>8} {stats['errors']:>7}  {statuses}"
+            )
@@ -0,0 +1,295 @@
+"""
+Prometheus text-format metrics.
+
+Counters and histograms are updated in place by the code they measure;
+callback gauges are read when /metrics is scraped. Values are per process,
+so scrape every worker (or run one worker per container) and aggregate in
+Prometheus.
+"""
+import math
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from .profiling import QueryRecorder, awatch_request_queries, route_name, watch_request_queries
+from .response_cache import cache_stats
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_DEFAULTS = {
+    'ENABLED': True,
+    # Scrapes must send "Authorization: Bearer <token>"; without one /metrics
+    # is only served when DEBUG is on
+    'TOKEN': '',
+}
+
+REGISTRY: List['Metric'] = []
+
+
+def metrics_setting(name: str):
+    return getattr(settings, 'METRICS', {}).get(name, METRICS_DEFAULTS[name])
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames and self.kind in ('counter', 'gauge'):
+            self._values[()] = 0
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} takes labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(f'{name}{_format_labels(labels)} {_format_value(value)}' for name, labels, value in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class CallbackMetric(Metric):
+    """Values computed at scrape time: callback returns {label values tuple: value}"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 callback: Callable[[], Dict[Tuple[str, ...], float]], kind: str = 'gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self):
+        for key, value in self.callback().items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the block's duration; labels may be updated inside it (e.g. outcome)"""
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+        for key, (counts, total) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f'{self.name}_bucket', {**labels, 'le': _format_value(bound)}, cumulative
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, cumulative
+
+
+def exposition() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# Application metrics
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by method, route and status class',
+    ['method', 'route', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request by method and route',
+    ['method', 'route'], buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250),
+)
+BACKGROUND_TASK_DURATION = Histogram(
+    'background_task_duration_seconds', 'In-process background task duration',
+    ['task', 'outcome'],
+)
+OCR_DURATION = Histogram(
+    'ocr_job_duration_seconds', 'Tesseract OCR duration per image', ['outcome'],
+)
+OCR_IN_PROGRESS = Gauge('ocr_jobs_in_progress', 'OCR jobs currently running in this process')
+AI_GENERATION_DURATION = Histogram(
+    'ai_generation_duration_seconds', 'AI generation latency by kind', ['kind', 'outcome'],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+
+def _response_cache_requests():
+    values = {}
+    for namespace, stats in cache_stats().items():
+        values[(namespace, 'hit')] = stats['hits']
+        values[(namespace, 'miss')] = stats['misses']
+    return values
+
+
+def _response_cache_hit_ratio():
+    return {(namespace,): stats['hit_ratio'] for namespace, stats in cache_stats().items()
+            if stats['hit_ratio'] is not None}
+
+
+def _database_connections():
+    """Server-side connections per state; PostgreSQL only, other backends report none"""
+    values = {}
+    for alias in connections:
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(state, 'unknown'), COUNT(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() GROUP BY 1"
+            )
+            for state, count in cursor.fetchall():
+                values[(alias, state)] = count
+    return values
+
+
+CallbackMetric('response_cache_requests_total', 'Response cache lookups by namespace and outcome',
+               ['namespace', 'outcome'], _response_cache_requests, kind='counter')
+CallbackMetric('response_cache_hit_ratio', 'Response cache hit ratio by namespace', ['namespace'],
+               _response_cache_hit_ratio)
+CallbackMetric('db_connections', 'Database server connections for this database by state',
+               ['alias', 'state'], _database_connections)
+
+
+class MetricsMiddleware:
+    """Observes request latency and query counts for every resolved route
+
+    Queries are counted by the request's QueryRecorder, shared with
+    ProfilingMiddleware when both run, so each query is wrapped once.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not metrics_setting('ENABLED'):
+            return self.get_response(request)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            recorder = watch_request_queries(stack, request)
+            response = self.get_response(request)
+        self._observe(request, response, time.perf_counter() - started, recorder)
+        return response
+
+    async def __acall__(self, request):
+        if not metrics_setting('ENABLED'):
+            return await self.get_response(request)
+        started = time.perf_counter()
+        stack = ExitStack()
+        recorder = await awatch_request_queries(stack, request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self._observe(request, response, time.perf_counter() - started, recorder)
+        return response
+
+    @staticmethod
+    def _observe(request, response, seconds: float, recorder: QueryRecorder) -> None:
+        route = route_name(request.resolver_match)
+        REQUEST_LATENCY.observe(seconds, method=request.method, route=route, status=f'{response.status_code // 100}xx')
+        REQUEST_QUERIES.observe(recorder.count, method=request.method, route=route)
+
+
+def metrics_view(request):
+    token = metrics_setting('TOKEN')
+    if not token and not settings.DEBUG:
+        return HttpResponse('Not Found\n', status=404, content_type=CONTENT_TYPE)
+    if token and request.headers.get('Authorization', '') != f'Bearer {token}':
+        return HttpResponse('Unauthorized\n', status=401, content_type=CONTENT_TYPE)
+    return HttpResponse(exposition(), content_type=CONTENT_TYPE)
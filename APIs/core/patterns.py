@@ -0,0 +1,103 @@
+"""
+Compiled clinical text patterns shared by the OCR extractors and the note
+extraction engine. Kept free of Django and OCR imports so process-pool
+workers can load it cheaply.
+"""
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class PatternSet:
+    """
+    Named patterns compiled individually and as one alternation, so a text
+    can be scanned once for every pattern instead of once per pattern.
+    """
+
+    def __init__(self, patterns: Dict[str, str], flags: int = re.IGNORECASE, word_start: bool = False):
+        self.patterns = {name: re.compile(pattern, flags) for name, pattern in patterns.items()}
+        alternation = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in patterns.items())
+        # When every pattern begins at a word, reject other positions before
+        # trying each alternative; this more than halves scan time on notes
+        prefix = r'\b(?=[a-z])' if word_start else ''
+        self.scanner = re.compile(f'{prefix}(?:{alternation})', flags)
+        # Slice of match.groups() holding each pattern's own capture groups
+        self._slices = {
+            name: slice(self.scanner.groupindex[name], self.scanner.groupindex[name] + self.patterns[name].groups)
+            for name in patterns
+        }
+
+    def values(self, match: re.Match) -> Tuple[Optional[str], ...]:
+        return match.groups()[self._slices[match.lastgroup]]
+
+    def scan(self, text: str) -> Iterator[Tuple[str, re.Match]]:
+        """Yield (pattern name, match) for every non-overlapping hit, left to right"""
+        for match in self.scanner.finditer(text):
+            yield match.lastgroup, match
+
+    def first_values(self, text: str) -> Dict[str, str]:
+        """First captured value for each pattern, found in a single scan"""
+        found = {}
+        for name, match in self.scan(text):
+            if name not in found:
+                found[name] = self.values(match)[0]
+        return found
+
+
+VITAL_SIGN_PATTERNS = {
+    'blood_pressure': r'\b(?:bp|blood pressure)[:\s]*(\d{2,3}\s*/\s*\d{2,3})',
+    'heart_rate': r'\b(?:hr|heart rate|pulse)[:\s]*(\d+)',
+    'temperature': r'\b(?:temp|temperature)[:\s]*(\d+\.?\d*)',
+    'respiratory_rate': r'\b(?:rr|respirations|respiratory rate)[:\s]*(\d+)',
+    'oxygen_saturation': r'\b(?:o2 sat|spo2|o2|oxygen saturation)[:\s]*(\d+)%?',
+    'weight': r'\b(?:weight|wt)[:\s]*(\d+\.?\d*)',
+    'pain': r'\bpain(?: score| level)?[:\s]*(\d+)(?:\s*/\s*10)?',
+}
+
+LAB_VALUE_PATTERNS = {
+    'glucose': r'glucose[:\s]*(\d+\.?\d*)',
+    'hemoglobin': r'\b(?:hgb|hb|hemoglobin)[:\s]*(\d+\.?\d*)',
+    'cholesterol': r'cholesterol[:\s]*(\d+\.?\d*)',
+    'blood_pressure': VITAL_SIGN_PATTERNS['blood_pressure'],
+    'heart_rate': VITAL_SIGN_PATTERNS['heart_rate'],
+}
+
+INSURANCE_PATTERNS = {
+    'policy_number': r'policy[:\s#]*(\w+)',
+    'group_number': r'group[:\s#]*(\w+)',
+    'member_id': r'member[:\s#]*(\w+)',
+}
+
+MEDICATION_PATTERN = r'\b([A-Za-z]+)\s+(\d+(?:\.\d+)?)\s*(mg|mcg|g)\b\s*(?:(daily|bid|tid|qid|prn))?'
+
+ALLERGY_PATTERNS = {
+    'no_known_allergies': r'\b(nkda|nka|no known (?:drug )?allergies)\b',
+    'allergies': r'\ballerg(?:ies|ic to)\b\s*(?:include|are|to)?[:\s-]*([^.;\n]+)',
+}
+
+NOTE_SECTIONS = ('subjective', 'objective', 'assessment', 'plan', 'interventions', 'education', 'goals')
+SECTION_HEADING_PATTERN = r'\b(' + '|'.join(NOTE_SECTIONS) + r')\s*:'
+
+DATE_PATTERN = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}')
+NUMBER_PATTERN = re.compile(r'\d+')
+
+VITAL_SIGNS = PatternSet(VITAL_SIGN_PATTERNS, word_start=True)
+LAB_VALUES = PatternSet(LAB_VALUE_PATTERNS)
+INSURANCE = PatternSet(INSURANCE_PATTERNS)
+MEDICATIONS = re.compile(MEDICATION_PATTERN, re.IGNORECASE)
+
+# Everything a clinical note is mined for, scanned in one pass
+NOTE_SCANNER = PatternSet({
+    'section': SECTION_HEADING_PATTERN,
+    **ALLERGY_PATTERNS,
+    **VITAL_SIGN_PATTERNS,
+    'medication': MEDICATION_PATTERN,
+}, word_start=True)
+
+
+def medication_entry(groups: Tuple[Optional[str], ...]) -> Dict[str, str]:
+    name, dose, unit, frequency = groups
+    return {'name': name, 'dose': dose, 'unit': unit, 'frequency': frequency or 'as directed'}
+
+
+def split_list(text: str) -> List[str]:
+    return [item.strip() for item in re.split(r',|\band\b', text) if item.strip()]
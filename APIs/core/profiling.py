@@ -0,0 +1,317 @@
+"""
+Per-route request timing with SQL accounting and slow-request traces.
+
+ProfilingMiddleware times every request and counts its queries and SQL time
+through a connection execute wrapper, grouping them by method and URL route
+(e.g. "GET api/v1/visits/<int:pk>/"). Each route keeps its most recent
+durations for percentiles. A small random sample of requests, plus the
+next few requests to any route that was just slow, run under a profiler;
+requests over SLOW_REQUEST_MS are kept with that trace, when there is one,
+and the SQL statements they repeated, which is where N+1 queries show up.
+
+Everything is per process, like the response cache counters. Under ASGI
+the middleware runs async: queries are still counted, but no request runs
+under the profiler, since it would trace the event loop rather than the
+request.
+"""
+import cProfile
+import io
+import itertools
+import math
+import pstats
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from typing import Any, Deque, Dict, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+PROFILING_DEFAULTS = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 1000,
+    'SAMPLE_RATE': 0.01,  # share of requests run under the profiler
+    'PROFILER': 'cprofile',  # or 'pyinstrument' (pip install pyinstrument)
+    'ARMED_REQUESTS': 3,  # requests profiled on a route after it was slow without a trace
+    'RESERVOIR_SIZE': 1000,  # recent durations kept per route
+    'SLOW_REQUESTS': 50,  # slow requests kept
+}
+
+_routes: Dict[str, 'RouteStats'] = {}
+_slow: Deque[Dict[str, Any]] = deque()
+_armed: Counter = Counter()
+_ids = itertools.count(1)
+_lock = threading.Lock()
+
+
+def profiling_setting(name: str):
+    return getattr(settings, 'PROFILING', {}).get(name, PROFILING_DEFAULTS[name])
+
+
+def percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.max_seconds = 0.0
+        self.durations: Deque[float] = deque(maxlen=profiling_setting('RESERVOIR_SIZE'))
+
+    def add(self, seconds: float, queries: int, sql_seconds: float, status_code: int) -> None:
+        self.requests += 1
+        self.errors += status_code >= 500
+        self.queries += queries
+        self.sql_seconds += sql_seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.durations.append(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.durations)
+
+        def ms(seconds):
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'p50_ms': ms(percentile(ordered, 0.50)),
+            'p95_ms': ms(percentile(ordered, 0.95)),
+            'p99_ms': ms(percentile(ordered, 0.99)),
+            'max_ms': ms(self.max_seconds),
+            'avg_queries': round(self.queries / self.requests, 1),
+            'avg_sql_ms': ms(self.sql_seconds / self.requests),
+        }
+
+
+class QueryRecorder:
+    """Execute wrapper counting queries, SQL time and repeats of each statement"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+
+class _CProfiler:
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def report(self) -> str:
+        stream = io.StringIO()
+        pstats.Stats(self._profile, stream=stream).sort_stats('cumulative').print_stats(40)
+        return stream.getvalue()
+
+
+class _Pyinstrument:
+    def __init__(self):
+        from pyinstrument import Profiler
+        self._profile = Profiler(async_mode='disabled')
+
+    def start(self):
+        self._profile.start()
+
+    def stop(self):
+        self._profile.stop()
+
+    def report(self) -> str:
+        return self._profile.output_text()
+
+
+PROFILERS = {'cprofile': _CProfiler, 'pyinstrument': _Pyinstrument}
+
+
+def route_name(match) -> str:
+    route = (match.route or match.view_name) if match is not None else None
+    return route or '<unresolved>'
+
+
+def route_key(method: str, match) -> str:
+    return f'{method} {route_name(match)}'
+
+
+def _should_profile(route: Optional[str]) -> bool:
+    if random.random() < profiling_setting('SAMPLE_RATE'):
+        return True
+    if route is not None:
+        with _lock:
+            if _armed[route] > 0:
+                _armed[route] -= 1
+                return True
+    return False
+
+
+def record(route: str, request, response, seconds: float, recorder: QueryRecorder, profiler=None) -> None:
+    with _lock:
+        stats = _routes.get(route)
+        if stats is None:
+            stats = _routes[route] = RouteStats()
+        stats.add(seconds, recorder.count, recorder.seconds, response.status_code)
+
+    if seconds * 1000 < profiling_setting('SLOW_REQUEST_MS'):
+        return
+    entry = {
+        'id': next(_ids),
+        'route': route,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'duration_ms': round(seconds * 1000, 1),
+        'queries': recorder.count,
+        'sql_ms': round(recorder.seconds * 1000, 1),
+        'repeated_queries': [
+            {'sql': sql, 'count': count} for sql, count in recorder.statements.most_common(5) if count > 1
+        ],
+        'profile': profiler.report() if profiler is not None else None,
+        'recorded_at': time.time(),
+    }
+    with _lock:
+        _slow.append(entry)
+        while len(_slow) > profiling_setting('SLOW_REQUESTS'):
+            _slow.popleft()
+        if profiler is None:
+            _armed[route] = profiling_setting('ARMED_REQUESTS')
+
+
+def route_stats() -> Dict[str, Dict[str, Any]]:
+    """Aggregates for this process, slowest p95 first"""
+    with _lock:
+        summaries = {route: stats.summary() for route, stats in _routes.items()}
+    return dict(sorted(summaries.items(), key=lambda item: item[1]['p95_ms'] or 0, reverse=True))
+
+
+def slow_requests(include_profile: bool = False) -> List[Dict[str, Any]]:
+    with _lock:
+        entries = list(reversed(_slow))
+    if include_profile:
+        return entries
+    return [{**entry, 'profile': entry['profile'] is not None} for entry in entries]
+
+
+def slow_request(entry_id: int) -> Optional[Dict[str, Any]]:
+    with _lock:
+        return next((entry for entry in _slow if entry['id'] == entry_id), None)
+
+
+def reset() -> None:
+    with _lock:
+        _routes.clear()
+        _slow.clear()
+        _armed.clear()
+
+
+def watch_queries(stack: ExitStack, wrapper) -> None:
+    """Install an execute wrapper on this thread's connections until stack closes"""
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+
+
+async def awatch_queries(stack: ExitStack, wrapper) -> None:
+    # Connections are per thread, and an async request's queries (sync views
+    # included) run in its sync_to_async thread, so the wrapper goes there;
+    # close the stack with sync_to_async(stack.close) for the same reason
+    await sync_to_async(watch_queries)(stack, wrapper)
+
+
+def watch_request_queries(stack: ExitStack, request) -> QueryRecorder:
+    """The request's QueryRecorder; the first middleware to ask installs it and owns stack"""
+    recorder = getattr(request, '_query_recorder', None)
+    if recorder is None:
+        recorder = request._query_recorder = QueryRecorder()
+        watch_queries(stack, recorder)
+    return recorder
+
+
+async def awatch_request_queries(stack: ExitStack, request) -> QueryRecorder:
+    recorder = getattr(request, '_query_recorder', None)
+    if recorder is None:
+        recorder = request._query_recorder = QueryRecorder()
+        await awatch_queries(stack, recorder)
+    return recorder
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        name = profiling_setting('PROFILER')
+        if name not in PROFILERS:
+            raise ImproperlyConfigured(f"PROFILING['PROFILER'] must be one of {', '.join(PROFILERS)}")
+        if name == 'pyinstrument':
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise ImproperlyConfigured("PROFILING['PROFILER'] = 'pyinstrument' requires the 'pyinstrument' package")
+        self.profiler_class = PROFILERS[name]
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not profiling_setting('ENABLED'):
+            return self.get_response(request)
+
+        # The route is only known after resolving; use the path to pick up armed routes
+        profiler = self.profiler_class() if _should_profile(self._armed_route(request)) else None
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            recorder = watch_request_queries(stack, request)
+            if profiler is not None:
+                profiler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+        record(route_key(request.method, request.resolver_match), request, response, time.perf_counter() - started, recorder, profiler)
+        return response
+
+    async def __acall__(self, request):
+        if not profiling_setting('ENABLED'):
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        stack = ExitStack()
+        recorder = await awatch_request_queries(stack, request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        record(route_key(request.method, request.resolver_match), request, response, time.perf_counter() - started, recorder)
+        return response
+
+    @staticmethod
+    def _armed_route(request) -> Optional[str]:
+        if not _armed:
+            return None
+        try:
+            return route_key(request.method, resolve(request.path_info))
+        except Resolver404:
+            return None
@@ -0,0 +1,228 @@
+"""
+Rate limiting and load shedding for expensive endpoints.
+
+Views opt in with @rate_limited('<class>'), naming an endpoint class from
+settings.RATE_LIMIT['CLASSES']. For those requests RateLimitMiddleware
+takes a token from the caller's bucket for that class (one bucket per user,
+or per IP for anonymous callers) and a slot from the class's per-process
+concurrency cap, answering 429 or 503 with Retry-After when either is
+exhausted. Unmarked endpoints pass straight through, so cheap reads cost
+nothing extra under overload.
+
+Buckets live in Redis when the configured cache is Django's RedisCache,
+updated atomically by a Lua script, and in process memory otherwise or
+while Redis is unreachable.
+"""
+import logging
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.http import JsonResponse
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.jwt import ClaimsJWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    # RATE requests per PERIOD seconds, bursting to BURST; CONCURRENCY
+    # requests of the class at once per process (0 for no cap)
+    'CLASSES': {
+        'ocr': {'RATE': 6, 'PERIOD': 60, 'BURST': 3, 'CONCURRENCY': 2},
+        'ai': {'RATE': 10, 'PERIOD': 60, 'BURST': 5, 'CONCURRENCY': 4},
+        'bulk': {'RATE': 5, 'PERIOD': 60, 'BURST': 2, 'CONCURRENCY': 2},
+    },
+}
+
+RATE_LIMIT_ATTR = 'rate_limit_class'
+
+# Refill, then take one token if there is one. Returns {allowed, seconds
+# until a token is available}; the wait is a string because Lua numbers
+# come back from Redis truncated to integers.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed, wait = 0, (1 - tokens) / rate
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed, wait = 1, 0
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+
+def rate_limit_setting(name: str):
+    return getattr(settings, 'RATE_LIMIT', {}).get(name, RATE_LIMIT_DEFAULTS[name])
+
+
+def rate_limited(endpoint_class: str):
+    """
+    Mark a view, view method or viewset action as belonging to endpoint_class.
+    For @api_view functions apply it above @api_view.
+    """
+    def decorator(view):
+        setattr(view, RATE_LIMIT_ATTR, endpoint_class)
+        return view
+    return decorator
+
+
+def endpoint_class_for(view_func, method: str) -> Optional[str]:
+    """The endpoint class a resolved view was marked with, if any"""
+    marked = getattr(view_func, RATE_LIMIT_ATTR, None)
+    cls = getattr(view_func, 'cls', None)
+    if marked or cls is None:
+        return marked
+    # DRF views: the handler for this method, or the view class itself
+    actions = getattr(view_func, 'actions', None)
+    handler_name = actions.get(method.lower()) if actions else method.lower()
+    handler = getattr(cls, handler_name or '', None)
+    return getattr(handler, RATE_LIMIT_ATTR, None) or getattr(cls, RATE_LIMIT_ATTR, None)
+
+
+class LocalBuckets:
+    """In-process token buckets, used without Redis or while it is down"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, capacity: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return True, 0.0
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > 100000:
+                # Full buckets carry no state worth keeping
+                self._buckets = {
+                    k: (t, u) for k, (t, u) in self._buckets.items() if t + (now - u) * rate < capacity
+                }
+            return False, (1 - tokens) / rate
+
+
+_local_buckets = LocalBuckets()
+_scripts = {}
+_slots: Dict[str, threading.BoundedSemaphore] = {}
+_slots_lock = threading.Lock()
+
+
+def _take_redis(cache: RedisCache, key: str, rate: float, capacity: float, now: float) -> Tuple[bool, float]:
+    key = cache.make_and_validate_key(key)
+    client = cache._cache.get_client(key, write=True)
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts[id(client)] = client.register_script(TOKEN_BUCKET_SCRIPT)
+    allowed, wait = script(keys=[key], args=[rate, capacity, now])
+    return bool(int(allowed)), float(wait)
+
+
+def take_token(endpoint_class: str, identity: str) -> Tuple[bool, float]:
+    """Take a token from identity's bucket for endpoint_class; returns (allowed, retry_after)"""
+    config = rate_limit_setting('CLASSES')[endpoint_class]
+    rate = config['RATE'] / config['PERIOD']
+    capacity = max(1, config['BURST'])
+    key = f'ratelimit:{endpoint_class}:{identity}'
+    now = time.time()
+    cache = caches[rate_limit_setting('CACHE_ALIAS')]
+    if isinstance(cache, RedisCache):
+        try:
+            return _take_redis(cache, key, rate, capacity, now)
+        except Exception:
+            logger.warning("Rate limit store unavailable, using local buckets", exc_info=True)
+    return _local_buckets.take(key, rate, capacity, now)
+
+
+def _slot(endpoint_class: str) -> Optional[threading.BoundedSemaphore]:
+    limit = rate_limit_setting('CLASSES')[endpoint_class].get('CONCURRENCY', 0)
+    if not limit:
+        return None
+    with _slots_lock:
+        if endpoint_class not in _slots:
+            _slots[endpoint_class] = threading.BoundedSemaphore(limit)
+        return _slots[endpoint_class]
+
+
+def _identity(request) -> str:
+    """The caller's user id from a valid bearer token, else their IP"""
+    authentication = ClaimsJWTAuthentication()
+    header = authentication.get_header(request)
+    try:
+        raw_token = authentication.get_raw_token(header) if header else None
+        if raw_token is not None:
+            token = authentication.get_validated_token(raw_token)
+            return f'user:{token[api_settings.USER_ID_CLAIM]}'
+    except (AuthenticationFailed, InvalidToken, KeyError):
+        pass
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def _retry_response(message: str, status: int, retry_after: float) -> JsonResponse:
+    response = JsonResponse({'error': message}, status=status)
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+class RateLimitMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self._release(request)
+
+    async def __acall__(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            self._release(request)
+
+    @staticmethod
+    def _release(request) -> None:
+        slot = getattr(request, '_rate_limit_slot', None)
+        if slot is not None:
+            slot.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not rate_limit_setting('ENABLED'):
+            return None
+        endpoint_class = endpoint_class_for(view_func, request.method)
+        if endpoint_class is None or request.method == 'OPTIONS':
+            return None
+
+        allowed, retry_after = take_token(endpoint_class, _identity(request))
+        if not allowed:
+            return _retry_response('Rate limit exceeded', 429, retry_after)
+
+        slot = _slot(endpoint_class)
+        if slot is not None:
+            if not slot.acquire(blocking=False):
+                return _retry_response('Server busy, please retry', 503, 1)
+            request._rate_limit_slot = slot
+        return None
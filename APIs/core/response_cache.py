@@ -0,0 +1,142 @@
+import functools
+import hashlib
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+VARY_OPTIONS = ('global', 'role', 'user')
+
+# Used whenever the configured cache (usually Redis) errors, so an outage
+# degrades to per-process caching instead of failing requests
+_fallback = LocMemCache('response-cache-fallback', {})
+
+_stats: Dict[str, Counter] = defaultdict(Counter)
+_stats_lock = threading.Lock()
+_connected = set()
+
+
+def _config(name: str, default=None):
+    return getattr(settings, 'RESPONSE_CACHE', {}).get(name, default)
+
+
+def _call(method: str, *args, **kwargs):
+    try:
+        return getattr(caches[_config('ALIAS', 'default')], method)(*args, **kwargs)
+    except ValueError:
+        # incr on a missing key; not a backend failure
+        raise
+    except Exception:
+        logger.warning("Response cache backend unavailable, using local memory", exc_info=True)
+        return getattr(_fallback, method)(*args, **kwargs)
+
+
+def _generation_key(namespace: str, object_id=None) -> str:
+    return f'respcache:{namespace}:gen' + (f':{object_id}' if object_id is not None else '')
+
+
+def _bump(key: str) -> None:
+    try:
+        _call('incr', key)
+    except ValueError:
+        _call('set', key, 1, None)
+
+
+def invalidate(namespace: str, object_id=None) -> None:
+    """Expire cached responses for a namespace, or for one object within it"""
+    _bump(_generation_key(namespace, object_id))
+
+
+def _record(namespace: str, outcome: str) -> None:
+    with _stats_lock:
+        _stats[namespace][outcome] += 1
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters for this process, per namespace"""
+    with _stats_lock:
+        return {
+            namespace: {
+                'hits': counts['hit'],
+                'misses': counts['miss'],
+                'hit_ratio': round(counts['hit'] / (counts['hit'] + counts['miss']), 3)
+                if counts['hit'] + counts['miss'] else None,
+            }
+            for namespace, counts in sorted(_stats.items())
+        }
+
+
+def _connect(model, namespace: str, per_object: bool) -> None:
+    uid = f'response_cache_{namespace}_{model._meta.label_lower}'
+    if uid in _connected:
+        return
+    _connected.add(uid)
+
+    def handler(sender, instance, **kwargs):
+        invalidate(namespace, instance.pk if per_object else None)
+
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'{uid}_save')
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f'{uid}_delete')
+
+
+def _cache_key(namespace: str, request, vary: str, generations: Iterable[int]) -> str:
+    if vary == 'user':
+        scope = f'u{request.user.pk}'
+    elif vary == 'role':
+        scope = f"r{getattr(request.user, 'role', '')}"
+    else:
+        scope = 'g'
+    query = '&'.join(f'{key}={value}' for key, value in sorted(request.query_params.items()))
+    digest = hashlib.sha1(f'{request.path}?{query}'.encode()).hexdigest()
+    return f"respcache:{namespace}:{'.'.join(map(str, generations))}:{scope}:{digest}"
+
+
+def cache_response(namespace: str, models: Iterable = (), vary: str = 'global',
+                   timeout: Optional[int] = None, object_kwarg: Optional[str] = None):
+    """
+    Cache successful GET responses of an APIView method.
+
+    vary picks who shares an entry: everyone ('global'), users with the same
+    role ('role') or only the requesting user ('user'). Saving or deleting
+    any of models expires the namespace; with object_kwarg only entries for
+    the saved instance (matched on that URL kwarg) expire.
+    """
+    if vary not in VARY_OPTIONS:
+        raise ValueError(f"vary must be one of {VARY_OPTIONS}")
+    for model in models:
+        _connect(model, namespace, per_object=object_kwarg is not None)
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            if request.method != 'GET' or not _config('ENABLED', True):
+                return view_method(view, request, *args, **kwargs)
+
+            generation_keys = [_generation_key(namespace)]
+            if object_kwarg:
+                generation_keys.append(_generation_key(namespace, kwargs.get(object_kwarg)))
+            current = _call('get_many', generation_keys)
+            key = _cache_key(namespace, request, vary, [current.get(k, 0) for k in generation_keys])
+
+            cached = _call('get', key)
+            if cached is not None:
+                _record(namespace, 'hit')
+                return Response(cached['data'], status=cached['status'], headers={'X-Cache': 'HIT'})
+
+            _record(namespace, 'miss')
+            response = view_method(view, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                _call('set', key, {'status': response.status_code, 'data': response.data},
+                      timeout if timeout is not None else _config('TIMEOUT', 300))
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
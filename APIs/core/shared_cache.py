@@ -0,0 +1,8 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared_cache(alias: str = 'default') -> bool:
+    """Whether every worker process sees the same cache (not LocMemCache or DummyCache)"""
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
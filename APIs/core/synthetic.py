@@ -0,0 +1,569 @@
+"""
+Synthetic clinical data for load tests and benchmarks.
+
+Rows are written with bulk_create in batches, so model save() overrides and
+signals (change capture, sync history, cache invalidation) do not run;
+the data exists to be read. What those would have derived and reads
+depend on is written here instead: assessment completion counters come
+from a generated complete_data, and completed visits get their normalized
+vital readings and daily/weekly rollups. purge() deletes the same way.
+Every generated patient's MRN starts with MRN_PREFIX and every generated
+user's username with USERNAME_PREFIX, so purge() can remove a dataset
+without touching real records.
+
+Activity is skewed the way a real census is: a few patients account for
+many visits, files and threads while most have a handful. Uploaded files
+all point at a small set of sample images under SAMPLE_DIR instead of
+writing one image per row.
+
+generate_parallel() splits a dataset into shards, one per worker process;
+each shard gets its own clinicians and patients, so shards never reference
+each other's rows.
+"""
+import io
+import itertools
+import random
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import Avg, Count, Max, Min, Q
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from authentication.models import Role
+from communication.models import CommunicationThread, Message, MessageReadStatus
+from file_management.models import FileCategory, UploadedFile
+from oasis.models import OasisAssessment, OasisDraftPatch
+from patients.models import Patient
+from sync.models import SyncMutation
+from visits.models import (
+    Visit, VisitNote, VisitTransition, VitalSign, VitalSignRollup, VoiceChunk, VoiceSession,
+)
+from visits.vitals import parse_vitals
+
+MRN_PREFIX = 'SYN'
+USERNAME_PREFIX = 'synthetic-'
+SAMPLE_DIR = 'synthetic'
+
+# Rows per patient when only a patient count is given, roughly a 60-day
+# home health episode with a recertification
+PER_PATIENT = {
+    'visits': 12,
+    'visit_notes': 18,
+    'assessments': 3,
+    'files': 2,
+    'threads': 1,
+    'messages': 6,
+}
+
+FIRST_NAMES = (
+    'Mary', 'Patricia', 'Linda', 'Barbara', 'Dorothy', 'Margaret', 'Ruth', 'Helen', 'Betty', 'Joan',
+    'James', 'Robert', 'John', 'William', 'Richard', 'Charles', 'Donald', 'George', 'Frank', 'Walter',
+)
+LAST_NAMES = (
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee',
+)
+STREETS = ('Main St', 'Oak Ave', 'Maple Dr', 'Cedar Ln', 'Elm St', 'Park Rd', 'Pine St', 'Lakeview Dr')
+DIAGNOSES = (
+    'Congestive heart failure', 'COPD', 'Diabetes mellitus type 2', 'Hypertension',
+    'Status post hip replacement', 'Status post CVA', 'Pneumonia, resolving', 'Chronic kidney disease stage 3',
+    'Pressure ulcer, sacral', 'Osteoarthritis of knee',
+)
+ALLERGIES = ('', '', '', 'Penicillin', 'Sulfa', 'Latex', 'Codeine')
+MEDICATIONS = (
+    'Metformin 500mg BID', 'Lisinopril 10mg daily', 'Furosemide 40mg daily', 'Atorvastatin 20mg nightly',
+    'Metoprolol 25mg BID', 'Warfarin 5mg daily', 'Albuterol inhaler PRN',
+)
+COMPLAINTS = ('Shortness of breath', 'Fatigue', 'Pain at incision site', 'Dizziness', 'Swelling in legs', '')
+MESSAGE_LINES = (
+    'Patient tolerated visit well, vitals within normal limits.',
+    'Weight up 3 lbs since last visit, please advise on diuretic dose.',
+    'Wound bed shows granulation tissue, continuing current dressing orders.',
+    'Caregiver reports patient missed two doses this week.',
+    'Requesting order for PT evaluation after fall at home.',
+    'BP 168/94 on recheck, patient asymptomatic.',
+)
+
+# Visits skew towards nursing and towards the past, like a live census
+VISIT_TYPES = ('SN', 'PT', 'OT', 'ST', 'MSW', 'HHA')
+VISIT_TYPE_WEIGHTS = (55, 20, 10, 5, 3, 7)
+VISIT_STATUSES = ('completed', 'scheduled', 'in_progress', 'cancelled', 'no_show')
+VISIT_STATUS_WEIGHTS = (70, 20, 3, 5, 2)
+ASSESSMENT_TYPES = ('SOC', 'ROC', 'RECERT', 'FU', 'TRANSFER', 'DC')
+ASSESSMENT_TYPE_WEIGHTS = (35, 10, 25, 15, 5, 10)
+CLINICIAN_ROLES = (Role.NURSE, Role.NURSE, Role.NURSE, Role.PHYSICAL_THERAPIST,
+                   Role.OCCUPATIONAL_THERAPIST, Role.PHYSICIAN)
+NOTE_TYPES = ('unstructured', 'structured', 'voice_transcript', 'ai_generated')
+NOTE_TYPE_WEIGHTS = (50, 30, 12, 8)
+NOTE_LINES = (
+    'Patient alert and oriented x3, ambulating with walker.',
+    'Lungs with crackles at bases bilaterally, 2+ pitting edema to ankles.',
+    'Wound measures 2.1 x 1.4 cm, no drainage, edges approximated.',
+    'Reviewed medication schedule with patient and caregiver, verbalized understanding.',
+    'Completed 15 minutes of gait training and transfer practice.',
+    'Blood glucose 182 fasting, patient reports dietary indiscretion.',
+    'Home safety evaluation completed, recommended grab bars in bathroom.',
+)
+# (category, MIME type, text drawn on the sample image)
+SAMPLE_FILES = (
+    (FileCategory.LAB_RESULTS, 'image/png', ('LAB RESULTS', 'Glucose 182 mg/dL', 'HbA1c 7.9 %', 'Creatinine 1.4 mg/dL')),
+    (FileCategory.PRESCRIPTIONS, 'image/png', ('Rx', 'Furosemide 40 mg daily', 'Lisinopril 10 mg daily')),
+    (FileCategory.FORMS, 'image/png', ('PLAN OF CARE', 'SN 2W4, PT 2W3', 'Diagnosis: CHF')),
+    (FileCategory.INSURANCE, 'image/png', ('MEDICARE', 'Member ID 1EG4TE5MK72', 'Part A effective 01/2020')),
+    (FileCategory.IMAGING, 'image/png', ('CHEST X-RAY', 'Mild cardiomegaly', 'No acute infiltrate')),
+    (FileCategory.OTHER, 'image/png', ('NOTE', 'Caregiver contact updated',)),
+)
+FILE_CATEGORY_WEIGHTS = (35, 20, 20, 10, 10, 5)
+# complete_data sections as (title, ((question id, OasisAssessment field), ...))
+OASIS_SECTIONS = (
+    ('Functional status', (
+        ('M1800', 'grooming'), ('M1810', 'dressing_upper'), ('M1820', 'dressing_lower'), ('M1830', 'bathing'),
+        ('M1840', 'toileting'), ('M1850', 'transferring'), ('M1860', 'ambulation'), ('M1870', 'feeding'),
+    )),
+    ('Cognitive status', (('M1700', 'cognitive_functioning'),)),
+    ('Diagnoses', (('M1021', 'primary_diagnosis'),)),
+)
+OASIS_QUESTION_COUNT = sum(len(questions) for _, questions in OASIS_SECTIONS)
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bulk_create(model, objects: Iterable, batch_size: int, on_batch: Callable[[List], None] = None) -> List[int]:
+    """Insert objects in batches; on_batch gets each created batch inside its transaction"""
+    ids = []
+    for batch in batched(objects, batch_size):
+        with transaction.atomic():
+            created = model.objects.bulk_create(batch)
+            if on_batch is not None:
+                on_batch(created)
+            ids.extend(obj.pk for obj in created)
+    return ids
+
+
+def _skewed(ids: Sequence[int], rng: random.Random, sigma: float = 0.75) -> Callable[[], int]:
+    """Picker weighting each id by a lognormal draw, so activity is heavy-tailed"""
+    cum_weights = list(itertools.accumulate(rng.lognormvariate(0, sigma) for _ in ids))
+    return lambda: rng.choices(ids, cum_weights=cum_weights)[0]
+
+
+def _phone(rng: random.Random) -> str:
+    return f'555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}'
+
+
+def create_clinicians(count: int, rng: random.Random, batch_size: int = 1000) -> List[int]:
+    run = uuid.uuid4().hex[:8]
+    password = make_password(None)
+    users = (
+        get_user_model()(
+            username=f'{USERNAME_PREFIX}{run}-{i}',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            role=rng.choice(CLINICIAN_ROLES),
+            password=password,
+            is_verified=True,
+        )
+        for i in range(count)
+    )
+    return _bulk_create(get_user_model(), users, batch_size)
+
+
+def create_patients(count: int, clinician_ids: Sequence[int], rng: random.Random,
+                    batch_size: int = 1000) -> List[int]:
+    run = uuid.uuid4().hex[:6].upper()
+    today = date.today()
+
+    def patient(i):
+        last_name = rng.choice(LAST_NAMES)
+        return Patient(
+            mrn=f'{MRN_PREFIX}{run}{i:09d}',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=last_name,
+            # Home health census is mostly Medicare age
+            date_of_birth=today - timedelta(days=int(rng.triangular(55, 100, 80) * 365.25)),
+            gender=rng.choice('MF'),
+            phone=_phone(rng),
+            address=f'{rng.randint(1, 9999)} {rng.choice(STREETS)}, Springfield, IL 627{rng.randint(0, 99):02d}',
+            emergency_contact_name=f'{rng.choice(FIRST_NAMES)} {last_name}',
+            emergency_contact_phone=_phone(rng),
+            primary_diagnosis=rng.choice(DIAGNOSES),
+            secondary_diagnoses=', '.join(rng.sample(DIAGNOSES, rng.randint(0, 3))),
+            allergies=rng.choice(ALLERGIES),
+            medications=', '.join(rng.sample(MEDICATIONS, rng.randint(1, 4))),
+            insurance_provider=rng.choice(('Medicare', 'Medicare', 'Medicare', 'Medicaid', 'Humana', 'Aetna')),
+            insurance_id=f'{rng.randint(10 ** 9, 10 ** 10 - 1)}A',
+            assigned_physician_id=rng.choice(clinician_ids) if clinician_ids else None,
+            created_by_id=rng.choice(clinician_ids) if clinician_ids else None,
+        )
+
+    return _bulk_create(Patient, (patient(i) for i in range(count)), batch_size)
+
+
+def create_visits(count: int, patient_ids: Sequence[int], clinician_ids: Sequence[int],
+                  rng: random.Random, batch_size: int = 1000) -> List[int]:
+    now = timezone.now()
+    pick_patient = _skewed(patient_ids, rng)
+
+    def visit():
+        status = rng.choices(VISIT_STATUSES, VISIT_STATUS_WEIGHTS)[0]
+        days = rng.randint(1, 14) if status == 'scheduled' else -rng.randint(0, 365)
+        scheduled = now + timedelta(days=days, minutes=rng.randint(-240, 240))
+        started = scheduled if status in ('completed', 'in_progress') else None
+        return Visit(
+            patient_id=pick_patient(),
+            clinician_id=rng.choice(clinician_ids),
+            visit_type=rng.choices(VISIT_TYPES, VISIT_TYPE_WEIGHTS)[0],
+            status=status,
+            scheduled_date=scheduled,
+            start_time=started,
+            end_time=started + timedelta(minutes=rng.randint(20, 90)) if status == 'completed' else None,
+            chief_complaint=rng.choice(COMPLAINTS),
+            vital_signs={
+                'blood_pressure': f'{rng.randint(100, 170)}/{rng.randint(60, 100)}',
+                'heart_rate': rng.randint(55, 110),
+                'temperature': round(rng.uniform(97.0, 100.4), 1),
+                'oxygen_saturation': rng.randint(88, 100),
+            } if status == 'completed' else {},
+        )
+
+    return _bulk_create(Visit, (visit() for _ in range(count)), batch_size, _create_visit_vitals)
+
+
+def _create_visit_vitals(visits: List[Visit]) -> None:
+    """The normalized readings sync_visit_vitals() would store for each visit"""
+    VitalSign.objects.bulk_create([
+        VitalSign(patient_id=visit.patient_id, visit_id=visit.pk, recorded_at=visit.start_time or visit.scheduled_date,
+                  metric=metric, value=value)
+        for visit in visits
+        for metric, value in parse_vitals(visit.vital_signs)
+    ])
+
+
+def create_vital_rollups(patient_ids: Sequence[int], batch_size: int = 1000) -> int:
+    """Daily and weekly rollups of the patients' readings, aggregated in the database"""
+    created = 0
+    for chunk in batched(patient_ids, batch_size):
+        for period, truncate in (('day', TruncDate), ('week', TruncWeek)):
+            buckets = (
+                VitalSign.objects.filter(patient_id__in=chunk)
+                .values('patient_id', 'metric', bucket=truncate('recorded_at'))
+                .annotate(count=Count('id'), min_value=Min('value'), max_value=Max('value'), mean_value=Avg('value'))
+                .order_by()
+            )
+            rollups = [
+                VitalSignRollup(
+                    patient_id=row['patient_id'], metric=row['metric'], period=period,
+                    period_start=row['bucket'].date() if period == 'week' else row['bucket'],
+                    count=row['count'], min_value=row['min_value'], max_value=row['max_value'],
+                    mean_value=row['mean_value'],
+                )
+                for row in buckets
+            ]
+            with transaction.atomic():
+                created += len(VitalSignRollup.objects.bulk_create(rollups, batch_size=batch_size))
+    return created
+
+
+def create_visit_notes(count: int, visit_ids: Sequence[int], clinician_ids: Sequence[int],
+                       rng: random.Random, batch_size: int = 1000) -> List[int]:
+    def note():
+        note_type = rng.choices(NOTE_TYPES, NOTE_TYPE_WEIGHTS)[0]
+        return VisitNote(
+            visit_id=rng.choice(visit_ids),
+            note_type=note_type,
+            title=note_type.replace('_', ' ').capitalize() + ' note',
+            content=' '.join(rng.sample(NOTE_LINES, rng.randint(1, 4))),
+            structured_data={
+                'pain_level': rng.randint(0, 10),
+                'fall_risk': rng.choice(('low', 'moderate', 'high')),
+            } if note_type == 'structured' else {},
+            created_by_id=rng.choice(clinician_ids),
+        )
+
+    return _bulk_create(VisitNote, (note() for _ in range(count)), batch_size)
+
+
+def sample_files() -> List[Tuple[str, str, str, int, str]]:
+    """
+    Save the sample images once; returns (category, MIME type, storage
+    name, size, text) for each
+    """
+    samples = []
+    for category, mime_type, lines in SAMPLE_FILES:
+        name = f'{SAMPLE_DIR}/sample-{category}.png'
+        if not default_storage.exists(name):
+            image = Image.new('L', (480, 40 + 28 * len(lines)), color=255)
+            draw = ImageDraw.Draw(image)
+            for i, line in enumerate(lines):
+                draw.text((24, 20 + 28 * i), line, fill=0)
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG', optimize=True)
+            name = default_storage.save(name, ContentFile(buffer.getvalue()))
+        samples.append((category, mime_type, name, default_storage.size(name), '\n'.join(lines)))
+    return samples
+
+
+def create_files(count: int, patient_ids: Sequence[int], clinician_ids: Sequence[int],
+                 rng: random.Random, batch_size: int = 1000) -> List[int]:
+    samples = sample_files()
+    pick_patient = _skewed(patient_ids, rng)
+
+    def uploaded_file():
+        category, mime_type, name, size, text = rng.choices(samples, FILE_CATEGORY_WEIGHTS)[0]
+        processed = rng.random() < 0.7
+        return UploadedFile(
+            patient_id=pick_patient(),
+            uploaded_by_id=rng.choice(clinician_ids),
+            file=name,
+            original_filename=f'{category}-{rng.randint(1000, 9999)}.png',
+            file_size=size,
+            file_type=mime_type,
+            category=category,
+            ocr_text=text if processed else '',
+            is_processed=processed,
+            processing_status='completed' if processed else rng.choice(('pending', 'pending', 'failed')),
+        )
+
+    return _bulk_create(UploadedFile, (uploaded_file() for _ in range(count)), batch_size)
+
+
+def create_assessments(count: int, patient_ids: Sequence[int], clinician_ids: Sequence[int],
+                       rng: random.Random, batch_size: int = 1000) -> List[int]:
+    patients = dict(Patient.objects.filter(pk__in=set(patient_ids)).values_list('pk', 'gender'))
+    today = date.today()
+
+    def assessment():
+        patient_id = rng.choice(patient_ids)
+        completed = rng.random() < 0.8
+        assessment = OasisAssessment(
+            patient_id=patient_id,
+            clinician_id=rng.choice(clinician_ids),
+            assessment_type=rng.choices(ASSESSMENT_TYPES, ASSESSMENT_TYPE_WEIGHTS)[0],
+            assessment_date=today - timedelta(days=rng.randint(0, 365)),
+            gender='F' if patients.get(patient_id) == 'F' else 'M',
+            primary_diagnosis=rng.choice(DIAGNOSES),
+            grooming=rng.randint(0, 3),
+            dressing_upper=rng.randint(0, 3),
+            dressing_lower=rng.randint(0, 3),
+            bathing=rng.randint(0, 3),
+            toileting=rng.randint(0, 3),
+            transferring=rng.randint(0, 3),
+            ambulation=rng.randint(0, 3),
+            feeding=rng.randint(0, 3),
+            cognitive_functioning=rng.randint(0, 4),
+            is_completed=completed,
+        )
+        answered = None if completed else rng.randint(1, OASIS_QUESTION_COUNT - 1)
+        assessment.complete_data = _complete_data(assessment, answered)
+        assessment.refresh_completion()
+        return assessment
+
+    return _bulk_create(OasisAssessment, (assessment() for _ in range(count)), batch_size)
+
+
+def _complete_data(assessment: OasisAssessment, answered=None) -> Dict:
+    """OASIS_SECTIONS answered from the assessment's fields, only the first answered questions when given"""
+    remaining = OASIS_QUESTION_COUNT if answered is None else answered
+    sections = []
+    for title, questions in OASIS_SECTIONS:
+        items = []
+        for question_id, field in questions:
+            items.append({'id': question_id, 'answer': getattr(assessment, field) if remaining > 0 else None})
+            remaining -= 1
+        sections.append({'title': title, 'questions': items})
+    return {'sections': sections}
+
+
+def create_threads(count: int, patient_ids: Sequence[int], clinician_ids: Sequence[int],
+                   rng: random.Random, batch_size: int = 1000) -> List[int]:
+    pick_patient = _skewed(patient_ids, rng)
+    threads = (
+        CommunicationThread(
+            patient_id=pick_patient(),
+            subject=rng.choice(('Care coordination', 'Medication question', 'Wound care update',
+                                'Physician orders', 'Discharge planning')),
+            created_by_id=rng.choice(clinician_ids),
+            is_urgent=rng.random() < 0.05,
+            is_closed=rng.random() < 0.3,
+        )
+        for _ in range(count)
+    )
+    return _bulk_create(CommunicationThread, threads, batch_size)
+
+
+def create_messages(count: int, thread_ids: Sequence[int], clinician_ids: Sequence[int],
+                    rng: random.Random, batch_size: int = 1000) -> List[int]:
+    pick_thread = _skewed(thread_ids, rng, sigma=1.5)
+    messages = (
+        Message(
+            thread_id=pick_thread(),
+            sender_id=rng.choice(clinician_ids),
+            message_type=rng.choices(
+                ('general', 'status_report', 'physician_update', 'care_plan', 'urgent_alert'), (50, 25, 12, 10, 3)
+            )[0],
+            content=' '.join(rng.sample(MESSAGE_LINES, rng.randint(1, 3))),
+        )
+        for _ in range(count)
+    )
+    return _bulk_create(Message, messages, batch_size)
+
+
+def generate(patients: int = 100, visits: int = 1000, assessments: int = 200, threads: int = 100,
+             messages: int = 1000, clinicians: int = 20, visit_notes: int = 0, files: int = 0,
+             batch_size: int = 1000, seed=None, progress: Callable[[str, int], None] = None) -> Dict[str, List[int]]:
+    """Create a dataset of the given size; returns the new primary keys by kind"""
+    rng = random.Random(seed)
+    ids: Dict[str, List[int]] = {}
+
+    def step(kind, create, *args):
+        ids[kind] = create(*args, rng, batch_size)
+        if progress is not None:
+            progress(kind, len(ids[kind]))
+
+    step('clinicians', create_clinicians, max(1, clinicians))
+    step('patients', create_patients, max(1, patients), ids['clinicians'])
+    step('visits', create_visits, visits, ids['patients'], ids['clinicians'])
+    create_vital_rollups(ids['patients'], batch_size)
+    if visit_notes and ids['visits']:
+        step('visit_notes', create_visit_notes, visit_notes, ids['visits'], ids['clinicians'])
+    step('assessments', create_assessments, assessments, ids['patients'], ids['clinicians'])
+    if files:
+        step('files', create_files, files, ids['patients'], ids['clinicians'])
+    step('threads', create_threads, threads, ids['patients'], ids['clinicians'])
+    if ids['threads']:
+        step('messages', create_messages, messages, ids['threads'], ids['clinicians'])
+    return ids
+
+
+def _generate_shard(counts: Dict[str, int]) -> Dict[str, int]:
+    try:
+        return {kind: len(pks) for kind, pks in generate(**counts).items()}
+    finally:
+        connections.close_all()
+
+
+def _split(total: int, parts: int, index: int) -> int:
+    return total // parts + (1 if index < total % parts else 0)
+
+
+def generate_parallel(workers: int, seed=None, **counts) -> Dict[str, int]:
+    """
+    generate() across worker processes, each creating an independent shard;
+    returns row counts by kind. On SQLite the workers take turns at the
+    write lock, so this only pays off on PostgreSQL.
+    """
+    shards = []
+    for index in range(workers):
+        shard = {kind: _split(value, workers, index) for kind, value in counts.items() if kind != 'batch_size'}
+        shard.update(batch_size=counts.get('batch_size', 1000), seed=None if seed is None else seed + index)
+        if shard['patients']:
+            shards.append(shard)
+    sample_files()  # once, before the workers race to create them
+    # Children must open their own connections rather than inherit ours
+    connections.close_all()
+    totals: Counter = Counter()
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        for shard_counts in pool.map(_generate_shard, shards):
+            totals.update(shard_counts)
+    return dict(totals)
+
+
+def _purge_plan() -> List[Tuple[object, object]]:
+    """(manager, queryset) pairs to delete, children before the rows they reference"""
+    User = get_user_model()
+    patients = Patient.objects.filter(mrn__startswith=MRN_PREFIX)
+    users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+    # Everything Django's cascade would reach from those rows
+    visits = Visit.objects.filter(Q(patient__in=patients) | Q(clinician__in=users))
+    notes = VisitNote.objects.filter(Q(visit__in=visits) | Q(created_by__in=users))
+    sessions = VoiceSession.objects.filter(Q(visit__in=visits) | Q(created_by__in=users))
+    files = UploadedFile.objects.filter(Q(patient__in=patients) | Q(uploaded_by__in=users))
+    assessments = OasisAssessment.objects.filter(Q(patient__in=patients) | Q(clinician__in=users))
+    threads = CommunicationThread.objects.filter(Q(patient__in=patients) | Q(created_by__in=users))
+    messages = Message.objects.filter(Q(thread__in=threads) | Q(sender__in=users))
+    return [
+        (VoiceChunk, VoiceChunk.objects.filter(session__in=sessions)),
+        (VoiceSession, sessions),
+        (VitalSign, VitalSign.objects.filter(Q(patient__in=patients) | Q(visit__in=visits) | Q(source_file__in=files))),
+        (VitalSignRollup, VitalSignRollup.objects.filter(patient__in=patients)),
+        (VisitTransition, VisitTransition.objects.filter(visit__in=visits)),
+        (VisitNote, notes),
+        (OasisDraftPatch, OasisDraftPatch.objects.filter(Q(assessment__in=assessments) | Q(created_by__in=users))),
+        (OasisAssessment, assessments),
+        (MessageReadStatus, MessageReadStatus.objects.filter(Q(message__in=messages) | Q(user__in=users))),
+        (Message.read_by.through, Message.read_by.through.objects.filter(Q(message__in=messages) | Q(user__in=users))),
+        (Message, messages),
+        (CommunicationThread.participants.through, CommunicationThread.participants.through.objects.filter(
+            Q(communicationthread__in=threads) | Q(user__in=users))),
+        (CommunicationThread, threads),
+        (UploadedFile, files),
+        (Visit, visits),
+        (SyncMutation, SyncMutation.objects.filter(user__in=users)),
+        (LogEntry, LogEntry.objects.filter(user__in=users)),
+        (Patient, patients),
+        (User.groups.through, User.groups.through.objects.filter(user__in=users)),
+        (User.user_permissions.through, User.user_permissions.through.objects.filter(user__in=users)),
+        (User, users),
+    ]
+
+
+def _raw_delete(queryset, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        with transaction.atomic():
+            deleted += queryset.model.objects.filter(pk__in=pks)._raw_delete(queryset.db)
+
+
+def purge(batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Delete every generated patient and user, the rows hanging off them, and
+    the sample images; returns row counts by model.
+
+    Like generation, this bypasses delete() and signals: rows are removed
+    children first, batch_size primary keys at a time, without loading them
+    or writing sync tombstones and change events. Real rows that merely point
+    at a generated user or note are kept with the reference cleared, as
+    their SET_NULL foreign keys would. Each batch commits on its own, so an
+    interrupted purge is finished by running it again.
+    """
+    users = get_user_model().objects.filter(username__startswith=USERNAME_PREFIX)
+    with transaction.atomic():
+        Patient.objects.filter(Q(assigned_physician__in=users) & ~Q(mrn__startswith=MRN_PREFIX)).update(assigned_physician=None)
+        Patient.objects.filter(Q(created_by__in=users) & ~Q(mrn__startswith=MRN_PREFIX)).update(created_by=None)
+        VisitTransition.objects.filter(actor__in=users).update(actor=None)
+        VisitTransition.objects.filter(clinician__in=users).update(clinician=None)
+        VoiceSession.objects.filter(
+            Q(note__created_by__in=users) | Q(note__visit__clinician__in=users)
+            | Q(note__visit__patient__mrn__startswith=MRN_PREFIX)
+        ).update(note=None)
+
+    deleted = {}
+    for model, queryset in _purge_plan():
+        count = _raw_delete(queryset, batch_size)
+        if count:
+            deleted[model._meta.label] = count
+    for category, _, _ in SAMPLE_FILES:
+        default_storage.delete(f'{SAMPLE_DIR}/sample-{category}.png')
+    return deleted
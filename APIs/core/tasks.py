@@ -0,0 +1,58 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .metrics import BACKGROUND_TASK_DURATION, CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2),
+                thread_name_prefix='background-task',
+            )
+    return _executor
+
+
+def queued_tasks() -> int:
+    """Tasks submitted but not yet picked up by a worker thread"""
+    return _executor._work_queue.qsize() if _executor is not None else 0
+
+
+CallbackMetric('background_tasks_queued', 'Background tasks waiting for a worker thread', [],
+               lambda: {(): queued_tasks()})
+
+
+def _run(fn: Callable, args, kwargs) -> None:
+    with BACKGROUND_TASK_DURATION.time(task=getattr(fn, '__name__', str(fn)), outcome='ok') as labels:
+        try:
+            fn(*args, **kwargs)
+        except Exception:
+            labels['outcome'] = 'error'
+            logger.exception("Background task %s failed", getattr(fn, '__name__', fn))
+        finally:
+            # Worker threads outlive requests, so never leave a connection open
+            connections.close_all()
+
+
+def enqueue(fn: Callable, *args, **kwargs) -> None:
+    """
+    Run fn(*args, **kwargs) in the in-process worker pool once the current
+    transaction commits, so the task never sees uncommitted rows.
+    BACKGROUND_TASKS_EAGER runs it inline instead (handy for scripts).
+    """
+    if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+        transaction.on_commit(lambda: _run(fn, args, kwargs))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run, fn, args, kwargs))
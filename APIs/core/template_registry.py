@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.signals import post_delete, post_save
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateValidationError(ValueError):
+    """Raised by a compile function when a stored template is unusable"""
+
+
+@dataclass
+class CompiledTemplates:
+    """Serialized, validated templates for one lookup plus their ETag"""
+    data: List[Dict[str, Any]]
+    etag: str
+    generation: int
+    compiled_at: float
+
+
+class TemplateRegistry:
+    """
+    Process-local cache of compiled templates for a template model.
+
+    Templates are loaded, validated and serialized once per lookup and kept in
+    memory. Saving or deleting a template bumps a generation counter in the
+    shared Django cache, which invalidates every worker's copy when that cache
+    is shared (Redis). With a per-process cache, other workers pick changes up
+    once TEMPLATE_REGISTRY_TTL expires.
+    """
+
+    def __init__(self, name: str, model, serializer_class, data_field: str,
+                 compile_template: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.name = name
+        self.model = model
+        self.serializer_class = serializer_class
+        self.data_field = data_field
+        self.compile_template = compile_template
+        self._entries: Dict[tuple, CompiledTemplates] = {}
+        self._lock = threading.Lock()
+
+        post_save.connect(self._on_change, sender=model, weak=False, dispatch_uid=f'template_registry_save_{name}')
+        post_delete.connect(self._on_change, sender=model, weak=False, dispatch_uid=f'template_registry_delete_{name}')
+
+    @property
+    def _generation_key(self):
+        return f'template_registry:{self.name}:generation'
+
+    def _current_generation(self) -> int:
+        return cache.get(self._generation_key, 0)
+
+    def _valid(self, filters: Dict[str, Any]) -> bool:
+        """Whether every filter value is one of its field's choices"""
+        for name, value in filters.items():
+            choices = self.model._meta.get_field(name).choices
+            if choices and value not in {choice for choice, _ in choices}:
+                return False
+        return True
+
+    def get(self, **filters) -> CompiledTemplates:
+        """Return compiled active templates matching filters"""
+        generation = self._current_generation()
+        if not self._valid(filters):
+            # Values come from the URL; nothing can match them, and caching them would let
+            # clients grow _entries without bound
+            return self._package([], generation)
+
+        key = tuple(sorted(filters.items()))
+        ttl = getattr(settings, 'TEMPLATE_REGISTRY_TTL', 300)
+
+        entry = self._entries.get(key)
+        if entry and entry.generation == generation and time.monotonic() - entry.compiled_at < ttl:
+            return entry
+
+        entry = self._compile(filters, generation)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _compile(self, filters: Dict[str, Any], generation: int) -> CompiledTemplates:
+        templates = self.model.objects.filter(is_active=True, **filters).order_by('id')
+        data = []
+        for item in self.serializer_class(templates, many=True).data:
+            if self.compile_template:
+                try:
+                    item['compiled'] = self.compile_template(item[self.data_field])
+                except TemplateValidationError as e:
+                    logger.warning("Skipping invalid %s template %s: %s", self.name, item.get('id'), e)
+                    continue
+            data.append(item)
+        return self._package(data, generation)
+
+    def _package(self, data: List[Dict[str, Any]], generation: int) -> CompiledTemplates:
+        payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode()
+        etag = f'"{self.name}-{generation}-{hashlib.sha1(payload).hexdigest()[:16]}"'
+        return CompiledTemplates(data=data, etag=etag, generation=generation, compiled_at=time.monotonic())
+
+    def invalidate(self):
+        """Drop local entries and tell other workers to recompile"""
+        with self._lock:
+            self._entries.clear()
+        try:
+            cache.incr(self._generation_key)
+        except ValueError:
+            cache.set(self._generation_key, 1, timeout=None)
+
+    def _on_change(self, sender, **kwargs):
+        self.invalidate()
+
+
+def template_response(request, entry: CompiledTemplates, data=None) -> Response:
+    """Serve compiled templates, answering 304 when the client already has them"""
+    if_none_match = request.headers.get('If-None-Match', '')
+    client_tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    if entry.etag in client_tags or if_none_match.strip() == '*':
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': entry.etag})
+    return Response(entry.data if data is None else data, headers={'ETag': entry.etag})
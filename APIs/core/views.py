@@ -0,0 +1,46 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .profiling import reset, route_stats, slow_request, slow_requests
+from .response_cache import cache_stats
+
+
+class ResponseCacheStatsView(APIView):
+    """Response cache hit/miss counters for the worker serving the request"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'admin':
+            return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'namespaces': cache_stats()})
+
+
+class RequestProfileView(APIView):
+    """Per-route latency percentiles and recent slow requests for the worker serving the request"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'admin':
+            return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'routes': route_stats(), 'slow_requests': slow_requests()})
+
+    def delete(self, request):
+        if request.user.role != 'admin':
+            return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+        reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SlowRequestView(APIView):
+    """One captured slow request with its profile and repeated queries"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, entry_id):
+        if request.user.role != 'admin':
+            return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+        entry = slow_request(entry_id)
+        if entry is None:
+            return Response({'error': 'Slow request not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(entry)
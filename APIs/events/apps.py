@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class EventsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'events'
+
+    def ready(self):
+        from django.apps import apps
+        from django.db.models.signals import post_delete, post_save
+        from .capture import CAPTURED_MODELS, on_delete, on_save
+
+        for label in CAPTURED_MODELS:
+            model = apps.get_model(label)
+            post_save.connect(on_save, sender=model, dispatch_uid=f'events_save_{label}')
+            post_delete.connect(on_delete, sender=model, dispatch_uid=f'events_delete_{label}')
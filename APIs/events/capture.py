@@ -0,0 +1,77 @@
+"""
+Change data capture for clinical models.
+
+Saves and deletes are recorded as ChangeEvent rows by signal handlers that
+run inside the writing transaction. Code that writes with QuerySet.update()
+or bulk_update() bypasses signals and calls record_updates() itself.
+"""
+from typing import Any, Dict, Iterable, Optional
+
+from django.db import router, transaction
+from django.db.models.fields.files import FieldFile
+
+from .models import ChangeEvent, ChangeOperation
+
+# Model label -> entity name used in events
+CAPTURED_MODELS = {
+    'patients.Patient': 'patients',
+    'visits.Visit': 'visits',
+    'visits.VisitNote': 'visit_notes',
+    'oasis.OasisAssessment': 'oasis_assessments',
+    'file_management.UploadedFile': 'files',
+    'communication.Message': 'messages',
+}
+
+
+class ChangeCaptureMixin:
+    """
+    Runs save() in a transaction so the post_save event row commits or
+    rolls back together with the change, even under autocommit.
+    """
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+def _attnames(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def snapshot(instance) -> Dict[str, Any]:
+    data = {}
+    for attname in _attnames(type(instance)):
+        value = getattr(instance, attname)
+        data[attname] = value.name if isinstance(value, FieldFile) else value
+    return data
+
+
+def _event(model, object_id, operation: str, changed_fields: Iterable[str] = (), data: Optional[dict] = None):
+    return ChangeEvent(
+        entity=CAPTURED_MODELS[model._meta.label],
+        object_id=object_id,
+        operation=operation,
+        changed_fields=sorted(changed_fields),
+        data=data,
+    )
+
+
+def on_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    operation = ChangeOperation.CREATE if created else ChangeOperation.UPDATE
+    _event(sender, instance.pk, operation, update_fields or (), snapshot(instance)).save()
+
+
+def on_delete(sender, instance, **kwargs):
+    _event(sender, instance.pk, ChangeOperation.DELETE).save()
+
+
+def record_updates(model, ids: Iterable[int], fields: Iterable[str]) -> None:
+    """Record update events for rows written without save(); call inside the writing transaction"""
+    fields = list(fields)
+    rows = model.objects.filter(pk__in=list(ids)).values(*_attnames(model))
+    ChangeEvent.objects.bulk_create([
+        _event(model, row[model._meta.pk.attname], ChangeOperation.UPDATE, fields, row) for row in rows
+    ])
@@ -0,0 +1,73 @@
+"""
+Reading the change event log from an offset.
+
+Sequence numbers are assigned at insert but become visible at commit, so a
+lower number can appear after a higher one was read. Reads therefore stop
+at a gap in the sequence until it is older than GAP_GRACE_SECONDS; after
+that the gap is taken to be a rolled-back transaction and skipped.
+"""
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ChangeEvent, EventConsumer
+
+CHANGE_EVENT_DEFAULTS = {
+    'PAGE_SIZE': 500,
+    'GAP_GRACE_SECONDS': 30,
+}
+
+EVENT_FIELDS = ('id', 'entity', 'object_id', 'operation', 'changed_fields', 'data', 'occurred_at')
+
+
+def events_setting(name: str):
+    return getattr(settings, 'CHANGE_EVENTS', {}).get(name, CHANGE_EVENT_DEFAULTS[name])
+
+
+def read_events(after: int = 0, limit: Optional[int] = None,
+                entities: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """
+    Up to limit events after sequence number after, the offset to read from
+    next, and whether more events are already waiting. With entities, other
+    events are skipped but still advance the offset.
+    """
+    limit = limit or events_setting('PAGE_SIZE')
+    rows = list(
+        ChangeEvent.objects.filter(id__gt=after).order_by('id').values(*EVENT_FIELDS)[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    settled = timezone.now() - timedelta(seconds=events_setting('GAP_GRACE_SECONDS'))
+
+    events, offset = [], after
+    for row in rows[:limit]:
+        if row['id'] != offset + 1 and row['occurred_at'] > settled:
+            # An earlier transaction may still commit into this gap
+            has_more = True
+            break
+        offset = row['id']
+        if not entities or row['entity'] in entities:
+            events.append({'sequence': row.pop('id'), **row})
+    return events, offset, has_more
+
+
+def consume(name: str, handler: Callable[[List[Dict[str, Any]]], None], batch_size: Optional[int] = None) -> int:
+    """
+    Feed events after the named consumer's offset to handler in batches,
+    saving the offset after each batch. A failing handler leaves the offset
+    at the last completed batch, so delivery is at least once.
+    """
+    consumer, _ = EventConsumer.objects.get_or_create(name=name)
+    processed = 0
+    while True:
+        events, offset, has_more = read_events(consumer.position, batch_size)
+        if offset == consumer.position:
+            return processed
+        if events:
+            handler(events)
+            processed += len(events)
+        EventConsumer.objects.filter(pk=consumer.pk).update(position=offset, updated_at=timezone.now())
+        consumer.position = offset
+        if not has_more:
+            return processed
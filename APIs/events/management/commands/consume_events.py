@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from events.log import consume
+
+
+class Command(BaseCommand):
+    help = "Feed new change events to a handler, tracking the offset under a consumer name"
+
+    def add_arguments(self, parser):
+        parser.add_argument('consumer', help='Name the offset is stored under')
+        parser.add_argument('handler', help='Dotted path to a callable taking a list of events')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--follow', action='store_true', help='Keep polling for new events')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls with --follow')
+
+    def handle(self, *args, **options):
+        handler = import_string(options['handler'])
+        while True:
+            processed = consume(options['consumer'], handler, options['batch_size'])
+            if processed or not options['follow']:
+                self.stdout.write(self.style.SUCCESS(f"{options['consumer']}: {processed} events processed"))
+            if not options['follow']:
+                return
+            time.sleep(options['interval'])
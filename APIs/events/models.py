@@ -0,0 +1,41 @@
+from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class ChangeOperation(models.TextChoices):
+    CREATE = 'create', 'Create'
+    UPDATE = 'update', 'Update'
+    DELETE = 'delete', 'Delete'
+
+
+class ChangeEvent(models.Model):
+    """
+    Append-only outbox row written in the same transaction as the change it
+    describes. The id is the event's sequence number.
+    """
+    id = models.BigAutoField(primary_key=True)
+    entity = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    operation = models.CharField(max_length=10, choices=ChangeOperation.choices)
+    changed_fields = models.JSONField(default=list, blank=True)  # empty when the whole row was written
+    data = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)  # row after the change
+    occurred_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['entity', 'object_id'], name='change_event_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.operation} {self.entity} {self.object_id}"
+
+
+class EventConsumer(models.Model):
+    """Offset of a named downstream consumer in the change event log"""
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
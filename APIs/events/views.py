@@ -0,0 +1,29 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .log import events_setting, read_events
+
+
+class ChangeEventListView(APIView):
+    """Change events after ?after=<sequence>, oldest first, for downstream consumers"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'admin':
+            return Response({'error': 'Admin access required'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            after = int(request.query_params.get('after', 0))
+            limit = int(request.query_params.get('limit', events_setting('PAGE_SIZE')))
+        except ValueError:
+            return Response({'error': 'after and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if after < 0 or not 1 <= limit <= events_setting('PAGE_SIZE'):
+            return Response(
+                {'error': f"after must be >= 0 and limit between 1 and {events_setting('PAGE_SIZE')}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entities = [e for e in request.query_params.get('entity', '').split(',') if e]
+        events, next_offset, has_more = read_events(after, limit, entities)
+        return Response({'events': events, 'next_offset': next_offset, 'has_more': has_more})
@@ -0,0 +1,9 @@
+from .models import UploadedFile
+
+
+def visible_files(user):
+    """Uploaded files the user may see: physicians their assigned patients' files, everyone else all files"""
+    if user.role == 'physician':
+        # By id, so a claims-only user is never loaded (and async callers never touch the ORM here)
+        return UploadedFile.objects.filter(patient__assigned_physician_id=user.id)
+    return UploadedFile.objects.all()
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file_management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='uploadedfile',
+            index=models.Index(fields=['updated_at', 'id'], name='uploaded_file_sync_idx'),
+        ),
+    ]
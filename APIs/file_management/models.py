@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from events.capture import ChangeCaptureMixin
 from patients.models import Patient
 import uuid
 import os
@@ -21,7 +22,7 @@ class FileCategory(models.TextChoices):
     OTHER = 'other', 'Other'
 
 
-class UploadedFile(models.Model):
+class UploadedFile(ChangeCaptureMixin, models.Model):
     patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='files')
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     
@@ -51,6 +52,9 @@ class UploadedFile(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='uploaded_file_sync_idx'),
+        ]
 
     def __str__(self):
         return f"{self.patient.full_name} - {self.original_filename}"
@@ -4,9 +4,11 @@ from rest_framework.response import Response
 from django.core.files.storage import default_storage
 from django.conf import settings
 import os
-from .models import UploadedFile
+from .access import visible_files
 from .serializers import FileUploadSerializer, OCRRequestSerializer
 from .ocr_utils import OCRProcessor
+from visits.vitals import sync_file_vitals
+from core.ratelimit import rate_limited
 
 
 class FileUploadViewSet(viewsets.ModelViewSet):
@@ -15,14 +17,7 @@ class FileUploadViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter files based on user permissions"""
-        user = self.request.user
-        if user.role == 'admin':
-            return UploadedFile.objects.all()
-        elif user.role == 'physician':
-            return UploadedFile.objects.filter(patient__assigned_physician=user)
-        else:
-            # Nurses and other staff can see files for all patients
-            return UploadedFile.objects.all()
+        return visible_files(self.request.user)
 
     def create(self, request, *args, **kwargs):
         """Upload a new file"""
@@ -68,11 +63,15 @@ class FileUploadViewSet(viewsets.ModelViewSet):
             file_instance.processing_status = 'completed'
             file_instance.save()
             
+            if data_type == 'vital_signs':
+                sync_file_vitals(file_instance, structured_data)
+            
         except Exception as e:
             file_instance.processing_status = 'failed'
             file_instance.structured_data = {'error': str(e)}
             file_instance.save()
 
+    @rate_limited('ocr')
     @action(detail=True, methods=['post'])
     def process_ocr(self, request, pk=None):
         """Manually trigger OCR processing for a file"""
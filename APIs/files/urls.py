@@ -27,7 +27,7 @@ urlpatterns = [
     
     # Document management
     path('documents/<int:document_id>/', views.DocumentDetailView.as_view(), name='document_detail'),
-    path('documents/<int:document_id>/download/', views.DocumentDownloadView.as_view(), name='document_download'),
+    path('documents/<int:document_id>/download/', views.document_download, name='document_download'),
     path('documents/<int:document_id>/preview/', views.DocumentPreviewView.as_view(), name='document_preview'),
     path('documents/<int:document_id>/thumbnail/', views.DocumentThumbnailView.as_view(), name='document_thumbnail'),
     
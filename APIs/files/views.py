@@ -1,7 +1,14 @@
 from rest_framework import generics, status, permissions, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from core.async_views import (
+    async_api_view, async_view_setting, error_response, is_asgi, json_response, release_connections
+)
+from file_management.access import visible_files
+from file_management.models import FileCategory, UploadedFile
 
 
 class DocumentViewSet(viewsets.ModelViewSet):
@@ -274,17 +281,46 @@ class DocumentDetailView(APIView):
         }, status=status.HTTP_200_OK)
 
 
-class DocumentDownloadView(APIView):
-    """
-    Handle document downloads.
-    """
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get(self, request, document_id):
-        return Response({
-            'message': f'Document download endpoint for document {document_id} - implement document download',
-            'status': 'placeholder'
-        }, status=status.HTTP_200_OK)
+async def _chunks(handle, chunk_size):
+    # Storage reads don't need the ORM's thread, so they run in parallel
+    read = sync_to_async(handle.read, thread_sensitive=False)
+    try:
+        while chunk := await read(chunk_size):
+            yield chunk
+    finally:
+        await sync_to_async(handle.close, thread_sensitive=False)()
+
+
+@async_api_view(['GET'])
+async def document_download(request, document_id):
+    """
+    Stream an uploaded document. Under ASGI the file is read in chunks
+    without holding a worker thread; under WSGI it is handed to the
+    server's file wrapper.
+    """
+    try:
+        document = await visible_files(request.user).only(
+            'id', 'file', 'original_filename', 'file_type'
+        ).aget(pk=document_id)
+    except UploadedFile.DoesNotExist:
+        return json_response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    await release_connections()
+
+    try:
+        handle = await sync_to_async(document.file.open, thread_sensitive=False)('rb')
+        size = await sync_to_async(lambda: document.file.size, thread_sensitive=False)()
+    except OSError:
+        return error_response('File is missing from storage', status.HTTP_404_NOT_FOUND)
+
+    if is_asgi(request):
+        response = StreamingHttpResponse(
+            _chunks(handle, async_view_setting('DOWNLOAD_CHUNK_SIZE')), content_type=document.file_type
+        )
+        response['Content-Length'] = str(size)
+    else:
+        response = FileResponse(handle, content_type=document.file_type)
+    response['Content-Disposition'] = content_disposition_header(True, document.original_filename)
+    return response
 
 
 class DocumentPreviewView(APIView):
@@ -321,8 +357,7 @@ class FileCategoryListView(APIView):
     
     def get(self, request):
         return Response({
-            'message': 'File category list endpoint - implement category listing',
-            'categories': []
+            'categories': [{'code': code, 'name': name} for code, name in FileCategory.choices]
         }, status=status.HTTP_200_OK)
 
 
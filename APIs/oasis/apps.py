@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class OasisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'oasis'
+
+    def ready(self):
+        # Connects template registry invalidation signals
+        from . import registry  # noqa: F401
@@ -0,0 +1,48 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+# OasisAssessment columns maintained from complete_data
+COMPLETION_FIELDS = ('total_questions', 'answered_questions', 'completion_percentage')
+
+# Completion bands for filtering pending assessments on the stored percentage
+COMPLETION_BANDS = {
+    'not_started': {'completion_percentage': 0},
+    'in_progress': {'completion_percentage__gt': 0, 'completion_percentage__lt': 50},
+    'nearly_complete': {'completion_percentage__gte': 50, 'completion_percentage__lt': 100},
+    'ready': {'completion_percentage__gte': 100},
+}
+
+
+def is_answered(question: Dict[str, Any]) -> bool:
+    """A question counts as answered once it carries a non-null answer"""
+    return isinstance(question, dict) and question.get('answer') is not None
+
+
+def count_section(section: Dict[str, Any]) -> Tuple[int, int]:
+    """Return (total, answered) question counts for a single section"""
+    questions = section.get('questions', []) if isinstance(section, dict) else []
+    total = len(questions)
+    answered = sum(1 for question in questions if is_answered(question))
+    return total, answered
+
+
+def count_questions(complete_data: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+    """Return (total, answered) question counts for a complete_data payload"""
+    if not isinstance(complete_data, dict):
+        return 0, 0
+    return count_sections(complete_data.get('sections', []))
+
+
+def count_sections(sections: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+    """Return (total, answered) question counts across several sections"""
+    total = answered = 0
+    for section in sections:
+        section_total, section_answered = count_section(section)
+        total += section_total
+        answered += section_answered
+    return total, answered
+
+
+def calculate_percentage(total: int, answered: int) -> float:
+    """Completion percentage rounded the way the detail serializer always has"""
+    return round((answered / total) * 100, 2) if total > 0 else 0
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:26
+
+from django.db import migrations, models
+
+
+def backfill_completion(apps, schema_editor):
+    from oasis.completion import count_questions, calculate_percentage
+
+    OasisAssessment = apps.get_model('oasis', 'OasisAssessment')
+    batch = []
+    for assessment in OasisAssessment.objects.only('id', 'complete_data').iterator(chunk_size=500):
+        total, answered = count_questions(assessment.complete_data)
+        assessment.total_questions = total
+        assessment.answered_questions = answered
+        assessment.completion_percentage = calculate_percentage(total, answered)
+        batch.append(assessment)
+        if len(batch) >= 500:
+            OasisAssessment.objects.bulk_update(
+                batch, ['total_questions', 'answered_questions', 'completion_percentage']
+            )
+            batch = []
+    if batch:
+        OasisAssessment.objects.bulk_update(
+            batch, ['total_questions', 'answered_questions', 'completion_percentage']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oasis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oasisassessment',
+            name='answered_questions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='oasisassessment',
+            name='completion_percentage',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='oasisassessment',
+            name='total_questions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='oasisassessment',
+            index=models.Index(fields=['is_completed', 'completion_percentage'], name='oasis_completion_idx'),
+        ),
+        migrations.RunPython(backfill_completion, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('oasis', '0002_oasisassessment_completion_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oasisassessment',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='OasisDraftPatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('patch_format', models.CharField(choices=[('json-patch', 'JSON Patch'), ('merge-patch', 'JSON Merge Patch')], max_length=20)),
+                ('patch', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='draft_patches', to='oasis.oasisassessment')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['assessment', 'version'],
+                'unique_together': {('assessment', 'version')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oasis', '0003_assessment_version_draft_patch'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='oasisassessment',
+            index=models.Index(fields=['updated_at', 'id'], name='oasis_sync_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
+from events.capture import ChangeCaptureMixin
 from patients.models import Patient
+from .completion import COMPLETION_FIELDS, count_questions, calculate_percentage
 
 
 class OasisAssessmentType(models.TextChoices):
@@ -12,7 +14,7 @@ class OasisAssessmentType(models.TextChoices):
     DISCHARGE = 'DC', 'Discharge'
 
 
-class OasisAssessment(models.Model):
+class OasisAssessment(ChangeCaptureMixin, models.Model):
     patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='oasis_assessments')
     clinician = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     
@@ -61,10 +63,18 @@ class OasisAssessment(models.Model):
     # Complete assessment data (all OASIS items as JSON)
     complete_data = models.JSONField(default=dict, blank=True)
     
+    # Completion counters derived from complete_data on write
+    total_questions = models.PositiveIntegerField(default=0)
+    answered_questions = models.PositiveIntegerField(default=0)
+    completion_percentage = models.FloatField(default=0)
+    
     # AI Generated Content
     ai_insights = models.JSONField(default=dict, blank=True)
     risk_scores = models.JSONField(default=dict, blank=True)
     
+    # Bumped on every complete_data write, used for optimistic concurrency on autosave
+    version = models.PositiveIntegerField(default=0)
+    
     # Status
     is_completed = models.BooleanField(default=False)
     submitted_date = models.DateTimeField(null=True, blank=True)
@@ -74,10 +84,47 @@ class OasisAssessment(models.Model):
 
     class Meta:
         ordering = ['-assessment_date']
+        indexes = [
+            models.Index(fields=['is_completed', 'completion_percentage'], name='oasis_completion_idx'),
+            models.Index(fields=['updated_at', 'id'], name='oasis_sync_idx'),
+        ]
 
     def __str__(self):
         return f"{self.patient.full_name} - {self.get_assessment_type_display()} ({self.assessment_date})"
 
+    def refresh_completion(self):
+        """Recount answered questions from complete_data"""
+        self.total_questions, self.answered_questions = count_questions(self.complete_data)
+        self.completion_percentage = calculate_percentage(self.total_questions, self.answered_questions)
+
+    def adjust_completion(self, total_delta, answered_delta):
+        """Apply a counter delta from a partial save without walking complete_data"""
+        self.total_questions = max(self.total_questions + total_delta, 0)
+        self.answered_questions = min(max(self.answered_questions + answered_delta, 0), self.total_questions)
+        self.completion_percentage = calculate_percentage(self.total_questions, self.answered_questions)
+
+    def save(self, *args, **kwargs):
+        # Callers that already applied adjust_completion() list the counters in
+        # update_fields themselves, so only recount when they were left out
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.refresh_completion()
+            self.version += 1
+        elif 'complete_data' in update_fields:
+            extra_fields = set()
+            if 'completion_percentage' not in update_fields:
+                self.refresh_completion()
+                extra_fields.update(COMPLETION_FIELDS)
+            if 'version' not in update_fields:
+                self.version += 1
+                extra_fields.add('version')
+            kwargs['update_fields'] = set(update_fields) | extra_fields
+        super().save(*args, **kwargs)
+
+    @property
+    def etag(self):
+        return f'"{self.pk}-{self.version}"'
+
 
 class OasisTemplate(models.Model):
     """Templates for different OASIS assessment types and disciplines"""
@@ -99,3 +146,26 @@ class OasisTemplate(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.get_discipline_display()}"
+
+
+class OasisDraftPatch(models.Model):
+    """Compact history of autosave deltas applied to an assessment's complete_data"""
+    PATCH_FORMATS = [
+        ('json-patch', 'JSON Patch'),
+        ('merge-patch', 'JSON Merge Patch'),
+    ]
+
+    assessment = models.ForeignKey(OasisAssessment, on_delete=models.CASCADE, related_name='draft_patches')
+    version = models.PositiveIntegerField()  # assessment version produced by this patch
+    patch_format = models.CharField(max_length=20, choices=PATCH_FORMATS)
+    patch = models.JSONField()
+    
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['assessment', 'version']
+        unique_together = ['assessment', 'version']
+
+    def __str__(self):
+        return f"Assessment {self.assessment_id} v{self.version}"
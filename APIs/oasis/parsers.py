@@ -0,0 +1,11 @@
+from rest_framework.parsers import JSONParser
+
+
+class JSONPatchParser(JSONParser):
+    """Parse RFC 6902 JSON Patch request bodies"""
+    media_type = 'application/json-patch+json'
+
+
+class MergePatchParser(JSONParser):
+    """Parse RFC 7396 JSON Merge Patch request bodies"""
+    media_type = 'application/merge-patch+json'
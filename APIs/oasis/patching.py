@@ -0,0 +1,219 @@
+import copy
+from typing import Any, Dict, List, Optional, Set
+
+from .completion import count_sections
+
+
+JSON_PATCH = 'json-patch'
+MERGE_PATCH = 'merge-patch'
+
+
+class PatchError(ValueError):
+    """Raised when a patch document is malformed or cannot be applied"""
+
+
+class PatchTestFailed(PatchError):
+    """Raised when a JSON Patch 'test' operation does not match"""
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    """Split an RFC 6901 JSON pointer into unescaped tokens"""
+    if pointer == '':
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith('/'):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+
+def _list_index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == '-':
+        return len(container)
+    if not token.isdigit():
+        raise PatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise PatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _resolve_parent(document: Any, tokens: List[str]):
+    """Walk to the container holding the last token of a pointer"""
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, dict):
+            if token not in target:
+                raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_list_index(target, token)]
+        else:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return target
+
+
+def _get(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        return document
+    parent = _resolve_parent(document, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent[token]
+    if isinstance(parent, list):
+        return parent[_list_index(parent, token)]
+    raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve_parent(document, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, token, allow_end=True), value)
+    else:
+        raise PatchError(f"Cannot add to /{'/'.join(tokens)}")
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise PatchError("Cannot remove the document root")
+    parent = _resolve_parent(document, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+        del parent[token]
+    elif isinstance(parent, list):
+        del parent[_list_index(parent, token)]
+    else:
+        raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return document
+
+
+def apply_json_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """Apply RFC 6902 operations to document in place and return the result"""
+    if not isinstance(operations, list):
+        raise PatchError("JSON Patch must be a list of operations")
+
+    for operation in operations:
+        if not isinstance(operation, dict) or 'op' not in operation or 'path' not in operation:
+            raise PatchError("Each operation needs 'op' and 'path'")
+        op = operation['op']
+        tokens = _parse_pointer(operation['path'])
+
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise PatchError(f"'{op}' operation requires a value")
+
+        if op == 'add':
+            document = _add(document, tokens, operation['value'])
+        elif op == 'remove':
+            document = _remove(document, tokens)
+        elif op == 'replace':
+            _get(document, tokens)
+            if tokens:
+                _remove(document, tokens)
+            document = _add(document, tokens, operation['value'])
+        elif op in ('move', 'copy'):
+            if 'from' not in operation:
+                raise PatchError(f"'{op}' operation requires 'from'")
+            source = _parse_pointer(operation['from'])
+            value = _get(document, source)
+            if op == 'move':
+                if tokens[:len(source)] == source and tokens != source:
+                    raise PatchError("Cannot move a value into one of its children")
+                document = _remove(document, source)
+            else:
+                value = copy.deepcopy(value)
+            document = _add(document, tokens, value)
+        elif op == 'test':
+            if _get(document, tokens) != operation['value']:
+                raise PatchTestFailed(f"Test failed at {operation['path']}")
+        else:
+            raise PatchError(f"Unsupported operation: {op!r}")
+
+    return document
+
+
+def apply_merge_patch(document: Any, patch: Any) -> Any:
+    """Apply an RFC 7396 merge patch and return the result"""
+    if not isinstance(patch, dict):
+        return patch
+    if not isinstance(document, dict):
+        document = {}
+    for key, value in patch.items():
+        if value is None:
+            document.pop(key, None)
+        else:
+            document[key] = apply_merge_patch(document.get(key), value)
+    return document
+
+
+def touched_sections(patch: Any, patch_format: str) -> Optional[Set[int]]:
+    """
+    Section indices a patch can change, so completion counters can be adjusted
+    from those sections alone. None means the section list itself changes shape
+    and a full recount is required.
+    """
+    if patch_format == MERGE_PATCH:
+        if not isinstance(patch, dict):
+            return None
+        return None if 'sections' in patch else set()
+
+    if not isinstance(patch, list) or not all(isinstance(op, dict) for op in patch):
+        raise PatchError("JSON Patch must be a list of operations")
+
+    touched = set()
+    for operation in patch:
+        tokens = _parse_pointer(operation.get('path', ''))
+        if operation.get('op') == 'test':
+            continue
+        if operation.get('op') in ('move', 'copy') or not tokens:
+            return None
+        if tokens[0] != 'sections':
+            continue
+        if len(tokens) == 1:
+            return None
+        if not tokens[1].isdigit():
+            return None
+        if len(tokens) == 2 and operation.get('op') != 'replace':
+            # Inserting or removing a section shifts every later index
+            return None
+        touched.add(int(tokens[1]))
+    return touched
+
+
+def _section_counts(complete_data: Any, indices: Set[int]):
+    sections = complete_data.get('sections', []) if isinstance(complete_data, dict) else []
+    if not isinstance(sections, list):
+        return None
+    return count_sections(sections[i] for i in indices if i < len(sections))
+
+
+def apply_patch_to_assessment(assessment, patch: Any, patch_format: str) -> None:
+    """
+    Apply a patch to assessment.complete_data and update its completion
+    counters incrementally. The instance is modified but not saved.
+    """
+    data = assessment.complete_data if isinstance(assessment.complete_data, dict) else {}
+    indices = touched_sections(patch, patch_format)
+    before = _section_counts(data, indices) if indices is not None else None
+
+    if patch_format == MERGE_PATCH:
+        data = apply_merge_patch(data, patch)
+    else:
+        data = apply_json_patch(data, patch)
+    if not isinstance(data, dict):
+        raise PatchError("complete_data must remain a JSON object")
+    assessment.complete_data = data
+
+    after = _section_counts(data, indices) if indices is not None else None
+    if before is None or after is None:
+        assessment.refresh_completion()
+    else:
+        assessment.adjust_completion(after[0] - before[0], after[1] - before[1])
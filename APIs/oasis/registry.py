@@ -0,0 +1,34 @@
+from core.template_registry import TemplateRegistry, TemplateValidationError
+from .models import OasisTemplate
+from .serializers import OasisTemplateSerializer
+
+
+def compile_oasis_template(structure):
+    """Validate a template_structure and precompute its question index"""
+    if not isinstance(structure, dict) or not structure.get('sections'):
+        raise TemplateValidationError("Template must have sections defined")
+
+    question_ids = []
+    question_count = 0
+    for section in structure['sections']:
+        if not isinstance(section, dict):
+            raise TemplateValidationError("Each section must be a JSON object")
+        for question in section.get('questions', []):
+            question_count += 1
+            question_id = question.get('id') if isinstance(question, dict) else None
+            if question_id is None:
+                continue
+            if question_id in question_ids:
+                raise TemplateValidationError(f"Duplicate question id: {question_id}")
+            question_ids.append(question_id)
+
+    return {
+        'section_count': len(structure['sections']),
+        'question_count': question_count,
+        'question_ids': question_ids,
+    }
+
+
+oasis_templates = TemplateRegistry(
+    'oasis', OasisTemplate, OasisTemplateSerializer, 'template_structure', compile_oasis_template
+)
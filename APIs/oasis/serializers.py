@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.utils import timezone
-from .models import OasisAssessment, OasisTemplate
+from .models import OasisAssessment, OasisTemplate, OasisDraftPatch
+from .completion import COMPLETION_FIELDS
 from patients.serializers import PatientBasicSerializer
 from authentication.serializers import UserBasicSerializer
 
@@ -30,7 +31,7 @@ class OasisAssessmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = OasisAssessment
         fields = '__all__'
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at', 'version', *COMPLETION_FIELDS]
     
     def validate_assessment_date(self, value):
         """Validate assessment date is not in the future"""
@@ -53,34 +54,17 @@ class OasisAssessmentDetailSerializer(serializers.ModelSerializer):
     patient = PatientBasicSerializer(read_only=True)
     clinician = UserBasicSerializer(read_only=True)
     assessment_type_display = serializers.CharField(source='get_assessment_type_display', read_only=True)
-    completion_percentage = serializers.SerializerMethodField()
     
     class Meta:
         model = OasisAssessment
         fields = '__all__'
-        read_only_fields = ['created_at', 'updated_at']
-    
-    def get_completion_percentage(self, obj):
-        """Calculate assessment completion percentage"""
-        if not obj.complete_data:
-            return 0
-        
-        total_questions = 0
-        answered_questions = 0
-        
-        for section in obj.complete_data.get('sections', []):
-            for question in section.get('questions', []):
-                total_questions += 1
-                if question.get('answer') is not None:
-                    answered_questions += 1
-        
-        return round((answered_questions / total_questions) * 100, 2) if total_questions > 0 else 0
+        read_only_fields = ['created_at', 'updated_at', 'version', *COMPLETION_FIELDS]
 
 
 class OasisAssessmentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = OasisAssessment
-        exclude = ['created_at', 'updated_at']
+        exclude = ['created_at', 'updated_at', 'version', *COMPLETION_FIELDS]
 
     def validate_patient(self, value):
         """Validate patient exists and is active"""
@@ -103,7 +87,7 @@ class OasisAssessmentCreateSerializer(serializers.ModelSerializer):
 class OasisAssessmentUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = OasisAssessment
-        exclude = ['patient', 'clinician', 'created_at', 'updated_at']
+        exclude = ['patient', 'clinician', 'created_at', 'updated_at', 'version', *COMPLETION_FIELDS]
     
     def validate(self, data):
         """Prevent updates to completed assessments"""
@@ -114,6 +98,12 @@ class OasisAssessmentUpdateSerializer(serializers.ModelSerializer):
         return data
 
 
+class OasisDraftPatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OasisDraftPatch
+        fields = ['version', 'patch_format', 'patch', 'created_by', 'created_at']
+
+
 class OasisSummarySerializer(serializers.ModelSerializer):
     """Summary view for listing assessments"""
     patient_name = serializers.CharField(source='patient.full_name', read_only=True)
@@ -125,7 +115,7 @@ class OasisSummarySerializer(serializers.ModelSerializer):
         fields = [
             'id', 'patient_name', 'assessment_type', 'assessment_type_display',
             'assessment_date', 'is_completed', 'submitted_date', 'created_at',
-            'days_since_assessment'
+            'completion_percentage', 'days_since_assessment'
         ]
     
     def get_days_since_assessment(self, obj):
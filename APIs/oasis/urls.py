@@ -13,6 +13,7 @@ urlpatterns = [
     path('submit/', views.OasisSubmissionView.as_view(), name='oasis_submit'),
     path('submit/draft/', views.OasisDraftSubmissionView.as_view(), name='oasis_draft_submit'),
     path('submit/final/', views.OasisFinalSubmissionView.as_view(), name='oasis_final_submit'),
+    path('assessments/<int:assessment_id>/autosave/', views.OasisAutosaveView.as_view(), name='oasis_autosave'),
     
     # AI-ready templates by discipline
     path('template/<str:discipline>/', views.OasisDisciplineTemplateView.as_view(), name='oasis_discipline_template'),
@@ -3,12 +3,24 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
-from .models import OasisAssessment, OasisTemplate
+from rest_framework.parsers import JSONParser
+from .models import OasisAssessment, OasisTemplate, OasisDraftPatch
+from .completion import COMPLETION_BANDS, COMPLETION_FIELDS
+from .parsers import JSONPatchParser, MergePatchParser
+from .registry import oasis_templates
+from core.conditional import ConditionalGetMixin, detail_etag
+from core.ratelimit import rate_limited
+from core.template_registry import template_response
+from .patching import (
+    JSON_PATCH, MERGE_PATCH, PatchError, PatchTestFailed, apply_patch_to_assessment
+)
 from .serializers import (
     OasisAssessmentSerializer, OasisAssessmentDetailSerializer,
     OasisAssessmentCreateSerializer, OasisAssessmentUpdateSerializer,
-    OasisSummarySerializer, OasisTemplateSerializer, OasisAIAnalysisSerializer
+    OasisSummarySerializer, OasisTemplateSerializer, OasisAIAnalysisSerializer,
+    OasisDraftPatchSerializer
 )
 from patients.models import Patient
 import json
@@ -17,9 +29,14 @@ from rest_framework import viewsets
 from rest_framework.views import APIView
 
 
-class OasisAssessmentListCreateView(generics.ListCreateAPIView):
+# The detail serializers embed the patient and clinician
+ASSESSMENT_VALIDATOR_FIELDS = ('updated_at', 'patient__updated_at', 'clinician__updated_at')
+
+
+class OasisAssessmentListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List all OASIS assessments or create a new one"""
     permission_classes = [permissions.IsAuthenticated]
+    last_modified_fields = ('updated_at', 'patient__updated_at')
     
     def get_queryset(self):
         queryset = OasisAssessment.objects.all()
@@ -55,10 +72,11 @@ class OasisAssessmentListCreateView(generics.ListCreateAPIView):
         return OasisSummarySerializer
 
 
-class OasisAssessmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class OasisAssessmentDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a specific OASIS assessment"""
     queryset = OasisAssessment.objects.select_related('patient', 'clinician')
     permission_classes = [permissions.IsAuthenticated]
+    last_modified_fields = ASSESSMENT_VALIDATOR_FIELDS
     
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -117,6 +135,7 @@ def submit_oasis_assessment(request, assessment_id):
     })
 
 
+@rate_limited('ai')
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def generate_oasis_ai_analysis(request, assessment_id):
@@ -166,7 +185,7 @@ def oasis_patient_timeline(request, patient_id):
     patient = get_object_or_404(Patient, id=patient_id)
     assessments = OasisAssessment.objects.filter(
         patient=patient
-    ).order_by('assessment_date')
+    ).select_related('clinician').order_by('assessment_date')
     
     timeline_data = []
     for assessment in assessments:
@@ -176,7 +195,7 @@ def oasis_patient_timeline(request, patient_id):
             'assessment_type_display': assessment.get_assessment_type_display(),
             'assessment_date': assessment.assessment_date,
             'is_completed': assessment.is_completed,
-            'clinician': assessment.clinician.full_name,
+            'clinician': assessment.clinician.get_full_name(),
             'primary_diagnosis': assessment.primary_diagnosis,
             'risk_scores': assessment.risk_scores
         })
@@ -230,6 +249,7 @@ def oasis_quality_measures(request):
     return Response(quality_measures)
 
 
+@rate_limited('bulk')
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def bulk_create_assessments(request):
@@ -265,10 +285,11 @@ def bulk_create_assessments(request):
     })
 
 
-class OasisAssessmentViewSet(viewsets.ModelViewSet):
+class OasisAssessmentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = OasisAssessment.objects.all()
     serializer_class = OasisAssessmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    last_modified_fields = ASSESSMENT_VALIDATOR_FIELDS
 
 
 class OasisTemplateViewSet(viewsets.ReadOnlyModelViewSet):
@@ -307,10 +328,104 @@ class OasisDraftSubmissionView(APIView):
             return Response({
                 'message': 'OASIS draft saved successfully',
                 'assessment': OasisAssessmentDetailSerializer(assessment).data
-            }, status=status.HTTP_201_CREATED)
+            }, status=status.HTTP_201_CREATED, headers={'ETag': assessment.etag})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class OasisAutosaveView(APIView):
+    """
+    Incremental autosave for draft assessments. Clients send only the changed
+    items as a JSON Patch (list) or JSON Merge Patch (object) together with
+    If-Match set to the ETag from their last save or from the assessment's
+    detail GET.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONPatchParser, MergePatchParser, JSONParser]
+
+    def get(self, request, assessment_id):
+        """
+        Get patches applied after ?since_version= so other devices can catch up.
+        """
+        assessment = get_object_or_404(OasisAssessment.objects.only('id', 'version'), id=assessment_id)
+        since_version = request.query_params.get('since_version', 0)
+        try:
+            since_version = int(since_version)
+        except (TypeError, ValueError):
+            return Response({'error': 'since_version must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        patches = OasisDraftPatch.objects.filter(assessment_id=assessment.id, version__gt=since_version)
+        return Response({
+            'assessment_id': assessment.id,
+            'version': assessment.version,
+            'patches': OasisDraftPatchSerializer(patches, many=True).data
+        }, headers={'ETag': assessment.etag})
+
+    def patch(self, request, assessment_id):
+        """
+        Apply a delta to complete_data if the client's version is still current.
+        """
+        if_match = request.headers.get('If-Match')
+        if not if_match:
+            return Response({'error': 'If-Match header is required'}, status=status.HTTP_428_PRECONDITION_REQUIRED)
+        
+        if request.content_type.startswith(MergePatchParser.media_type):
+            patch_format = MERGE_PATCH
+        elif request.content_type.startswith(JSONPatchParser.media_type):
+            patch_format = JSON_PATCH
+        else:
+            patch_format = JSON_PATCH if isinstance(request.data, list) else MERGE_PATCH
+        
+        with transaction.atomic():
+            assessment = get_object_or_404(
+                OasisAssessment.objects.select_for_update().only(
+                    'id', 'complete_data', 'version', 'is_completed', 'submitted_date', *COMPLETION_FIELDS
+                ),
+                id=assessment_id
+            )
+            
+            if if_match.strip() != '*' and not self._matches(assessment, if_match):
+                return Response({
+                    'error': 'Assessment was modified by another save',
+                    'version': assessment.version
+                }, status=status.HTTP_412_PRECONDITION_FAILED, headers={'ETag': assessment.etag})
+            
+            if assessment.is_completed and assessment.submitted_date:
+                return Response({'error': 'Cannot modify completed assessment data'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            try:
+                apply_patch_to_assessment(assessment, request.data, patch_format)
+            except PatchTestFailed as e:
+                return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+            except PatchError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            assessment.version += 1
+            assessment.save(update_fields=['complete_data', 'version', 'updated_at', *COMPLETION_FIELDS])
+            OasisDraftPatch.objects.create(
+                assessment=assessment,
+                version=assessment.version,
+                patch_format=patch_format,
+                patch=request.data,
+                created_by=request.user
+            )
+        
+        return Response({
+            'id': assessment.id,
+            'version': assessment.version,
+            'total_questions': assessment.total_questions,
+            'answered_questions': assessment.answered_questions,
+            'completion_percentage': assessment.completion_percentage
+        }, headers={'ETag': assessment.etag})
+
+    @staticmethod
+    def _matches(assessment, if_match):
+        tags = [tag.strip().removeprefix('W/') for tag in if_match.split(',')]
+        if assessment.etag in tags:
+            return True
+        # Also the detail GET's ETag, so a client can save straight after loading the assessment
+        return detail_etag(OasisAssessment.objects.filter(id=assessment.id), ASSESSMENT_VALIDATOR_FIELDS) in tags
+
+
 class OasisFinalSubmissionView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -335,9 +450,7 @@ class OasisDisciplineTemplateView(APIView):
         """
         Get OASIS templates filtered by discipline.
         """
-        templates = OasisTemplate.objects.filter(discipline=discipline, is_active=True)
-        serializer = OasisTemplateSerializer(templates, many=True)
-        return Response(serializer.data)
+        return template_response(request, oasis_templates.get(discipline=discipline))
 
 
 class OasisSpecificTemplateView(APIView):
@@ -347,13 +460,9 @@ class OasisSpecificTemplateView(APIView):
         """
         Get specific OASIS template by discipline and assessment type.
         """
-        templates = OasisTemplate.objects.filter(
-            discipline=discipline,
-            assessment_type=assessment_type,
-            is_active=True
+        return template_response(
+            request, oasis_templates.get(discipline=discipline, assessment_type=assessment_type)
         )
-        serializer = OasisTemplateSerializer(templates, many=True)
-        return Response(serializer.data)
 
 
 class SkilledNursingTemplateView(APIView):
@@ -363,9 +472,7 @@ class SkilledNursingTemplateView(APIView):
         """
         Get skilled nursing templates.
         """
-        templates = OasisTemplate.objects.filter(discipline='SN', is_active=True)
-        serializer = OasisTemplateSerializer(templates, many=True)
-        return Response(serializer.data)
+        return template_response(request, oasis_templates.get(discipline='SN'))
 
 
 class PhysicalTherapyTemplateView(APIView):
@@ -375,9 +482,7 @@ class PhysicalTherapyTemplateView(APIView):
         """
         Get physical therapy templates.
         """
-        templates = OasisTemplate.objects.filter(discipline='PT', is_active=True)
-        serializer = OasisTemplateSerializer(templates, many=True)
-        return Response(serializer.data)
+        return template_response(request, oasis_templates.get(discipline='PT'))
 
 
 class OccupationalTherapyTemplateView(APIView):
@@ -387,9 +492,7 @@ class OccupationalTherapyTemplateView(APIView):
         """
         Get occupational therapy templates.
         """
-        templates = OasisTemplate.objects.filter(discipline='OT', is_active=True)
-        serializer = OasisTemplateSerializer(templates, many=True)
-        return Response(serializer.data)
+        return template_response(request, oasis_templates.get(discipline='OT'))
 
 
 class OasisAIAnalysisView(APIView):
@@ -583,6 +686,7 @@ class DeteriorationRiskView(APIView):
 class OasisBulkSubmissionView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @rate_limited('bulk')
     def post(self, request):
         """
         Submit multiple OASIS assessments in bulk.
@@ -620,8 +724,18 @@ class PendingAssessmentsView(APIView):
     def get(self, request):
         """
         Get all pending (incomplete) OASIS assessments.
+        Optionally filter by ?completion_band=not_started|in_progress|nearly_complete|ready
         """
-        assessments = OasisAssessment.objects.filter(is_completed=False)
+        assessments = OasisAssessment.objects.filter(is_completed=False).select_related('patient')
+        
+        completion_band = request.query_params.get('completion_band')
+        if completion_band:
+            if completion_band not in COMPLETION_BANDS:
+                return Response({
+                    'error': f'Invalid completion_band. Choose from: {", ".join(COMPLETION_BANDS)}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            assessments = assessments.filter(**COMPLETION_BANDS[completion_band])
+        
         serializer = OasisSummarySerializer(assessments, many=True)
         return Response({
             'count': assessments.count(),
@@ -1,8 +1,9 @@
 from django.db import models
 from django.conf import settings
+from events.capture import ChangeCaptureMixin
 
 
-class Patient(models.Model):
+class Patient(ChangeCaptureMixin, models.Model):
     # Basic Information
     mrn = models.CharField(max_length=20, unique=True, help_text="Medical Record Number")
     first_name = models.CharField(max_length=50)
@@ -49,6 +50,9 @@ class Patient(models.Model):
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='patient_sync_idx'),
+        ]
 
     def __str__(self):
         return f"{self.last_name}, {self.first_name} (MRN: {self.mrn})"
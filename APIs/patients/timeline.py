@@ -0,0 +1,148 @@
+import base64
+import json
+
+from django.db import connection
+from django.db.models import Case, CharField, F, Q, Value, When
+from django.db.models.functions import Cast, Coalesce, Concat, Substr
+from django.utils.dateparse import parse_datetime
+
+
+EVENT_TYPES = ['visit', 'visit_note', 'oasis_assessment', 'file', 'message']
+
+# Output keys mapped to the annotation names used inside the UNION; the
+# annotations are prefixed so they never clash with real model fields
+TIMELINE_COLUMNS = {
+    'occurred_at': 'tl_occurred_at',
+    'event_type': 'tl_event_type',
+    'object_id': 'tl_object_id',
+    'title': 'tl_title',
+    'detail': 'tl_detail',
+    'status': 'tl_status',
+    'actor_id': 'tl_actor_id',
+    'actor_name': 'tl_actor_name',
+}
+
+
+class InvalidCursor(ValueError):
+    """Raised when a timeline cursor cannot be decoded"""
+
+
+def encode_cursor(row):
+    raw = json.dumps([row['occurred_at'].isoformat(), row['event_type'], row['object_id']])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        occurred_at, event_type, object_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        occurred_at = parse_datetime(occurred_at)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if occurred_at is None or not isinstance(object_id, int):
+        raise InvalidCursor("Invalid cursor")
+    return occurred_at, event_type, object_id
+
+
+def _text(expression):
+    return Cast(expression, output_field=CharField())
+
+
+def _actor_name(prefix):
+    return Concat(F(f'{prefix}__first_name'), Value(' '), F(f'{prefix}__last_name'), output_field=CharField())
+
+
+def _branch(queryset, event_type, occurred_at, title, detail, status, actor):
+    """Project one model onto the shared timeline columns"""
+    return queryset.annotate(
+        tl_occurred_at=occurred_at,
+        tl_event_type=Value(event_type, output_field=CharField()),
+        tl_object_id=F('id'),
+        tl_title=_text(title),
+        tl_detail=_text(detail),
+        tl_status=_text(status),
+        tl_actor_id=F(f'{actor}_id'),
+        tl_actor_name=_actor_name(actor),
+    )
+
+
+def _before(cursor):
+    """Keyset predicate selecting rows that sort after the cursor (descending)"""
+    if cursor is None:
+        return Q()
+    occurred_at, event_type, object_id = cursor
+    return (
+        Q(tl_occurred_at__lt=occurred_at) |
+        Q(tl_occurred_at=occurred_at, tl_event_type__lt=event_type) |
+        Q(tl_occurred_at=occurred_at, tl_event_type=event_type, tl_object_id__lt=object_id)
+    )
+
+
+def timeline_branches(patient, user):
+    """Per-model querysets for a patient's timeline, keyed by event type"""
+    from visits.models import Visit, VisitNote
+    from oasis.models import OasisAssessment
+    from file_management.models import UploadedFile
+    from communication.models import Message
+
+    return {
+        'visit': _branch(
+            Visit.objects.filter(patient=patient), 'visit',
+            Coalesce('start_time', 'scheduled_date'), F('visit_type'), F('chief_complaint'), F('status'),
+            'clinician',
+        ),
+        'visit_note': _branch(
+            VisitNote.objects.filter(visit__patient=patient), 'visit_note',
+            F('created_at'), F('title'), F('note_type'), Value(''), 'created_by',
+        ),
+        'oasis_assessment': _branch(
+            OasisAssessment.objects.filter(patient=patient), 'oasis_assessment',
+            Coalesce('submitted_date', 'created_at'), F('assessment_type'), F('primary_diagnosis'),
+            Case(When(is_completed=True, then=Value('completed')), default=Value('draft')), 'clinician',
+        ),
+        'file': _branch(
+            UploadedFile.objects.filter(patient=patient), 'file',
+            F('created_at'), F('original_filename'), F('category'), F('processing_status'), 'uploaded_by',
+        ),
+        'message': _branch(
+            Message.objects.filter(thread__patient=patient, thread__participants=user), 'message',
+            F('created_at'), F('message_type'), Substr('content', 1, 200), Value(''), 'sender',
+        ),
+    }
+
+
+def patient_timeline(patient, user, cursor=None, limit=50, event_types=None):
+    """
+    Return one page of a patient's merged timeline, newest first, in a single
+    UNION ALL query with keyset pagination on (occurred_at, event_type, object_id).
+    """
+    branches = timeline_branches(patient, user)
+    selected = [t for t in EVENT_TYPES if not event_types or t in event_types]
+    predicate = _before(decode_cursor(cursor) if cursor else None)
+    ordering = ['-tl_occurred_at', '-tl_event_type', '-tl_object_id']
+
+    querysets = []
+    for event_type in selected:
+        queryset = branches[event_type].filter(predicate).order_by().values(*TIMELINE_COLUMNS.values())
+        if len(selected) > 1 and connection.features.supports_slicing_ordering_in_compound:
+            # Let each branch stop after one page instead of scanning its whole history
+            queryset = queryset.order_by(*ordering)[:limit + 1]
+        querysets.append(queryset)
+
+    if not querysets:
+        return [], None
+
+    combined = querysets[0].union(*querysets[1:], all=True) if len(querysets) > 1 else querysets[0]
+    rows = [
+        {key: row[column] for key, column in TIMELINE_COLUMNS.items()}
+        for row in combined.order_by(*ordering)[:limit + 1]
+    ]
+    for row in rows:
+        if isinstance(row['occurred_at'], str):
+            row['occurred_at'] = parse_datetime(row['occurred_at'])
+        row['actor_name'] = (row['actor_name'] or '').strip()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+    return rows, next_cursor
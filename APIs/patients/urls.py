@@ -19,6 +19,7 @@ urlpatterns = [
     
     # Patient-specific data endpoints
     path('<int:patient_id>/history/', views.PatientHistoryView.as_view(), name='patient_history'),
+    path('<int:patient_id>/timeline/', views.PatientTimelineView.as_view(), name='patient_timeline'),
     path('<int:patient_id>/visits/', views.PatientVisitsView.as_view(), name='patient_visits'),
     path('<int:patient_id>/assessments/', views.PatientAssessmentsView.as_view(), name='patient_assessments'),
     path('<int:patient_id>/medications/', views.PatientMedicationsView.as_view(), name='patient_medications'),
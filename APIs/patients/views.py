@@ -2,9 +2,14 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Q
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from .models import Patient
 from .serializers import PatientSerializer, PatientSearchSerializer, PatientBasicSerializer
+from .timeline import patient_timeline, InvalidCursor
+from core.conditional import ConditionalGetMixin
+from core.response_cache import cache_response
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -12,10 +17,15 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 
 
-class PatientViewSet(viewsets.ModelViewSet):
+# PatientSerializer embeds the assigned physician's name
+PATIENT_VALIDATOR_FIELDS = ('updated_at', 'assigned_physician__updated_at')
+
+
+class PatientViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Patient.objects.filter(is_active=True)
     serializer_class = PatientSerializer
     permission_classes = [permissions.IsAuthenticated]
+    last_modified_fields = PATIENT_VALIDATOR_FIELDS
 
     def get_queryset(self):
         """Filter patients based on user role"""
@@ -74,16 +84,18 @@ class PatientViewSet(viewsets.ModelViewSet):
         })
 
 
-class PatientListCreateView(generics.ListCreateAPIView):
+class PatientListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     queryset = Patient.objects.all()
     serializer_class = PatientSerializer
     permission_classes = [IsAuthenticated]
+    last_modified_fields = PATIENT_VALIDATOR_FIELDS
 
 
-class PatientDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PatientDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Patient.objects.all()
     serializer_class = PatientSerializer
     permission_classes = [IsAuthenticated]
+    last_modified_fields = PATIENT_VALIDATOR_FIELDS
 
 
 class PatientSearchView(APIView):
@@ -126,15 +138,55 @@ class AdvancedPatientSearchView(APIView):
         return Response(serializer.data)
 
 
-class PatientHistoryView(APIView):
+class PatientTimelineView(APIView):
+    """
+    Merged visits, notes, OASIS assessments, files and messages for a patient,
+    newest first. Page with ?cursor=<next_cursor>&limit=50, narrow with
+    ?types=visit,oasis_assessment
+    """
     permission_classes = [IsAuthenticated]
+    max_limit = 200
+
+    def get_timeline(self, request, patient):
+        try:
+            limit = min(int(request.GET.get('limit', 50)), self.max_limit)
+        except ValueError:
+            limit = 50
+        event_types = [t for t in request.GET.get('types', '').split(',') if t] or None
+        return patient_timeline(
+            patient, request.user,
+            cursor=request.GET.get('cursor'), limit=max(limit, 1), event_types=event_types
+        )
+
+    def get(self, request, patient_id):
+        patient = get_object_or_404(Patient, id=patient_id)
+        try:
+            events, next_cursor = self.get_timeline(request, patient)
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'patient': {
+                'id': patient.id,
+                'name': patient.full_name,
+                'date_of_birth': patient.date_of_birth
+            },
+            'events': events,
+            'next_cursor': next_cursor
+        })
+
+
+class PatientHistoryView(PatientTimelineView):
 
     def get(self, request, patient_id):
         patient = get_object_or_404(Patient, id=patient_id)
-        # Return patient medical history
+        try:
+            events, next_cursor = self.get_timeline(request, patient)
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response({
             'patient_id': patient.id,
-            'medical_history': getattr(patient, 'medical_history', []),
+            'medical_history': events,
+            'next_cursor': next_cursor,
             'message': 'Patient history retrieved successfully'
         })
 
@@ -143,11 +195,13 @@ class PatientVisitsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, patient_id):
+        from visits.serializers import VisitSerializer
+
         patient = get_object_or_404(Patient, id=patient_id)
-        # Return patient visits - you'll need to implement this based on your Visit model
+        visits = patient.visits.select_related('patient', 'clinician')
         return Response({
             'patient_id': patient.id,
-            'visits': [],
+            'visits': VisitSerializer(visits, many=True).data,
             'message': 'Patient visits retrieved successfully'
         })
 
@@ -156,10 +210,13 @@ class PatientAssessmentsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, patient_id):
+        from oasis.serializers import OasisSummarySerializer
+
         patient = get_object_or_404(Patient, id=patient_id)
+        assessments = patient.oasis_assessments.select_related('patient')
         return Response({
             'patient_id': patient.id,
-            'assessments': [],
+            'assessments': OasisSummarySerializer(assessments, many=True).data,
             'message': 'Patient assessments retrieved successfully'
         })
 
@@ -189,16 +246,57 @@ class PatientAllergiesView(APIView):
 
 
 class PatientVitalsView(APIView):
+    """
+    Vital sign trends as columnar series per metric.
+    ?metrics=bp_systolic,heart_rate&start=2024-01-01&end=2024-06-30&resolution=auto|raw|day|week
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, patient_id):
-        patient = get_object_or_404(Patient, id=patient_id)
+        from visits.models import VitalMetric
+        from visits.vitals import pick_resolution, vitals_series
+
+        patient = get_object_or_404(Patient.objects.only('id'), id=patient_id)
+
+        metrics = [m for m in request.GET.get('metrics', '').split(',') if m] or list(VitalMetric.values)
+        invalid = [m for m in metrics if m not in VitalMetric.values]
+        if invalid:
+            return Response({'error': f'Unknown metrics: {", ".join(invalid)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            end = self._parse_datetime(request.GET.get('end')) or timezone.now()
+            start = self._parse_datetime(request.GET.get('start')) or end - timedelta(days=90)
+        except ValueError:
+            return Response({'error': 'start and end must be valid ISO 8601 dates or datetimes'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        resolution = request.GET.get('resolution', 'auto')
+        if resolution == 'auto':
+            resolution = pick_resolution(start, end)
+        elif resolution not in ('raw', 'day', 'week'):
+            return Response({'error': 'resolution must be auto, raw, day or week'}, status=status.HTTP_400_BAD_REQUEST)
+
         return Response({
             'patient_id': patient.id,
-            'vitals': [],
+            'start': start,
+            'end': end,
+            'resolution': resolution,
+            'vitals': vitals_series(patient.id, metrics, start, end, resolution),
             'message': 'Patient vitals retrieved successfully'
         })
 
+    @staticmethod
+    def _parse_datetime(value):
+        """None for an empty value; raises ValueError for one that is not a valid date or datetime"""
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed_date = parse_date(value)
+            if parsed_date is None:
+                raise ValueError(value)
+            parsed = datetime.combine(parsed_date, datetime.min.time())
+        return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
 
 class PatientCarePlanView(APIView):
     permission_classes = [IsAuthenticated]
@@ -215,6 +313,7 @@ class PatientCarePlanView(APIView):
 class PatientDemographicsView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cache_response('patient_demographics', models=[Patient], object_kwarg='patient_id')
     def get(self, request, patient_id):
         patient = get_object_or_404(Patient, id=patient_id)
         serializer = PatientSerializer(patient)
@@ -46,10 +46,15 @@ INSTALLED_APPS = [
     'file_management',
     'oasis',
     'communication',
+    'events',
+    'sync',
+    'core',
     'api',  # your original app
 ]
 
 MIDDLEWARE = [
+    'core.profiling.ProfilingMiddleware',
+    'core.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -58,6 +63,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
 ]
 
 # Custom User Model
@@ -66,7 +72,7 @@ AUTH_USER_MODEL = 'authentication.User'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.jwt.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -82,6 +88,8 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.tokens.ClinicianTokenRefreshSerializer',
 }
 
 # CORS Configuration (for frontend integration)
@@ -112,6 +120,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'wsgi.application'
+ASGI_APPLICATION = 'asgi.application'
 
 
 # Database
@@ -125,6 +134,158 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds a worker may serve compiled OASIS/documentation templates before
+# re-checking the database (invalidation is immediate with a shared cache)
+TEMPLATE_REGISTRY_TTL = 300
+
+# Route planning for daily clinician schedules (see visits/routing.py)
+ROUTING = {
+    'GEOCODER': 'visits.routing.StubGeocoder',
+    'DEPOT': (40.7128, -74.0060),
+    'STUB_RADIUS_KM': 25,
+    'AVERAGE_SPEED_KMH': 40,
+    'ROAD_FACTOR': 1.3,
+    'TIME_WINDOW_MINUTES': 60,
+    'DAY_START_HOUR': 8,
+    'WORKERS': 4,
+}
+
+# In-process background tasks (core/tasks.py); eager runs them inline
+BACKGROUND_TASK_WORKERS = 2
+BACKGROUND_TASKS_EAGER = False
+
+# Dotted path to the visit summarizer (see visits/summaries.py)
+VISIT_SUMMARIZER = 'visits.summaries.StubSummarizer'
+
+# Streaming dictation (see visits/voice.py)
+VOICE_ASR_BACKEND = 'visits.voice.StubASR'
+VOICE_MAX_CHUNK_BYTES = 512 * 1024
+VOICE_STORE_AUDIO = True
+
+# Cached GET responses (core/response_cache.py); ALIAS names a CACHES entry
+RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+    'ENABLED': True,
+}
+
+# Offline delta sync (sync/delta.py)
+SYNC = {
+    'PAGE_SIZE': 500,
+    'OVERLAP_SECONDS': 5,
+    'TOKEN_MAX_AGE_DAYS': 30,
+    'MAX_MUTATIONS': 200,
+}
+
+# JWT user resolution (authentication/jwt.py)
+AUTH_TOKEN_USER = {
+    'CLAIMS': True,
+    'CACHE_TTL': 60,
+    'CACHE_SIZE': 10000,
+}
+
+# Revoked JWTs (authentication/blacklist.py)
+TOKEN_BLACKLIST = {
+    'SYNC_INTERVAL': 1.0,
+    'BUCKET_SECONDS': 3600,
+    'BUCKET_CAPACITY': 10000,
+    'ERROR_RATE': 0.001,
+}
+
+# Change data capture log (events/log.py)
+CHANGE_EVENTS = {
+    'PAGE_SIZE': 500,
+    'GAP_GRACE_SECONDS': 30,
+}
+
+
+# Password hashing (authentication/hashers.py). The first hasher encodes new
+# passwords; hashes from the others, or made with older parameters, are
+# upgraded after the next successful login. Argon2 needs argon2-cffi.
+PASSWORD_HASHERS = [
+    'authentication.hashers.ScryptPasswordHasher',
+    'authentication.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+PASSWORD_HASHING = {
+    'SCRYPT': {'WORK_FACTOR': 2 ** 14, 'BLOCK_SIZE': 8, 'PARALLELISM': 1},
+    'ARGON2': {'TIME_COST': 2, 'MEMORY_COST': 102400, 'PARALLELISM': 8},
+}
+
+# Permission checks use the permission registry's cached bitsets
+# (authentication/roles.py)
+AUTHENTICATION_BACKENDS = ['authentication.backends.RegistryPermissionBackend']
+
+PERMISSION_REGISTRY = {
+    'TTL': 300,
+    'USER_TIMEOUT': 3600,
+}
+
+# Per-user token buckets and per-process concurrency caps for endpoints
+# marked @rate_limited (core/ratelimit.py)
+RATE_LIMIT = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'CLASSES': {
+        'ocr': {'RATE': 6, 'PERIOD': 60, 'BURST': 3, 'CONCURRENCY': 2},
+        'ai': {'RATE': 10, 'PERIOD': 60, 'BURST': 5, 'CONCURRENCY': 4},
+        'bulk': {'RATE': 5, 'PERIOD': 60, 'BURST': 2, 'CONCURRENCY': 2},
+    },
+}
+
+# Per-route timings, SQL counts and slow-request traces (core/profiling.py)
+PROFILING = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 1000,
+    'SAMPLE_RATE': 0.01,
+    'PROFILER': 'cprofile',
+    'ARMED_REQUESTS': 3,
+    'RESERVOIR_SIZE': 1000,
+    'SLOW_REQUESTS': 50,
+}
+
+# Prometheus scrape endpoint at /metrics (core/metrics.py)
+METRICS = {
+    'ENABLED': True,
+    'TOKEN': '',
+}
+
+# Long polls, event streams and downloads served by async views (core/async_views.py)
+ASYNC_VIEWS = {
+    'LONG_POLL_SECONDS': 25,
+    'POLL_INTERVAL': 1.0,
+    'STREAM_SECONDS': 300,
+    'HEARTBEAT_SECONDS': 15,
+    'DOWNLOAD_CHUNK_SIZE': 64 * 1024,
+}
+
+# Readiness checks behind /health/ and /health/ready/ (core/health.py)
+HEALTH = {
+    'CACHE_SECONDS': 10,
+    'BROKER_TIMEOUT': 2,
+}
+
+# Login hashing pool and per-username, per-address attempt limit (authentication/login.py)
+LOGIN = {
+    'WORKERS': None,
+    'QUEUE_SIZE': 64,
+    'QUEUE_TIMEOUT': 5.0,
+    'RATE_LIMIT': 10,
+    'RATE_WINDOW': 300,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
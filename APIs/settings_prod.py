@@ -31,10 +31,15 @@ INSTALLED_APPS = [
     'file_management',
     'oasis',
     'communication',
+    'events',
+    'sync',
+    'core',
     'api',  # your original app
 ]
 
 MIDDLEWARE = [
+    'core.profiling.ProfilingMiddleware',
+    'core.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files in production
@@ -44,6 +49,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
 ]
 
 # Custom User Model
@@ -52,7 +58,7 @@ AUTH_USER_MODEL = 'authentication.User'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.jwt.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -68,6 +74,8 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'authentication.tokens.ClinicianTokenRefreshSerializer',
 }
 
 # CORS Configuration (for frontend integration)
@@ -97,6 +105,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'wsgi.application'
+ASGI_APPLICATION = 'asgi.application'
 
 # Database Configuration
 if config('DATABASE_URL', default=None):
@@ -104,7 +113,9 @@ if config('DATABASE_URL', default=None):
     DATABASES = {
         'default': dj_database_url.config(
             default=config('DATABASE_URL'),
-            conn_max_age=600,
+            # Served under ASGI, where each request's queries run in a fresh thread and
+            # persistent connections would pile up, so connections close per request by default
+            conn_max_age=config('DB_CONN_MAX_AGE', default=0, cast=int),
             conn_health_checks=True,
         )
     }
@@ -117,6 +128,174 @@ else:
         }
     }
 
+# Cache Configuration (Redis shared across workers, local memory otherwise)
+if config('REDIS_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a worker may serve compiled templates before re-checking the database
+TEMPLATE_REGISTRY_TTL = config('TEMPLATE_REGISTRY_TTL', default=300, cast=int)
+
+# Route planning for daily clinician schedules
+ROUTING = {
+    'GEOCODER': config('ROUTING_GEOCODER', default='visits.routing.StubGeocoder'),
+    'DEPOT': (config('ROUTING_DEPOT_LAT', default=40.7128, cast=float),
+              config('ROUTING_DEPOT_LON', default=-74.0060, cast=float)),
+    'TIME_WINDOW_MINUTES': config('ROUTING_TIME_WINDOW_MINUTES', default=60, cast=int),
+    'WORKERS': config('ROUTING_WORKERS', default=4, cast=int),
+}
+
+# In-process background tasks
+BACKGROUND_TASK_WORKERS = config('BACKGROUND_TASK_WORKERS', default=4, cast=int)
+BACKGROUND_TASKS_EAGER = False
+
+# Visit summary generation backend
+VISIT_SUMMARIZER = config('VISIT_SUMMARIZER', default='visits.summaries.StubSummarizer')
+
+# Streaming dictation
+VOICE_ASR_BACKEND = config('VOICE_ASR_BACKEND', default='visits.voice.StubASR')
+VOICE_VOSK_MODEL_PATH = config('VOICE_VOSK_MODEL_PATH', default='')
+VOICE_MAX_CHUNK_BYTES = config('VOICE_MAX_CHUNK_BYTES', default=512 * 1024, cast=int)
+VOICE_STORE_AUDIO = config('VOICE_STORE_AUDIO', default=True, cast=bool)
+
+# Cached GET responses, stored in the default (Redis when configured) cache
+RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int),
+    'ENABLED': config('RESPONSE_CACHE_ENABLED', default=True, cast=bool),
+}
+
+# Offline delta sync
+SYNC = {
+    'PAGE_SIZE': config('SYNC_PAGE_SIZE', default=500, cast=int),
+    'OVERLAP_SECONDS': config('SYNC_OVERLAP_SECONDS', default=5, cast=int),
+    'TOKEN_MAX_AGE_DAYS': config('SYNC_TOKEN_MAX_AGE_DAYS', default=30, cast=int),
+    'MAX_MUTATIONS': config('SYNC_MAX_MUTATIONS', default=200, cast=int),
+}
+
+# JWT user resolution
+AUTH_TOKEN_USER = {
+    'CLAIMS': config('AUTH_TOKEN_CLAIMS', default=True, cast=bool),
+    'CACHE_TTL': config('AUTH_USER_CACHE_TTL', default=60, cast=int),
+    'CACHE_SIZE': config('AUTH_USER_CACHE_SIZE', default=10000, cast=int),
+}
+
+# Revoked JWTs
+TOKEN_BLACKLIST = {
+    'SYNC_INTERVAL': config('TOKEN_BLACKLIST_SYNC_INTERVAL', default=1.0, cast=float),
+    'BUCKET_SECONDS': 3600,
+    'BUCKET_CAPACITY': config('TOKEN_BLACKLIST_BUCKET_CAPACITY', default=10000, cast=int),
+    'ERROR_RATE': 0.001,
+}
+
+# Change data capture log
+CHANGE_EVENTS = {
+    'PAGE_SIZE': config('CHANGE_EVENTS_PAGE_SIZE', default=500, cast=int),
+    'GAP_GRACE_SECONDS': config('CHANGE_EVENTS_GAP_GRACE_SECONDS', default=30, cast=int),
+}
+
+# Password hashing. The first hasher encodes new passwords; hashes from the
+# others, or made with older parameters, are upgraded after the next
+# successful login. Argon2 needs argon2-cffi.
+PASSWORD_HASHERS = [
+    'authentication.hashers.ScryptPasswordHasher',
+    'authentication.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+PASSWORD_HASHING = {
+    'SCRYPT': {
+        'WORK_FACTOR': config('SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int),
+        'BLOCK_SIZE': config('SCRYPT_BLOCK_SIZE', default=8, cast=int),
+        'PARALLELISM': config('SCRYPT_PARALLELISM', default=1, cast=int),
+    },
+    'ARGON2': {
+        'TIME_COST': config('ARGON2_TIME_COST', default=2, cast=int),
+        'MEMORY_COST': config('ARGON2_MEMORY_COST', default=102400, cast=int),
+        'PARALLELISM': config('ARGON2_PARALLELISM', default=8, cast=int),
+    },
+}
+
+# Permission checks use the permission registry's cached bitsets
+AUTHENTICATION_BACKENDS = ['authentication.backends.RegistryPermissionBackend']
+
+PERMISSION_REGISTRY = {
+    'TTL': config('PERMISSION_REGISTRY_TTL', default=300, cast=int),
+    'USER_TIMEOUT': config('PERMISSION_REGISTRY_USER_TIMEOUT', default=3600, cast=int),
+}
+
+# Per-user token buckets and per-process concurrency caps for expensive endpoints
+RATE_LIMIT = {
+    'ENABLED': config('RATE_LIMIT_ENABLED', default=True, cast=bool),
+    'CACHE_ALIAS': 'default',
+    'CLASSES': {
+        'ocr': {
+            'RATE': config('RATE_LIMIT_OCR_RATE', default=6, cast=int), 'PERIOD': 60,
+            'BURST': 3, 'CONCURRENCY': config('RATE_LIMIT_OCR_CONCURRENCY', default=2, cast=int),
+        },
+        'ai': {
+            'RATE': config('RATE_LIMIT_AI_RATE', default=10, cast=int), 'PERIOD': 60,
+            'BURST': 5, 'CONCURRENCY': config('RATE_LIMIT_AI_CONCURRENCY', default=4, cast=int),
+        },
+        'bulk': {
+            'RATE': config('RATE_LIMIT_BULK_RATE', default=5, cast=int), 'PERIOD': 60,
+            'BURST': 2, 'CONCURRENCY': config('RATE_LIMIT_BULK_CONCURRENCY', default=2, cast=int),
+        },
+    },
+}
+
+# Per-route timings, SQL counts and slow-request traces
+PROFILING = {
+    'ENABLED': config('PROFILING_ENABLED', default=True, cast=bool),
+    'SLOW_REQUEST_MS': config('PROFILING_SLOW_REQUEST_MS', default=1000, cast=int),
+    'SAMPLE_RATE': config('PROFILING_SAMPLE_RATE', default=0.01, cast=float),
+    'PROFILER': config('PROFILING_PROFILER', default='cprofile'),
+    'ARMED_REQUESTS': 3,
+    'RESERVOIR_SIZE': 1000,
+    'SLOW_REQUESTS': 50,
+}
+
+# Prometheus scrape endpoint at /metrics (core/metrics.py)
+METRICS = {
+    'ENABLED': config('METRICS_ENABLED', default=True, cast=bool),
+    'TOKEN': config('METRICS_TOKEN', default=''),
+}
+
+# Readiness checks behind /health/ and /health/ready/ (core/health.py)
+# Long polls, event streams and downloads served by async views
+ASYNC_VIEWS = {
+    'LONG_POLL_SECONDS': config('LONG_POLL_SECONDS', default=25, cast=int),
+    'POLL_INTERVAL': config('ASYNC_POLL_INTERVAL', default=1.0, cast=float),
+    'STREAM_SECONDS': config('STREAM_SECONDS', default=300, cast=int),
+    'HEARTBEAT_SECONDS': 15,
+    'DOWNLOAD_CHUNK_SIZE': 64 * 1024,
+}
+
+HEALTH = {
+    'CACHE_SECONDS': config('HEALTH_CACHE_SECONDS', default=10, cast=int),
+    'BROKER_TIMEOUT': 2,
+}
+
+# Login hashing pool and per-username, per-address attempt limit
+LOGIN = {
+    'WORKERS': config('LOGIN_WORKERS', default=0, cast=int) or None,
+    'QUEUE_SIZE': config('LOGIN_QUEUE_SIZE', default=64, cast=int),
+    'QUEUE_TIMEOUT': config('LOGIN_QUEUE_TIMEOUT', default=5.0, cast=float),
+    'RATE_LIMIT': config('LOGIN_RATE_LIMIT', default=10, cast=int),
+    'RATE_WINDOW': config('LOGIN_RATE_WINDOW', default=300, cast=int),
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
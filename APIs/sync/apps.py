@@ -0,0 +1,20 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sync'
+
+    def ready(self):
+        from django.db.models.signals import post_save, pre_delete, pre_save
+        from .sources import OWNER_COLUMNS, SYNC_SOURCES, record_tombstone, remember_owners, revoke_reassigned
+
+        for source in SYNC_SOURCES.values():
+            pre_delete.connect(
+                record_tombstone, sender=source.model, weak=False,
+                dispatch_uid=f'sync_tombstone_{source.name}',
+            )
+        for model in OWNER_COLUMNS:
+            label = model._meta.label_lower
+            pre_save.connect(remember_owners, sender=model, dispatch_uid=f'sync_owners_{label}')
+            post_save.connect(revoke_reassigned, sender=model, dispatch_uid=f'sync_revoke_{label}')
@@ -0,0 +1,190 @@
+"""
+Delta sync for offline clients.
+
+Pulls are keyset scans over (updated_at, id) per entity, resumed from
+cursors carried in a signed change token. Pushes apply batches of offline
+writes with optimistic concurrency on updated_at.
+"""
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import SyncMutation, SyncTombstone
+from .sources import SYNC_SOURCES, SyncSource, tombstone_scope
+
+SYNC_DEFAULTS = {
+    'PAGE_SIZE': 500,
+    # Rows written this close to a pull are re-sent by the next one, in case
+    # their transaction committed after the pull read past them
+    'OVERLAP_SECONDS': 5,
+    'TOKEN_MAX_AGE_DAYS': 30,
+    'MAX_MUTATIONS': 200,
+}
+
+TOKEN_SALT = 'sync.delta'
+DELETED = '_deleted'
+MUTATION_OPS = ('create', 'update')
+
+
+class InvalidSyncToken(Exception):
+    """The client must discard its copy and pull again without a token"""
+
+
+def sync_setting(name: str):
+    return getattr(settings, 'SYNC', {}).get(name, SYNC_DEFAULTS[name])
+
+
+def issue_token(user, cursors: Dict[str, list]) -> str:
+    return signing.dumps({'u': user.pk, 'c': cursors}, salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token: str, user) -> Dict[str, list]:
+    try:
+        state = signing.loads(
+            token, salt=TOKEN_SALT, max_age=timedelta(days=sync_setting('TOKEN_MAX_AGE_DAYS'))
+        )
+    except signing.SignatureExpired:
+        raise InvalidSyncToken("Sync token expired; pull again without a token")
+    except signing.BadSignature:
+        raise InvalidSyncToken("Invalid sync token")
+    if state.get('u') != user.pk:
+        raise InvalidSyncToken("Sync token was issued to another user")
+    return state['c']
+
+
+def _page(queryset, stamp: str, cursor: Optional[list], fields, limit: int, settled):
+    """One keyset page after cursor, with the cursor to resume from"""
+    if cursor:
+        after = parse_datetime(cursor[0])
+        queryset = queryset.filter(Q(**{f'{stamp}__gt': after}) | Q(**{stamp: after, 'pk__gt': cursor[1]}))
+    rows = list(queryset.order_by(stamp, 'pk').values(*fields)[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, [rows[-1][stamp].isoformat(), rows[-1]['id']], True
+    # Caught up: resume from shortly before now rather than from the last row
+    return rows, [settled.isoformat(), 0], False
+
+
+def pull(user, token: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Rows of every entity changed since token (everything visible when None),
+    ids deleted since then, and the token for the next pull. When has_more
+    is set the client should pull again straight away with the new token.
+    """
+    cursors = read_token(token, user) if token else {}
+    limit = limit or sync_setting('PAGE_SIZE')
+    settled = timezone.now() - timedelta(seconds=sync_setting('OVERLAP_SECONDS'))
+    changes, next_cursors, has_more = {}, {}, False
+
+    for name, source in SYNC_SOURCES.items():
+        queryset = source.model.objects.filter(source.visible(user))
+        changes[name], next_cursors[name], more = _page(
+            queryset, 'updated_at', cursors.get(name), source.fields, limit, settled
+        )
+        has_more |= more
+
+    deleted: Dict[str, List[int]] = {name: [] for name in SYNC_SOURCES}
+    if token:
+        # A first pull has nothing to delete client-side
+        tombstones, next_cursors[DELETED], more = _page(
+            SyncTombstone.objects.filter(tombstone_scope(user)), 'deleted_at', cursors.get(DELETED),
+            ('id', 'entity', 'object_id', 'deleted_at'), limit, settled,
+        )
+        has_more |= more
+        sent = {name: {row['id'] for row in rows} for name, rows in changes.items()}
+        for tombstone in tombstones:
+            # A row revoked and then handed back is in this pull's changes; keep it
+            if tombstone['object_id'] not in sent[tombstone['entity']]:
+                deleted[tombstone['entity']].append(tombstone['object_id'])
+    else:
+        next_cursors[DELETED] = [settled.isoformat(), 0]
+
+    return {
+        'changes': changes,
+        'deleted': deleted,
+        'has_more': has_more,
+        'token': issue_token(user, next_cursors),
+        'server_time': timezone.now(),
+    }
+
+
+class _Rejected(Exception):
+    def __init__(self, status: str, **detail):
+        super().__init__(status)
+        self.result = {'status': status, **detail}
+
+
+def _record(source: SyncSource, pk) -> Optional[Dict[str, Any]]:
+    return source.model.objects.filter(pk=pk).values(*source.fields).first()
+
+
+def _create(source: SyncSource, user, mutation: Dict[str, Any], context):
+    if source.create_serializer is None:
+        raise _Rejected('rejected', error=f"{source.name} cannot be created offline")
+    serializer = source.create_serializer(data=mutation.get('data') or {}, context=context)
+    if not serializer.is_valid():
+        raise _Rejected('invalid', errors=serializer.errors)
+    instance = serializer.save(**source.create_kwargs(user))
+    if not source.model.objects.filter(source.visible(user), pk=instance.pk).exists():
+        raise _Rejected('forbidden', error="Created record would not be visible to you")
+    return instance
+
+
+def _update(source: SyncSource, user, mutation: Dict[str, Any], context):
+    if source.update_serializer is None:
+        raise _Rejected('rejected', error=f"{source.name} cannot be updated offline")
+    base = parse_datetime(str(mutation.get('base_updated_at') or ''))
+    if base is None:
+        raise _Rejected('invalid', error="base_updated_at is required for updates")
+    instance = source.model.objects.select_for_update().filter(
+        source.visible(user), pk=mutation.get('id')
+    ).first()
+    if instance is None:
+        raise _Rejected('not_found', error="Record not found")
+    if instance.updated_at != base:
+        raise _Rejected('conflict', id=instance.pk, server=_record(source, instance.pk))
+    serializer = source.update_serializer(instance, data=mutation.get('data') or {}, partial=True, context=context)
+    if not serializer.is_valid():
+        raise _Rejected('invalid', errors=serializer.errors)
+    return serializer.save()
+
+
+def apply_mutation(user, mutation: Dict[str, Any], context) -> Dict[str, Any]:
+    """Apply one offline write in its own savepoint and describe the outcome"""
+    client_id = str(mutation.get('client_id') or '')
+    entity, op = mutation.get('entity'), mutation.get('op')
+    result = {'client_id': client_id, 'entity': entity, 'op': op}
+    if not client_id or entity not in SYNC_SOURCES or op not in MUTATION_OPS:
+        return {**result, 'status': 'invalid', 'error': "client_id, a known entity and op create/update are required"}
+
+    applied = SyncMutation.objects.filter(user=user, client_id=client_id).first()
+    if applied:
+        return {**applied.result, 'replayed': True}
+
+    source = SYNC_SOURCES[entity]
+    try:
+        with transaction.atomic():
+            apply = _create if op == 'create' else _update
+            instance = apply(source, user, mutation, context)
+            result.update(status='applied', id=instance.pk, record=_record(source, instance.pk))
+            SyncMutation.objects.create(user=user, client_id=client_id, entity=entity, result=result)
+    except _Rejected as rejected:
+        return {**result, **rejected.result}
+    except IntegrityError as error:
+        # Either a concurrent retry of the same mutation won the race, or
+        # the write itself broke a constraint
+        applied = SyncMutation.objects.filter(user=user, client_id=client_id).first()
+        if applied is None:
+            return {**result, 'status': 'invalid', 'error': str(error)}
+        return {**applied.result, 'replayed': True}
+    return result
+
+
+def push(user, mutations: List[Dict[str, Any]], context) -> List[Dict[str, Any]]:
+    return [apply_mutation(user, mutation, context) for mutation in mutations]
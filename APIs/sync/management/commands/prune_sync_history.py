@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync.delta import sync_setting
+from sync.models import SyncMutation, SyncTombstone
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones and mutation receipts older than the sync token lifetime"
+
+    def handle(self, *args, **options):
+        # Tokens older than this are rejected, so nothing can still need these rows
+        cutoff = timezone.now() - timedelta(days=sync_setting('TOKEN_MAX_AGE_DAYS'))
+        tombstones, _ = SyncTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        mutations, _ = SyncMutation.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {tombstones} tombstones and {mutations} mutation receipts"))
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 18:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='synctombstone',
+            name='clinician_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='synctombstone',
+            name='patient_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='synctombstone',
+            name='physician_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='synctombstone',
+            name='revoked',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='synctombstone',
+            name='thread_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import models
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class SyncTombstone(models.Model):
+    """
+    Record of a synced row a client must drop: hard-deleted, or (revoked)
+    moved out of the scope recorded here by a reassignment. The scope keys
+    are plain ids, as the rows they pointed at may be gone too.
+    """
+    entity = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    patient_id = models.BigIntegerField(null=True, blank=True)
+    physician_id = models.BigIntegerField(null=True, blank=True)
+    clinician_id = models.BigIntegerField(null=True, blank=True)
+    thread_id = models.BigIntegerField(null=True, blank=True)
+    # The row still exists; only the holders of the keys above lost it
+    revoked = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='sync_tombstone_cursor_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class SyncMutation(models.Model):
+    """Outcome of an applied offline write, replayed when a client retries it"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sync_mutations')
+    client_id = models.CharField(max_length=64)
+    entity = models.CharField(max_length=50)
+    result = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_id'], name='sync_mutation_client_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.entity} {self.client_id}"
@@ -0,0 +1,236 @@
+"""
+Entities exposed to offline clients through the delta sync API, with the
+rows each role may see and the serializers that validate offline writes.
+"""
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+from django.db.models import F, Q
+
+from communication.models import CommunicationThread, Message
+from communication.serializers import MessageCreateSerializer
+from file_management.models import UploadedFile
+from oasis.models import OasisAssessment
+from oasis.serializers import OasisAssessmentCreateSerializer, OasisAssessmentUpdateSerializer
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+from visits.models import Visit, VisitNote
+from visits.serializers import VisitNoteSerializer, VisitSerializer
+
+from .models import SyncTombstone
+
+
+class SyncSource(NamedTuple):
+    name: str
+    model: type
+    visible: Callable  # user -> Q of rows the user may sync
+    exclude: Sequence[str] = ()  # columns too heavy for the wire
+    create_serializer: Optional[type] = None
+    update_serializer: Optional[type] = None
+    create_kwargs: Callable = lambda user: {}  # extra save() kwargs on create
+    # SyncTombstone scope column -> lookup on the model, recorded at deletion
+    scope_keys: Dict[str, str] = {}
+    tombstones: Callable = lambda user: Q(revoked=False)  # user -> Q of SyncTombstone rows for this entity
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return tuple(
+            field.attname for field in self.model._meta.concrete_fields if field.name not in self.exclude
+        )
+
+
+def _patient_scope(user, prefix: str = '') -> Q:
+    """Patients a user works with, reached through the given relation prefix"""
+    if user.role == 'admin':
+        return Q()
+    if user.role == 'physician':
+        return Q(**{f'{prefix}assigned_physician': user})
+    return Q(**{f'{prefix}id__in': Visit.objects.filter(clinician=user).values('patient_id')})
+
+
+def _visit_scope(user, prefix: str = '') -> Q:
+    # Mirrors VisitViewSet.get_queryset
+    if user.role == 'admin':
+        return Q()
+    if user.role == 'physician':
+        return Q(**{f'{prefix}patient__assigned_physician': user})
+    return Q(**{f'{prefix}clinician': user})
+
+
+def _patients(user) -> Q:
+    # Mirrors PatientViewSet.get_queryset; inactive rows still sync so
+    # clients learn about deactivations
+    if user.role == 'physician':
+        return Q(assigned_physician=user)
+    return Q()
+
+
+def _oasis(user) -> Q:
+    if user.role == 'admin':
+        return Q()
+    if user.role == 'physician':
+        return Q(patient__assigned_physician=user)
+    return Q(clinician=user)
+
+
+def _messages(user) -> Q:
+    return Q(thread__in=CommunicationThread.objects.filter(participants=user).values('id'))
+
+
+# Tombstone counterparts of the scopes above, over the keys recorded on each tombstone.
+# Admins see every row, so they only need real deletions, never revocations.
+
+def _patient_tombstones(user) -> Q:
+    if user.role == 'physician':
+        return Q(physician_id=user.pk)
+    return Q(revoked=False)
+
+
+def _visit_tombstones(user) -> Q:
+    if user.role == 'admin':
+        return Q(revoked=False)
+    if user.role == 'physician':
+        return Q(physician_id=user.pk)
+    return Q(clinician_id=user.pk)
+
+
+def _file_tombstones(user) -> Q:
+    if user.role == 'admin':
+        return Q(revoked=False)
+    if user.role == 'physician':
+        return Q(physician_id=user.pk)
+    return Q(revoked=False, patient_id__in=Visit.objects.filter(clinician=user).values('patient_id'))
+
+
+def _message_tombstones(user) -> Q:
+    return Q(thread_id__in=CommunicationThread.objects.filter(participants=user).values('id'))
+
+
+SYNC_SOURCES: Dict[str, SyncSource] = {source.name: source for source in [
+    SyncSource(
+        'patients', Patient, _patients,
+        update_serializer=PatientSerializer,
+        scope_keys={'patient_id': 'id', 'physician_id': 'assigned_physician_id'},
+        tombstones=_patient_tombstones,
+    ),
+    SyncSource(
+        'visits', Visit, _visit_scope,
+        update_serializer=VisitSerializer,
+        scope_keys={
+            'patient_id': 'patient_id', 'physician_id': 'patient__assigned_physician_id',
+            'clinician_id': 'clinician_id',
+        },
+        tombstones=_visit_tombstones,
+    ),
+    SyncSource(
+        'visit_notes', VisitNote, lambda user: _visit_scope(user, 'visit__'),
+        create_serializer=VisitNoteSerializer,
+        update_serializer=VisitNoteSerializer,
+        create_kwargs=lambda user: {'created_by': user},
+        scope_keys={
+            'patient_id': 'visit__patient_id', 'physician_id': 'visit__patient__assigned_physician_id',
+            'clinician_id': 'visit__clinician_id',
+        },
+        tombstones=_visit_tombstones,
+    ),
+    SyncSource(
+        'oasis_assessments', OasisAssessment, _oasis,
+        create_serializer=OasisAssessmentCreateSerializer,
+        update_serializer=OasisAssessmentUpdateSerializer,
+        scope_keys={
+            'patient_id': 'patient_id', 'physician_id': 'patient__assigned_physician_id',
+            'clinician_id': 'clinician_id',
+        },
+        tombstones=_visit_tombstones,
+    ),
+    SyncSource(
+        'files', UploadedFile, lambda user: _patient_scope(user, 'patient__'),
+        exclude=('ocr_text',),
+        scope_keys={'patient_id': 'patient_id', 'physician_id': 'patient__assigned_physician_id'},
+        tombstones=_file_tombstones,
+    ),
+    SyncSource(
+        'messages', Message, _messages,
+        create_serializer=MessageCreateSerializer,
+        scope_keys={'thread_id': 'thread_id'},
+        tombstones=_message_tombstones,
+    ),
+]}
+
+_BY_MODEL = {source.model: source.name for source in SYNC_SOURCES.values()}
+
+
+def tombstone_scope(user) -> Q:
+    """SyncTombstone rows the user should apply"""
+    scope = Q(pk__in=[])
+    for source in SYNC_SOURCES.values():
+        scope |= Q(entity=source.name) & source.tombstones(user)
+    return scope
+
+
+def _scope_keys(source: SyncSource, pk) -> Optional[Dict[str, Any]]:
+    """The row's tombstone scope columns as currently stored"""
+    # Aliased, as annotations may not reuse a model field's name (patient_id)
+    aliases = {f'scope_{column}': F(lookup) for column, lookup in source.scope_keys.items()}
+    row = source.model.objects.filter(pk=pk).values(**aliases).first()
+    return {alias.removeprefix('scope_'): value for alias, value in row.items()} if row else None
+
+
+def record_tombstone(sender, instance, **kwargs):
+    # pre_delete: the rows the scope keys are read through still exist, even in a cascade
+    source = SYNC_SOURCES[_BY_MODEL[sender]]
+    SyncTombstone.objects.create(entity=source.name, object_id=instance.pk, **(_scope_keys(source, instance.pk) or {}))
+
+
+def _revoke(source: SyncSource, queryset, **keys) -> None:
+    SyncTombstone.objects.bulk_create([
+        SyncTombstone(entity=source.name, object_id=pk, revoked=True, **keys)
+        for pk in queryset.values_list('pk', flat=True)
+    ])
+
+
+# Columns whose change moves a row (and what hangs off it) out of someone's scope
+OWNER_COLUMNS = {
+    Patient: ('assigned_physician_id',),
+    Visit: ('clinician_id', 'patient_id'),
+    OasisAssessment: ('clinician_id', 'patient_id'),
+}
+
+
+def remember_owners(sender, instance, update_fields=None, raw=False, **kwargs):
+    """pre_save: note the owner columns as stored, when this save may change them"""
+    columns = OWNER_COLUMNS[sender]
+    if raw or instance._state.adding or (
+        update_fields is not None
+        and not {name for column in columns for name in (column, column.removesuffix('_id'))} & set(update_fields)
+    ):
+        return
+    instance._sync_stored_scope = _scope_keys(SYNC_SOURCES[_BY_MODEL[sender]], instance.pk)
+
+
+def revoke_reassigned(sender, instance, created, raw=False, **kwargs):
+    """post_save: tombstone the row for whoever lost it through a reassignment"""
+    stored = instance.__dict__.pop('_sync_stored_scope', None)
+    if created or raw or stored is None:
+        return
+    source = SYNC_SOURCES[_BY_MODEL[sender]]
+    current = _scope_keys(source, instance.pk)
+    lost_physician = stored['physician_id'] if stored['physician_id'] != current['physician_id'] else None
+    lost_clinician = stored.get('clinician_id') if stored.get('clinician_id') != current.get('clinician_id') else None
+
+    if sender is Patient and lost_physician:
+        for name, related in (
+            ('patients', Patient.objects.filter(pk=instance.pk)),
+            ('visits', Visit.objects.filter(patient_id=instance.pk)),
+            ('visit_notes', VisitNote.objects.filter(visit__patient_id=instance.pk)),
+            ('oasis_assessments', OasisAssessment.objects.filter(patient_id=instance.pk)),
+            ('files', UploadedFile.objects.filter(patient_id=instance.pk)),
+        ):
+            _revoke(SYNC_SOURCES[name], related, physician_id=lost_physician)
+        return
+
+    for keys in ({'physician_id': lost_physician}, {'clinician_id': lost_clinician}):
+        if not any(keys.values()):
+            continue
+        _revoke(source, sender.objects.filter(pk=instance.pk), **keys)
+        if sender is Visit:
+            _revoke(SYNC_SOURCES['visit_notes'], VisitNote.objects.filter(visit_id=instance.pk), **keys)
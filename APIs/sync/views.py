@@ -0,0 +1,41 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .delta import InvalidSyncToken, pull, push, sync_setting
+
+
+class DeltaSyncView(APIView):
+    """
+    GET: rows changed since ?token= (a full snapshot without one)
+    POST: apply a batch of offline writes {"mutations": [...]}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', 0)) or None
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit is not None and not 1 <= limit <= sync_setting('PAGE_SIZE'):
+            return Response(
+                {'error': f"limit must be between 1 and {sync_setting('PAGE_SIZE')}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            return Response(pull(request.user, request.query_params.get('token'), limit))
+        except InvalidSyncToken as e:
+            # 410 tells the client to drop its local copy and pull from scratch
+            return Response({'error': str(e)}, status=status.HTTP_410_GONE)
+
+    def post(self, request):
+        mutations = request.data.get('mutations')
+        if not isinstance(mutations, list) or not all(isinstance(m, dict) for m in mutations):
+            return Response({'error': 'mutations must be a list of objects'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(mutations) > sync_setting('MAX_MUTATIONS'):
+            return Response(
+                {'error': f"At most {sync_setting('MAX_MUTATIONS')} mutations per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'results': push(request.user, mutations, {'request': request})})
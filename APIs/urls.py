@@ -7,7 +7,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import JsonResponse, HttpResponse
+from django.http import HttpResponse
+from core.health import liveness_view, readiness_view
+from core.metrics import metrics_view
+from core.views import RequestProfileView, ResponseCacheStatsView, SlowRequestView
 
 def home(request):
     """API Documentation Homepage"""
@@ -61,6 +64,7 @@ def home(request):
     <ul>
         <li><a href="/admin/">Admin Panel</a></li>
         <li><a href="/health/">Health Check</a></li>
+        <li><a href="/metrics">Metrics</a></li>
     </ul>
     </body>
     </html>
@@ -80,20 +84,19 @@ urlpatterns = [
     path('api/v1/oasis/', include('oasis.urls')),
     path('api/v1/files/', include('files.urls')),
     path('api/v1/communication/', include('communication.urls')),
+    path('api/v1/sync/', include('sync.urls')),
+    path('api/v1/events/', include('events.urls')),
     
-    # Health check endpoint
-    path('health/', lambda request: JsonResponse({
-        'status': 'healthy', 
-        'version': '1.0',
-        'services': {
-            'authentication': 'active',
-            'patients': 'active',
-            'visits': 'active',
-            'oasis': 'active',
-            'files': 'active',
-            'communication': 'active'
-        }
-    })),
+    # System diagnostics
+    path('api/v1/system/cache-stats/', ResponseCacheStatsView.as_view(), name='response_cache_stats'),
+    path('api/v1/system/profile/', RequestProfileView.as_view(), name='request_profile'),
+    path('api/v1/system/profile/slow/<int:entry_id>/', SlowRequestView.as_view(), name='slow_request'),
+    
+    # Health checks and metrics
+    path('health/', readiness_view, name='health'),
+    path('health/live/', liveness_view, name='health_live'),
+    path('health/ready/', readiness_view, name='health_ready'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve media files in development
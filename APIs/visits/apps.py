@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class VisitsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'visits'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from .models import Visit
+        from .vitals import on_visit_saved
+        # Connects template registry invalidation signals
+        from . import registry  # noqa: F401
+
+        post_save.connect(on_visit_saved, sender=Visit, dispatch_uid='visits_sync_vitals')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from file_management.models import UploadedFile
+from visits.models import Visit
+from visits.vitals import sync_file_vitals, sync_visit_vitals
+
+
+class Command(BaseCommand):
+    help = 'Rebuild normalized vital sign readings and rollups from visits and OCR results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patient', type=int, help='Only backfill this patient id')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        visits = Visit.objects.exclude(vital_signs={}).only(
+            'id', 'patient_id', 'start_time', 'scheduled_date', 'vital_signs'
+        )
+        files = UploadedFile.objects.filter(processing_status='completed', category='forms').only(
+            'id', 'patient_id', 'created_at', 'structured_data'
+        )
+        if options['patient']:
+            visits = visits.filter(patient_id=options['patient'])
+            files = files.filter(patient_id=options['patient'])
+
+        readings = 0
+        for visit in visits.iterator(chunk_size=options['chunk_size']):
+            readings += sync_visit_vitals(visit)
+        for uploaded_file in files.iterator(chunk_size=options['chunk_size']):
+            readings += sync_file_vitals(uploaded_file, uploaded_file.structured_data)
+
+        self.stdout.write(self.style.SUCCESS(f'Stored {readings} vital sign readings'))
@@ -0,0 +1,83 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.extraction import EXTRACTION_VERSION, benchmark, extract_many
+from events.capture import record_updates
+from visits.models import VisitNote
+
+EXTRACTABLE_NOTE_TYPES = ('voice_transcript', 'unstructured')
+
+SAMPLE_SENTENCES = [
+    'Patient reports mild shortness of breath on exertion.',
+    'BP 132/84, HR 78, temp 98.4, RR 18, O2 sat 96%.',
+    'Pain 3/10 in the left knee.',
+    'Currently taking metoprolol 25 mg bid and lisinopril 10 mg daily.',
+    'Allergic to penicillin and sulfa.',
+    'Assessment: wound healing well with no signs of infection.',
+    'Plan: continue dressing changes and reassess next visit.',
+    'Education: reviewed fall precautions with caregiver.',
+    'Weight 182.5 lbs, stable since last visit.',
+]
+
+
+class Command(BaseCommand):
+    help = 'Fill VisitNote.structured_data for transcript and free-text notes, or benchmark extraction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-extract notes that already have data')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=5000, help='Notes loaded from the database at a time')
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--benchmark', type=int, metavar='NOTES',
+                            help='Measure notes/sec on NOTES synthetic notes instead of touching the database')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            return self._benchmark(options)
+
+        notes = VisitNote.objects.filter(note_type__in=EXTRACTABLE_NOTE_TYPES)
+        if not options['all']:
+            notes = notes.filter(structured_data={})
+
+        pool = ProcessPoolExecutor(max_workers=options['workers']) if options['workers'] > 1 else None
+        processed = 0
+        last_id = 0
+        try:
+            while True:
+                page = list(
+                    notes.filter(id__gt=last_id).order_by('id').values_list('id', 'content')[:options['page_size']]
+                )
+                if not page:
+                    break
+                last_id = page[-1][0]
+                for batch in extract_many(page, options['batch_size'], pool):
+                    # bulk_update skips auto_now, so bump updated_at for delta sync and ETags
+                    updated_at = timezone.now()
+                    with transaction.atomic():
+                        VisitNote.objects.bulk_update(
+                            [VisitNote(id=note_id, structured_data=data, updated_at=updated_at) for note_id, data in batch],
+                            ['structured_data', 'updated_at']
+                        )
+                        record_updates(VisitNote, [note_id for note_id, _ in batch], ['structured_data', 'updated_at'])
+                    processed += len(batch)
+                self.stdout.write(f'{processed} notes extracted')
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f'Extracted {processed} notes (extraction v{EXTRACTION_VERSION})'))
+
+    def _benchmark(self, options):
+        rng = random.Random(42)
+        texts = [' '.join(rng.sample(SAMPLE_SENTENCES, k=rng.randint(4, len(SAMPLE_SENTENCES))))
+                 for _ in range(options['benchmark'])]
+        for workers in sorted({1, options['workers']}):
+            result = benchmark(texts, options['batch_size'], workers)
+            self.stdout.write(
+                f"{result['notes']} notes, {result['workers']} worker(s): "
+                f"{result['seconds']}s, {result['notes_per_second']} notes/sec"
+            )
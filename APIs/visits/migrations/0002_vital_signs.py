@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file_management', '0001_initial'),
+        ('patients', '0001_initial'),
+        ('visits', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VitalSignRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('bp_systolic', 'Systolic Blood Pressure'), ('bp_diastolic', 'Diastolic Blood Pressure'), ('heart_rate', 'Heart Rate'), ('temperature', 'Temperature'), ('respiratory_rate', 'Respiratory Rate'), ('oxygen_saturation', 'Oxygen Saturation'), ('weight', 'Weight'), ('blood_glucose', 'Blood Glucose'), ('pain', 'Pain Score')], max_length=20)),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], max_length=4)),
+                ('period_start', models.DateField()),
+                ('count', models.PositiveIntegerField()),
+                ('min_value', models.FloatField()),
+                ('max_value', models.FloatField()),
+                ('mean_value', models.FloatField()),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vital_rollups', to='patients.patient')),
+            ],
+            options={
+                'ordering': ['period_start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VitalSign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField()),
+                ('metric', models.CharField(choices=[('bp_systolic', 'Systolic Blood Pressure'), ('bp_diastolic', 'Diastolic Blood Pressure'), ('heart_rate', 'Heart Rate'), ('temperature', 'Temperature'), ('respiratory_rate', 'Respiratory Rate'), ('oxygen_saturation', 'Oxygen Saturation'), ('weight', 'Weight'), ('blood_glucose', 'Blood Glucose'), ('pain', 'Pain Score')], max_length=20)),
+                ('value', models.FloatField()),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vital_readings', to='patients.patient')),
+                ('source_file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='vital_readings', to='file_management.uploadedfile')),
+                ('visit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='vital_readings', to='visits.visit')),
+            ],
+            options={
+                'ordering': ['recorded_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='vitalsignrollup',
+            constraint=models.UniqueConstraint(fields=('patient', 'metric', 'period', 'period_start'), name='vital_rollup_bucket_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='vitalsign',
+            index=models.Index(fields=['patient', 'metric', 'recorded_at'], name='vital_patient_metric_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('visits', '0002_vital_signs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='visit',
+            name='clinician',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='visits', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['clinician', 'scheduled_date'], name='visit_clinician_sched_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['status', 'scheduled_date'], name='visit_status_sched_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_transitions(apps, schema_editor):
+    """Seed history from visits that were already started or finished"""
+    Visit = apps.get_model('visits', 'Visit')
+    VisitTransition = apps.get_model('visits', 'VisitTransition')
+    batch = []
+    visits = Visit.objects.filter(start_time__isnull=False).only(
+        'id', 'clinician_id', 'visit_type', 'status', 'start_time', 'end_time'
+    )
+    for visit in visits.iterator(chunk_size=500):
+        common = {'visit_id': visit.id, 'clinician_id': visit.clinician_id, 'visit_type': visit.visit_type}
+        batch.append(VisitTransition(
+            from_status='scheduled', to_status='in_progress', occurred_at=visit.start_time, **common
+        ))
+        if visit.end_time and visit.status == 'completed':
+            batch.append(VisitTransition(
+                from_status='in_progress', to_status='completed', occurred_at=visit.end_time,
+                duration_seconds=max(0, int((visit.end_time - visit.start_time).total_seconds())), **common
+            ))
+        if len(batch) >= 500:
+            VisitTransition.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        VisitTransition.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('visits', '0004_geocoded_address'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('scheduled', 'Scheduled'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('no_show', 'No Show')], max_length=15)),
+                ('to_status', models.CharField(choices=[('scheduled', 'Scheduled'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('no_show', 'No Show')], max_length=15)),
+                ('occurred_at', models.DateTimeField()),
+                ('visit_type', models.CharField(choices=[('SN', 'Skilled Nursing'), ('PT', 'Physical Therapy'), ('OT', 'Occupational Therapy'), ('ST', 'Speech Therapy'), ('MSW', 'Medical Social Work'), ('HHA', 'Home Health Aide')], max_length=5)),
+                ('duration_seconds', models.PositiveIntegerField(blank=True, null=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('clinician', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('visit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='visits.visit')),
+            ],
+            options={
+                'ordering': ['occurred_at'],
+                'indexes': [models.Index(fields=['visit', 'to_status'], name='transition_visit_status_idx'), models.Index(fields=['to_status', 'occurred_at'], name='transition_status_ts_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_transitions, migrations.RunPython.noop),
+    ]
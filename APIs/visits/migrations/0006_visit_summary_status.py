@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:38
+
+from django.db import migrations, models
+
+
+def mark_existing_summaries(apps, schema_editor):
+    Visit = apps.get_model('visits', 'Visit')
+    Visit.objects.exclude(ai_summary='').update(ai_summary_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visits', '0005_visit_transitions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visit',
+            name='ai_summary_generated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='visit',
+            name='ai_summary_status',
+            field=models.CharField(choices=[('none', 'Not Requested'), ('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', max_length=15),
+        ),
+        migrations.RunPython(mark_existing_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+import visits.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('visits', '0006_visit_summary_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoiceSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('recording', 'Recording'), ('finalized', 'Finalized'), ('failed', 'Failed')], default='recording', max_length=15)),
+                ('audio_format', models.CharField(default='pcm16', max_length=20)),
+                ('sample_rate', models.PositiveIntegerField(default=16000)),
+                ('next_sequence', models.PositiveIntegerField(default=0)),
+                ('transcript', models.TextField(blank=True)),
+                ('partial_transcript', models.TextField(blank=True)),
+                ('asr_state', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('note', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='visits.visitnote')),
+                ('visit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='voice_sessions', to='visits.visit')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VoiceChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField()),
+                ('audio', models.FileField(blank=True, upload_to=visits.models.voice_chunk_upload_to)),
+                ('byte_size', models.PositiveIntegerField()),
+                ('final_text', models.TextField(blank=True)),
+                ('partial_text', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='visits.voicesession')),
+            ],
+            options={
+                'ordering': ['session', 'sequence'],
+                'unique_together': {('session', 'sequence')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visits', '0007_voice_sessions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['updated_at', 'id'], name='visit_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitnote',
+            index=models.Index(fields=['updated_at', 'id'], name='visit_note_sync_idx'),
+        ),
+    ]
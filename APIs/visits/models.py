@@ -1,5 +1,10 @@
+import copy
+import os
+import uuid
+
 from django.db import models
 from django.conf import settings
+from events.capture import ChangeCaptureMixin
 from patients.models import Patient
 
 
@@ -20,9 +25,19 @@ class VisitStatus(models.TextChoices):
     NO_SHOW = 'no_show', 'No Show'
 
 
-class Visit(models.Model):
+class SummaryStatus(models.TextChoices):
+    NONE = 'none', 'Not Requested'
+    PENDING = 'pending', 'Pending'
+    READY = 'ready', 'Ready'
+    FAILED = 'failed', 'Failed'
+
+
+class Visit(ChangeCaptureMixin, models.Model):
     patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='visits')
-    clinician = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='visits')
+    # Null while a visit is waiting in the unassigned queue
+    clinician = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='visits'
+    )
     visit_type = models.CharField(max_length=5, choices=VisitType.choices)
     status = models.CharField(max_length=15, choices=VisitStatus.choices, default=VisitStatus.SCHEDULED)
     
@@ -39,18 +54,42 @@ class Visit(models.Model):
     # AI-generated content
     ai_summary = models.TextField(blank=True)
     ai_recommendations = models.JSONField(default=list, blank=True)
+    ai_summary_status = models.CharField(max_length=15, choices=SummaryStatus.choices, default=SummaryStatus.NONE)
+    ai_summary_generated_at = models.DateTimeField(null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-scheduled_date']
+        indexes = [
+            # Calendar queries always filter one clinician (or the unassigned
+            # queue) or one status over a scheduled_date window
+            models.Index(fields=['clinician', 'scheduled_date'], name='visit_clinician_sched_idx'),
+            models.Index(fields=['status', 'scheduled_date'], name='visit_status_sched_idx'),
+            # Delta sync keyset scans
+            models.Index(fields=['updated_at', 'id'], name='visit_sync_idx'),
+        ]
+
+    # Fields the normalized vital readings are built from (visits/vitals.py)
+    VITALS_SOURCE_FIELDS = ('vital_signs', 'start_time', 'scheduled_date')
 
     def __str__(self):
         return f"{self.patient.full_name} - {self.get_visit_type_display()} ({self.scheduled_date.date()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not set(cls.VITALS_SOURCE_FIELDS) & instance.get_deferred_fields():
+            instance._loaded_vitals_source = instance.vitals_source()
+        return instance
 
-class VisitNote(models.Model):
+    def vitals_source(self):
+        """The current vitals source values, copied so in-place edits to vital_signs show up as changes"""
+        return tuple(copy.deepcopy(getattr(self, name)) for name in self.VITALS_SOURCE_FIELDS)
+
+
+class VisitNote(ChangeCaptureMixin, models.Model):
     NOTE_TYPES = [
         ('structured', 'Structured'),
         ('unstructured', 'Unstructured'),
@@ -70,6 +109,9 @@ class VisitNote(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='visit_note_sync_idx'),
+        ]
 
     def __str__(self):
         return f"{self.visit} - {self.title}"
@@ -84,3 +126,158 @@ class DocumentationTemplate(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.get_discipline_display()})"
+
+
+class VitalMetric(models.TextChoices):
+    BP_SYSTOLIC = 'bp_systolic', 'Systolic Blood Pressure'
+    BP_DIASTOLIC = 'bp_diastolic', 'Diastolic Blood Pressure'
+    HEART_RATE = 'heart_rate', 'Heart Rate'
+    TEMPERATURE = 'temperature', 'Temperature'
+    RESPIRATORY_RATE = 'respiratory_rate', 'Respiratory Rate'
+    OXYGEN_SATURATION = 'oxygen_saturation', 'Oxygen Saturation'
+    WEIGHT = 'weight', 'Weight'
+    BLOOD_GLUCOSE = 'blood_glucose', 'Blood Glucose'
+    PAIN = 'pain', 'Pain Score'
+
+
+class VitalSign(models.Model):
+    """One normalized vital sign reading, extracted from a visit or an OCR'd document"""
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='vital_readings')
+    visit = models.ForeignKey(Visit, on_delete=models.CASCADE, null=True, blank=True, related_name='vital_readings')
+    source_file = models.ForeignKey(
+        'file_management.UploadedFile', on_delete=models.CASCADE, null=True, blank=True, related_name='vital_readings'
+    )
+    recorded_at = models.DateTimeField()
+    metric = models.CharField(max_length=20, choices=VitalMetric.choices)
+    value = models.FloatField()
+
+    class Meta:
+        ordering = ['recorded_at']
+        indexes = [
+            models.Index(fields=['patient', 'metric', 'recorded_at'], name='vital_patient_metric_ts_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_id} {self.metric}={self.value} @ {self.recorded_at}"
+
+
+class VitalSignRollup(models.Model):
+    """Precomputed daily/weekly min/max/mean of a patient's vital sign"""
+    PERIODS = [
+        ('day', 'Day'),
+        ('week', 'Week'),
+    ]
+
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='vital_rollups')
+    metric = models.CharField(max_length=20, choices=VitalMetric.choices)
+    period = models.CharField(max_length=4, choices=PERIODS)
+    period_start = models.DateField()
+    
+    count = models.PositiveIntegerField()
+    min_value = models.FloatField()
+    max_value = models.FloatField()
+    mean_value = models.FloatField()
+
+    class Meta:
+        ordering = ['period_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['patient', 'metric', 'period', 'period_start'], name='vital_rollup_bucket_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_id} {self.metric} {self.period} {self.period_start}"
+
+
+class GeocodedAddress(models.Model):
+    """Local lookup table of patient address coordinates used for route planning"""
+    address_hash = models.CharField(max_length=40, unique=True)
+    address = models.TextField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    source = models.CharField(max_length=50)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.address} ({self.latitude}, {self.longitude})"
+
+
+class VisitTransition(models.Model):
+    """Append-only log of visit status changes, used for duration analytics"""
+    visit = models.ForeignKey(Visit, on_delete=models.CASCADE, related_name='transitions')
+    from_status = models.CharField(max_length=15, choices=VisitStatus.choices)
+    to_status = models.CharField(max_length=15, choices=VisitStatus.choices)
+    occurred_at = models.DateTimeField()
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    # Copied from the visit so analytics never join back to it
+    clinician = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    visit_type = models.CharField(max_length=5, choices=VisitType.choices)
+    duration_seconds = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['occurred_at']
+        indexes = [
+            models.Index(fields=['visit', 'to_status'], name='transition_visit_status_idx'),
+            models.Index(fields=['to_status', 'occurred_at'], name='transition_status_ts_idx'),
+        ]
+
+    def __str__(self):
+        return f"Visit {self.visit_id}: {self.from_status} -> {self.to_status}"
+
+
+def voice_chunk_upload_to(instance, filename):
+    return os.path.join('voice', str(instance.session_id), filename)
+
+
+class VoiceSession(models.Model):
+    """One dictation: audio arrives in numbered chunks and is transcribed as it streams in"""
+    STATUS_CHOICES = [
+        ('recording', 'Recording'),
+        ('finalized', 'Finalized'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    visit = models.ForeignKey(Visit, on_delete=models.CASCADE, related_name='voice_sessions')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='recording')
+
+    audio_format = models.CharField(max_length=20, default='pcm16')
+    sample_rate = models.PositiveIntegerField(default=16000)
+    next_sequence = models.PositiveIntegerField(default=0)
+
+    transcript = models.TextField(blank=True)  # text the recognizer has committed
+    partial_transcript = models.TextField(blank=True)  # current hypothesis, may still change
+    asr_state = models.JSONField(default=dict, blank=True)
+    note = models.ForeignKey(VisitNote, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Voice session {self.id} for visit {self.visit_id}"
+
+
+class VoiceChunk(models.Model):
+    session = models.ForeignKey(VoiceSession, on_delete=models.CASCADE, related_name='chunks')
+    sequence = models.PositiveIntegerField()
+    audio = models.FileField(upload_to=voice_chunk_upload_to, blank=True)
+    byte_size = models.PositiveIntegerField()
+    final_text = models.TextField(blank=True)  # text committed by this chunk
+    partial_text = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['session', 'sequence']
+        unique_together = ['session', 'sequence']
+
+    def __str__(self):
+        return f"{self.session_id} #{self.sequence}"
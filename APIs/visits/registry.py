@@ -0,0 +1,24 @@
+from core.template_registry import TemplateRegistry, TemplateValidationError
+from .models import DocumentationTemplate
+from .serializers import DocumentationTemplateSerializer
+
+
+def compile_documentation_template(template_data):
+    """Validate template_data and precompute section/field counts"""
+    if not isinstance(template_data, dict):
+        raise TemplateValidationError("Template data must be a JSON object")
+
+    sections = template_data.get('sections', [])
+    if not isinstance(sections, list):
+        raise TemplateValidationError("Template sections must be a list")
+
+    return {
+        'section_count': len(sections),
+        'field_count': sum(len(section.get('fields', [])) for section in sections if isinstance(section, dict)),
+    }
+
+
+documentation_templates = TemplateRegistry(
+    'documentation', DocumentationTemplate, DocumentationTemplateSerializer, 'template_data',
+    compile_documentation_template
+)
@@ -0,0 +1,127 @@
+"""
+Pure-Python route heuristics for daily clinician routes.
+
+Nothing here touches Django so jobs can be shipped to a process pool as
+plain dicts. Times are minutes after midnight; node 0 of a matrix is the
+depot and node i is stop i - 1.
+"""
+import math
+from typing import Any, Dict, List, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+# Minutes of lateness are weighted well above minutes of driving
+LATENESS_PENALTY = 10.0
+
+
+def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def travel_matrix(points: Sequence[Tuple[float, float]], speed_kmh: float, road_factor: float) -> List[List[float]]:
+    """Symmetric drive-time matrix in minutes from straight-line distance"""
+    size = len(points)
+    matrix = [[0.0] * size for _ in range(size)]
+    minutes_per_km = 60.0 / speed_kmh * road_factor
+    for i in range(size):
+        for j in range(i + 1, size):
+            matrix[i][j] = matrix[j][i] = haversine_km(points[i], points[j]) * minutes_per_km
+    return matrix
+
+
+def simulate(order: Sequence[int], stops: List[Dict[str, Any]], matrix: List[List[float]], day_start: float):
+    """
+    Walk a route and return (travel, lateness, timeline) where timeline holds
+    (arrival, start) for each stop in order. Early arrivals wait for the window.
+    """
+    clock = day_start
+    travel = lateness = 0.0
+    timeline = []
+    previous = 0
+    for index in order:
+        stop = stops[index]
+        leg = matrix[previous][index + 1]
+        travel += leg
+        arrival = clock + leg
+        start = max(arrival, stop['window_start'])
+        lateness += max(0.0, start - stop['window_end'])
+        timeline.append((arrival, start))
+        clock = start + stop['service_minutes']
+        previous = index + 1
+    return travel, lateness, timeline
+
+
+def route_cost(order, stops, matrix, day_start) -> float:
+    travel, lateness, _ = simulate(order, stops, matrix, day_start)
+    return travel + LATENESS_PENALTY * lateness
+
+
+def nearest_neighbour(stops: List[Dict[str, Any]], matrix: List[List[float]], day_start: float) -> List[int]:
+    """Greedy construction: always drive to the stop that can start soonest"""
+    remaining = set(range(len(stops)))
+    order = []
+    clock = day_start
+    previous = 0
+    while remaining:
+        def start_time(index):
+            return max(clock + matrix[previous][index + 1], stops[index]['window_start'])
+
+        best = min(remaining, key=lambda index: (start_time(index), stops[index]['window_end'], index))
+        start = start_time(best)
+        order.append(best)
+        remaining.remove(best)
+        clock = start + stops[best]['service_minutes']
+        previous = best + 1
+    return order
+
+
+def two_opt(order: List[int], stops, matrix, day_start, max_passes: int = 50) -> List[int]:
+    """Reverse route segments while that lowers travel plus lateness penalty"""
+    best = list(order)
+    best_cost = route_cost(best, stops, matrix, day_start)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(len(best) - 1):
+            for j in range(i + 1, len(best)):
+                candidate = best[:i] + best[i:j + 1][::-1] + best[j + 1:]
+                cost = route_cost(candidate, stops, matrix, day_start)
+                if cost < best_cost - 1e-9:
+                    best, best_cost, improved = candidate, cost, True
+        if not improved:
+            break
+    return best
+
+
+def insertion_cost(order: List[int], stops, matrix, day_start, index: int) -> Tuple[float, int]:
+    """Cheapest (cost increase, position) for adding stop index to a route"""
+    base = route_cost(order, stops, matrix, day_start)
+    best = (math.inf, len(order))
+    for position in range(len(order) + 1):
+        candidate = order[:position] + [index] + order[position:]
+        delta = route_cost(candidate, stops, matrix, day_start) - base
+        if delta < best[0]:
+            best = (delta, position)
+    return best
+
+
+def solve_route(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Order one clinician's stops. job carries 'clinician_id', 'depot',
+    'stops' (dicts with visit_id, point, window_start, window_end,
+    service_minutes), 'day_start', 'speed_kmh' and 'road_factor'.
+    """
+    stops = job['stops']
+    matrix = travel_matrix([job['depot']] + [stop['point'] for stop in stops], job['speed_kmh'], job['road_factor'])
+    order = two_opt(nearest_neighbour(stops, matrix, job['day_start']), stops, matrix, job['day_start'])
+    travel, lateness, timeline = simulate(order, stops, matrix, job['day_start'])
+    return {
+        'clinician_id': job['clinician_id'],
+        'travel_minutes': round(travel, 1),
+        'lateness_minutes': round(lateness, 1),
+        'stops': [
+            {'visit_id': stops[index]['visit_id'], 'arrival': arrival, 'start': start}
+            for index, (arrival, start) in zip(order, timeline)
+        ],
+    }
@@ -0,0 +1,266 @@
+import hashlib
+import logging
+import math
+import multiprocessing
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from events.capture import record_updates
+
+from .models import GeocodedAddress, Visit, VisitStatus, VisitType
+from .route_solver import insertion_cost, solve_route, travel_matrix
+from .schedule import DEFAULT_VISIT_MINUTES, schedule_window
+
+logger = logging.getLogger(__name__)
+
+
+ROUTING_DEFAULTS = {
+    'GEOCODER': 'visits.routing.StubGeocoder',
+    'DEPOT': (40.7128, -74.0060),
+    'STUB_RADIUS_KM': 25,
+    'AVERAGE_SPEED_KMH': 40,
+    'ROAD_FACTOR': 1.3,
+    'TIME_WINDOW_MINUTES': 60,
+    'DAY_START_HOUR': 8,
+    'WORKERS': 4,
+}
+
+# Clinician roles that can take an unassigned visit of each discipline
+DISCIPLINE_ROLES = {
+    VisitType.SKILLED_NURSING: ('nurse',),
+    VisitType.HOME_HEALTH_AIDE: ('nurse',),
+    VisitType.PHYSICAL_THERAPY: ('pt',),
+    VisitType.SPEECH_THERAPY: ('pt',),
+    VisitType.OCCUPATIONAL_THERAPY: ('ot',),
+    VisitType.MEDICAL_SOCIAL: ('sw',),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def routing_setting(name: str):
+    return getattr(settings, 'ROUTING', {}).get(name, ROUTING_DEFAULTS[name])
+
+
+def normalize_address(address: str) -> str:
+    return ' '.join(address.lower().replace(',', ' ').split())
+
+
+def address_hash(address: str) -> str:
+    return hashlib.sha1(normalize_address(address).encode()).hexdigest()
+
+
+class StubGeocoder:
+    """
+    Offline geocoder that places each address at a stable pseudo-random point
+    within STUB_RADIUS_KM of the depot. Swap ROUTING['GEOCODER'] for a real
+    provider with the same geocode(address) -> (lat, lon) | None interface.
+    """
+    source = 'stub'
+
+    def geocode(self, address: str) -> Optional[Tuple[float, float]]:
+        digest = hashlib.sha1(normalize_address(address).encode()).digest()
+        bearing = int.from_bytes(digest[:4], 'big') / 2 ** 32 * 2 * math.pi
+        distance = math.sqrt(int.from_bytes(digest[4:8], 'big') / 2 ** 32) * routing_setting('STUB_RADIUS_KM')
+        lat, lon = routing_setting('DEPOT')
+        return (
+            lat + distance / 111.0 * math.cos(bearing),
+            lon + distance / (111.0 * math.cos(math.radians(lat))) * math.sin(bearing),
+        )
+
+
+def get_geocoder():
+    return import_string(routing_setting('GEOCODER'))()
+
+
+def geocode_addresses(addresses: Iterable[str]) -> Dict[str, Tuple[float, float]]:
+    """Coordinates for each address, from the lookup table first and the geocoder for the rest"""
+    by_hash = {address_hash(address): address for address in set(addresses) if address}
+    known = {
+        row.address_hash: (row.latitude, row.longitude)
+        for row in GeocodedAddress.objects.filter(address_hash__in=by_hash)
+    }
+
+    missing = [key for key in by_hash if key not in known]
+    if missing:
+        geocoder = get_geocoder()
+        new_rows = []
+        for key in missing:
+            point = geocoder.geocode(by_hash[key])
+            if point is None:
+                continue
+            known[key] = point
+            new_rows.append(GeocodedAddress(
+                address_hash=key, address=by_hash[key], latitude=point[0], longitude=point[1],
+                source=getattr(geocoder, 'source', geocoder.__class__.__name__),
+            ))
+        GeocodedAddress.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+    return {address: known[key] for key, address in by_hash.items() if key in known}
+
+
+def _minutes(value: datetime) -> float:
+    local = timezone.localtime(value)
+    return local.hour * 60 + local.minute + local.second / 60
+
+
+def _at(day, minutes: float) -> datetime:
+    start = timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+    return start + timedelta(minutes=round(minutes))
+
+
+def _stop(row: Dict[str, Any], point: Tuple[float, float]) -> Dict[str, Any]:
+    scheduled = _minutes(row['scheduled_date'])
+    window = routing_setting('TIME_WINDOW_MINUTES')
+    return {
+        'visit_id': row['id'],
+        'point': point,
+        'window_start': scheduled - window,
+        'window_end': scheduled + window,
+        'service_minutes': DEFAULT_VISIT_MINUTES.get(row['visit_type'], 60),
+    }
+
+
+def _assign(unassigned, routes, roles, stops, day_start):
+    """Cheapest-insertion of unassigned stops into routes of clinicians with a matching role"""
+    matrix = travel_matrix(
+        [routing_setting('DEPOT')] + [stop['point'] for stop in stops],
+        routing_setting('AVERAGE_SPEED_KMH'), routing_setting('ROAD_FACTOR'),
+    )
+    assigned = {}
+    for index, visit_type in sorted(unassigned, key=lambda item: stops[item[0]]['window_start']):
+        allowed = DISCIPLINE_ROLES.get(visit_type, ())
+        best = (math.inf, None, None)
+        for clinician_id, order in routes.items():
+            if roles.get(clinician_id) not in allowed:
+                continue
+            delta, position = insertion_cost(order, stops, matrix, day_start, index)
+            if delta < best[0]:
+                best = (delta, clinician_id, position)
+        if best[1] is not None:
+            routes[best[1]].insert(best[2], index)
+            assigned[stops[index]['visit_id']] = best[1]
+    return assigned
+
+
+def _run(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Solve routes in the shared process pool, or inline when there is nothing to parallelise"""
+    global _pool
+    workers = routing_setting('WORKERS')
+    if workers <= 1 or len(jobs) <= 1:
+        return [solve_route(job) for job in jobs]
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: forking a threaded web worker can copy locks held by other threads
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        pool = _pool
+    try:
+        return list(pool.map(solve_route, jobs))
+    except BrokenProcessPool:
+        logger.warning("Route solver pool broke; replacing it and solving inline")
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False)
+        return [solve_route(job) for job in jobs]
+
+
+def optimize_day(day, clinician_ids: Optional[List[int]] = None, assign_unassigned: bool = False,
+                 apply: bool = False) -> Dict[str, Any]:
+    """
+    Plan the scheduled visits for day: optionally hand unassigned visits to
+    clinicians by cheapest insertion, then order each clinician's route with
+    nearest-neighbour plus 2-opt under +/- TIME_WINDOW_MINUTES windows.
+    With apply, the planned clinician and start times are written back.
+    """
+    start, end = schedule_window(day)
+    visits = Visit.objects.filter(scheduled_date__gte=start, scheduled_date__lt=end, status=VisitStatus.SCHEDULED)
+    if clinician_ids:
+        scope = Q(clinician_id__in=clinician_ids)
+        if assign_unassigned:
+            scope |= Q(clinician__isnull=True)
+        visits = visits.filter(scope)
+    elif not assign_unassigned:
+        visits = visits.filter(clinician__isnull=False)
+    rows = list(visits.order_by('scheduled_date', 'id').values(
+        'id', 'clinician_id', 'visit_type', 'scheduled_date', 'patient__address'
+    ))
+
+    points = geocode_addresses(row['patient__address'] for row in rows)
+    stops, routes, unassigned, ungeocoded = [], defaultdict(list), [], []
+    for row in rows:
+        point = points.get(row['patient__address'])
+        if point is None:
+            ungeocoded.append(row['id'])
+            continue
+        stops.append(_stop(row, point))
+        if row['clinician_id'] is None:
+            unassigned.append((len(stops) - 1, row['visit_type']))
+        else:
+            routes[row['clinician_id']].append(len(stops) - 1)
+    for clinician_id in clinician_ids or ():
+        routes.setdefault(clinician_id, [])
+
+    day_start = routing_setting('DAY_START_HOUR') * 60
+    assigned = {}
+    if unassigned and routes:
+        roles = dict(get_user_model().objects.filter(id__in=list(routes)).values_list('id', 'role'))
+        assigned = _assign(unassigned, routes, roles, stops, day_start)
+
+    jobs = [
+        {
+            'clinician_id': clinician_id,
+            'depot': routing_setting('DEPOT'),
+            'stops': [stops[index] for index in order],
+            'day_start': day_start,
+            'speed_kmh': routing_setting('AVERAGE_SPEED_KMH'),
+            'road_factor': routing_setting('ROAD_FACTOR'),
+        }
+        for clinician_id, order in routes.items() if order
+    ]
+    results = _run(jobs)
+
+    for result in results:
+        for stop in result['stops']:
+            stop['arrival'] = _at(day, stop['arrival'])
+            stop['start'] = _at(day, stop['start'])
+
+    if apply:
+        _apply(results)
+
+    placed = {stop['visit_id'] for result in results for stop in result['stops']}
+    return {
+        'date': day,
+        'routes': results,
+        'assigned': assigned,
+        'unassigned': [stops[index]['visit_id'] for index, _ in unassigned if stops[index]['visit_id'] not in placed],
+        'ungeocoded': ungeocoded,
+        'applied': apply,
+    }
+
+
+def _apply(results: List[Dict[str, Any]]) -> None:
+    planned = {
+        stop['visit_id']: (result['clinician_id'], stop['start'])
+        for result in results for stop in result['stops']
+    }
+    now = timezone.now()
+    with transaction.atomic():
+        visits = list(Visit.objects.select_for_update().filter(id__in=planned, status=VisitStatus.SCHEDULED))
+        for visit in visits:
+            visit.clinician_id, visit.scheduled_date = planned[visit.id]
+            visit.updated_at = now
+        Visit.objects.bulk_update(visits, ['clinician', 'scheduled_date', 'updated_at'], batch_size=500)
+        record_updates(Visit, [visit.id for visit in visits], ['clinician', 'scheduled_date', 'updated_at'])
@@ -0,0 +1,108 @@
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Tuple
+
+from django.utils import timezone
+
+from .models import Visit, VisitStatus, VisitType
+
+
+# Planned length used for conflict detection until a visit records its own end_time
+DEFAULT_VISIT_MINUTES = {
+    VisitType.SKILLED_NURSING: 45,
+    VisitType.PHYSICAL_THERAPY: 60,
+    VisitType.OCCUPATIONAL_THERAPY: 60,
+    VisitType.SPEECH_THERAPY: 45,
+    VisitType.MEDICAL_SOCIAL: 60,
+    VisitType.HOME_HEALTH_AIDE: 60,
+}
+
+INACTIVE_STATUSES = (VisitStatus.CANCELLED, VisitStatus.NO_SHOW)
+
+SCHEDULE_VIEWS = ('day', 'week')
+
+# Only the columns a calendar needs, so rows come straight off the index window
+SCHEDULE_COLUMNS = (
+    'id', 'clinician_id', 'visit_type', 'status', 'scheduled_date', 'start_time', 'end_time',
+    'patient_id', 'patient__first_name', 'patient__last_name', 'patient__address', 'patient__phone',
+)
+
+
+def schedule_window(day, view: str = 'day') -> Tuple[datetime, datetime]:
+    """Aware [start, end) range for a day, or for the Monday-based week containing it"""
+    if view == 'week':
+        day = day - timedelta(days=day.weekday())
+    start = timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+    return start, start + timedelta(days=7 if view == 'week' else 1)
+
+
+def _row(values: Dict[str, Any]) -> Dict[str, Any]:
+    starts_at = values['start_time'] or values['scheduled_date']
+    ends_at = values['end_time'] or starts_at + timedelta(minutes=DEFAULT_VISIT_MINUTES.get(values['visit_type'], 60))
+    return {
+        'id': values['id'],
+        'clinician_id': values['clinician_id'],
+        'visit_type': values['visit_type'],
+        'status': values['status'],
+        'scheduled_date': values['scheduled_date'],
+        'starts_at': starts_at,
+        'ends_at': ends_at,
+        'patient': {
+            'id': values['patient_id'],
+            'name': f"{values['patient__first_name']} {values['patient__last_name']}",
+            'address': values['patient__address'],
+            'phone': values['patient__phone'],
+        },
+    }
+
+
+def window_rows(queryset, start, end, include_cancelled: bool = False) -> List[Dict[str, Any]]:
+    """Visits scheduled in [start, end), read as plain rows in calendar order"""
+    queryset = queryset.filter(scheduled_date__gte=start, scheduled_date__lt=end)
+    if not include_cancelled:
+        queryset = queryset.exclude(status__in=INACTIVE_STATUSES)
+    rows = queryset.order_by('scheduled_date', 'id').values(*SCHEDULE_COLUMNS)
+    return [_row(values) for values in rows]
+
+
+def find_conflicts(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Pairs of active visits whose time ranges overlap, found with one sweep over start times"""
+    conflicts = []
+    active = []
+    for row in sorted(rows, key=lambda r: (r['starts_at'], r['id'])):
+        if row['status'] in INACTIVE_STATUSES:
+            continue
+        active = [other for other in active if other['ends_at'] > row['starts_at']]
+        for other in active:
+            conflicts.append({
+                'visit_ids': [other['id'], row['id']],
+                'overlap_minutes': int((min(other['ends_at'], row['ends_at']) - row['starts_at']).total_seconds() // 60),
+            })
+        active.append(row)
+    return conflicts
+
+
+def group_by_day(rows: List[Dict[str, Any]], start, end) -> List[Dict[str, Any]]:
+    days = OrderedDict()
+    day = timezone.localtime(start).date()
+    while day < timezone.localtime(end).date():
+        days[day] = []
+        day += timedelta(days=1)
+    for row in rows:
+        days.setdefault(timezone.localtime(row['scheduled_date']).date(), []).append(row)
+    return [{'date': day, 'visits': visits} for day, visits in days.items()]
+
+
+def clinician_schedule(clinician_id: int, start, end, include_cancelled: bool = False) -> Dict[str, Any]:
+    """A clinician's calendar for [start, end) with per-day visits and overlapping bookings"""
+    rows = window_rows(Visit.objects.filter(clinician_id=clinician_id), start, end, include_cancelled)
+    return {
+        'days': group_by_day(rows, start, end),
+        'conflicts': find_conflicts(rows),
+        'total_visits': len(rows),
+    }
+
+
+def unassigned_visits(start, end) -> List[Dict[str, Any]]:
+    """Visits in [start, end) still waiting for a clinician"""
+    return window_rows(Visit.objects.filter(clinician__isnull=True), start, end)
@@ -14,10 +14,14 @@ class VisitSerializer(serializers.ModelSerializer):
             'id', 'patient', 'patient_name', 'clinician', 'clinician_name',
             'visit_type', 'status', 'scheduled_date', 'start_time', 'end_time',
             'chief_complaint', 'vital_signs', 'assessment', 'plan',
-            'ai_summary', 'ai_recommendations', 'duration_minutes',
+            'ai_summary', 'ai_recommendations', 'ai_summary_status', 'ai_summary_generated_at',
+            'duration_minutes',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'ai_summary', 'ai_recommendations']
+        read_only_fields = [
+            'id', 'created_at', 'updated_at', 'ai_summary', 'ai_recommendations',
+            'ai_summary_status', 'ai_summary_generated_at'
+        ]
 
     def get_duration_minutes(self, obj):
         if obj.start_time and obj.end_time:
@@ -60,3 +64,10 @@ class VisitSummaryRequestSerializer(serializers.Serializer):
         choices=[('brief', 'Brief'), ('detailed', 'Detailed'), ('physician', 'For Physician')],
         default='brief'
     )
+
+
+class RouteOptimizationRequestSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    clinician_ids = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    assign_unassigned = serializers.BooleanField(default=False)
+    apply = serializers.BooleanField(default=False)
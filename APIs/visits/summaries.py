@@ -0,0 +1,160 @@
+import logging
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.async_views import release_connections, wait_for
+from core.metrics import AI_GENERATION_DURATION
+from core.tasks import enqueue
+from events.capture import record_updates
+
+from .models import SummaryStatus, Visit, VisitNote
+from .vitals import parse_vitals
+
+logger = logging.getLogger(__name__)
+
+# Visit columns needed to answer a summary request
+SUMMARY_FIELDS = ('id', 'ai_summary', 'ai_recommendations', 'ai_summary_status', 'ai_summary_generated_at')
+# How long the last summary status is mirrored in the cache for long polls
+STATUS_TIMEOUT = 3600
+
+
+class StubSummarizer:
+    """
+    Local stand-in for a language-model summarizer. Any class with the same
+    summarize(context) -> {'summary': str, 'recommendations': [str]} method
+    can be configured through VISIT_SUMMARIZER.
+    """
+
+    def summarize(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        visit = context['visit']
+        parts = [f"{visit['visit_type_display']} visit for {visit['patient_name']} on {visit['date']}."]
+        if visit['chief_complaint']:
+            parts.append(f"Chief complaint: {visit['chief_complaint']}.")
+        if context.get('vitals'):
+            parts.append('Vitals: ' + ', '.join(f"{metric} {value:g}" for metric, value in context['vitals']) + '.')
+        if visit['assessment']:
+            parts.append(f"Assessment: {visit['assessment']}")
+        if context.get('notes'):
+            parts.append(f"{len(context['notes'])} note(s) documented.")
+            if context['summary_type'] != 'brief':
+                parts.extend(f"- {note['title']}: {note['content'][:200]}" for note in context['notes'])
+
+        recommendations = [line.strip() for line in visit['plan'].splitlines() if line.strip()]
+        if not recommendations:
+            recommendations = ['Continue current plan of care', 'Monitor vital signs']
+        return {'summary': '\n'.join(parts), 'recommendations': recommendations}
+
+
+def get_summarizer():
+    return import_string(getattr(settings, 'VISIT_SUMMARIZER', 'visits.summaries.StubSummarizer'))()
+
+
+def build_context(visit_id: int, summary_type: str = 'brief', include_notes: bool = True,
+                  include_vitals: bool = True) -> Dict[str, Any]:
+    """Everything a summarizer needs, loaded as one visit row plus one notes query"""
+    notes = VisitNote.objects.only('id', 'visit_id', 'note_type', 'title', 'content', 'created_at').order_by('created_at')
+    visit = Visit.objects.select_related('patient').prefetch_related(
+        Prefetch('notes', queryset=notes)
+    ).get(id=visit_id)
+
+    context = {
+        'summary_type': summary_type,
+        'visit': {
+            'id': visit.id,
+            'patient_name': visit.patient.full_name,
+            'visit_type': visit.visit_type,
+            'visit_type_display': visit.get_visit_type_display(),
+            'date': (visit.start_time or visit.scheduled_date).date().isoformat(),
+            'chief_complaint': visit.chief_complaint,
+            'assessment': visit.assessment,
+            'plan': visit.plan,
+        },
+        'notes': [],
+        'vitals': [],
+    }
+    if include_notes:
+        context['notes'] = [
+            {'note_type': note.note_type, 'title': note.title, 'content': note.content}
+            for note in visit.notes.all()
+        ]
+    if include_vitals:
+        context['vitals'] = parse_vitals(visit.vital_signs)
+    return context
+
+
+def _status_key(visit_id: int) -> str:
+    return f'visits:summary-status:{visit_id}'
+
+
+def _set_summary_fields(visit_id: int, **values) -> None:
+    values['updated_at'] = timezone.now()
+    with transaction.atomic():
+        Visit.objects.filter(id=visit_id).update(**values)
+        record_updates(Visit, [visit_id], values)
+        if 'ai_summary_status' in values:
+            summary_status = values['ai_summary_status']
+            transaction.on_commit(lambda: cache.set(_status_key(visit_id), summary_status, STATUS_TIMEOUT))
+
+
+def generate_summary(visit_id: int, **options) -> None:
+    """Run the summarizer and store its output, touching only the AI columns"""
+    try:
+        context = build_context(visit_id, **options)
+        with AI_GENERATION_DURATION.time(kind='visit_summary', outcome='ok') as labels:
+            try:
+                result = get_summarizer().summarize(context)
+            except Exception:
+                labels['outcome'] = 'error'
+                raise
+        recommendations: List[str] = list(result.get('recommendations', []))
+        _set_summary_fields(
+            visit_id,
+            ai_summary=result['summary'],
+            ai_recommendations=recommendations,
+            ai_summary_status=SummaryStatus.READY,
+            ai_summary_generated_at=timezone.now(),
+        )
+    except Exception:
+        logger.exception("Summary generation failed for visit %s", visit_id)
+        _set_summary_fields(visit_id, ai_summary_status=SummaryStatus.FAILED)
+
+
+def request_summary(visit_id: int, **options) -> None:
+    """Mark the visit's summary pending and generate it off the request thread"""
+    _set_summary_fields(visit_id, ai_summary_status=SummaryStatus.PENDING)
+    enqueue(generate_summary, visit_id, **options)
+
+
+async def await_summary(visit_id: int, timeout: float) -> Visit:
+    """
+    Wait up to timeout seconds for a pending summary to finish and return the
+    visit's summary fields. The wait polls the status mirrored in the cache,
+    so a long poll holds no database connection.
+    """
+    async def cached_status():
+        value = await cache.aget(_status_key(visit_id))
+        if value is None:
+            # Not mirrored (evicted, or set before mirroring existed): read the database
+            value = await Visit.objects.filter(id=visit_id).values_list('ai_summary_status', flat=True).afirst()
+            await release_connections()
+        return value
+
+    await release_connections()
+    await wait_for(cached_status, lambda value: value != SummaryStatus.PENDING, timeout)
+    return await Visit.objects.only(*SUMMARY_FIELDS).aget(id=visit_id)
+
+
+def summary_payload(visit: Visit) -> Dict[str, Any]:
+    return {
+        'visit_id': visit.id,
+        'status': visit.ai_summary_status,
+        'summary': visit.ai_summary if visit.ai_summary_status == SummaryStatus.READY else None,
+        'recommendations': visit.ai_recommendations if visit.ai_summary_status == SummaryStatus.READY else [],
+        'generated_at': visit.ai_summary_generated_at,
+    }
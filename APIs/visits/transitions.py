@@ -0,0 +1,112 @@
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from events.capture import record_updates
+
+from .models import Visit, VisitStatus, VisitTransition
+
+
+class Transition(NamedTuple):
+    from_status: str
+    to_status: str
+    timestamp_field: str
+    error: str
+
+
+TRANSITIONS: Dict[str, Transition] = {
+    'start': Transition(VisitStatus.SCHEDULED, VisitStatus.IN_PROGRESS, 'start_time',
+                        'Visit must be scheduled to start'),
+    'end': Transition(VisitStatus.IN_PROGRESS, VisitStatus.COMPLETED, 'end_time',
+                      'Visit must be in progress to end'),
+}
+
+
+# group_by values for duration analytics mapped to the expression they group on
+DURATION_GROUPS = {
+    'visit_type': F('visit_type'),
+    'clinician': F('clinician_id'),
+    'day': TruncDate('occurred_at'),
+}
+
+
+class TransitionConflict(Exception):
+    """Raised when a visit is no longer in the status a transition expects"""
+
+    def __init__(self, message, current_status=None):
+        super().__init__(message)
+        self.current_status = current_status
+
+
+def transition_visit(visit: Visit, name: str, actor=None) -> VisitTransition:
+    """
+    Move visit through a named transition with one conditional UPDATE that
+    only writes status, the transition timestamp and updated_at. If another
+    request changed the status first nothing is written and
+    TransitionConflict is raised.
+    """
+    spec = TRANSITIONS[name]
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Visit.objects.filter(id=visit.id, status=spec.from_status).update(
+            status=spec.to_status, **{spec.timestamp_field: now}, updated_at=now
+        )
+        if not updated:
+            current = Visit.objects.filter(id=visit.id).values_list('status', flat=True).first()
+            raise TransitionConflict(spec.error, current_status=current)
+        record_updates(Visit, [visit.id], ['status', spec.timestamp_field, 'updated_at'])
+
+        return VisitTransition.objects.create(
+            visit_id=visit.id,
+            from_status=spec.from_status,
+            to_status=spec.to_status,
+            occurred_at=now,
+            actor=actor,
+            clinician_id=visit.clinician_id,
+            visit_type=visit.visit_type,
+            duration_seconds=_duration_since_start(visit.id, now) if name == 'end' else None,
+        )
+
+
+def _duration_since_start(visit_id: int, ended_at) -> Optional[int]:
+    started_at = VisitTransition.objects.filter(
+        visit_id=visit_id, to_status=VisitStatus.IN_PROGRESS
+    ).order_by('-occurred_at').values_list('occurred_at', flat=True).first()
+    if started_at is None:
+        return None
+    return max(0, int((ended_at - started_at).total_seconds()))
+
+
+def duration_analytics(start, end, group_by: str = 'visit_type', clinician_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Completed-visit duration stats (minutes) for visits ended between the start and end dates"""
+    tz = timezone.get_current_timezone()
+    completed = VisitTransition.objects.filter(
+        to_status=VisitStatus.COMPLETED,
+        occurred_at__gte=timezone.make_aware(datetime.combine(start, time.min), tz),
+        occurred_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+        duration_seconds__isnull=False,
+    )
+    if clinician_id is not None:
+        completed = completed.filter(clinician_id=clinician_id)
+
+    rows = completed.annotate(group=DURATION_GROUPS[group_by]).order_by().values('group').annotate(
+        visits=Count('id'),
+        avg_seconds=Avg('duration_seconds'),
+        min_seconds=Min('duration_seconds'),
+        max_seconds=Max('duration_seconds'),
+    ).order_by('group')
+
+    return [
+        {
+            group_by: row['group'],
+            'visits': row['visits'],
+            'avg_minutes': round(row['avg_seconds'] / 60, 1),
+            'min_minutes': round(row['min_seconds'] / 60, 1),
+            'max_minutes': round(row['max_seconds'] / 60, 1),
+        }
+        for row in rows
+    ]
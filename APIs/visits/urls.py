@@ -10,6 +10,11 @@ urlpatterns = [
     path('', views.VisitListCreateView.as_view(), name='visit_list_create'),
     path('<int:pk>/', views.VisitDetailView.as_view(), name='visit_detail'),
     
+    # Clinician calendar
+    path('schedule/', views.ClinicianScheduleView.as_view(), name='clinician_schedule'),
+    path('schedule/optimize/', views.RouteOptimizationView.as_view(), name='route_optimization'),
+    path('analytics/durations/', views.VisitDurationAnalyticsView.as_view(), name='visit_duration_analytics'),
+    
     # Visit notes and documentation
     path('<int:visit_id>/notes/', views.VisitNotesView.as_view(), name='visit_notes'),
     path('<int:visit_id>/notes/<int:note_id>/', views.VisitNoteDetailView.as_view(), name='visit_note_detail'),
@@ -17,10 +22,15 @@ urlpatterns = [
     path('<int:visit_id>/unstructured-notes/', views.UnstructuredNotesView.as_view(), name='unstructured_notes'),
     
     # AI-powered documentation features
-    path('<int:visit_id>/summary/', views.VisitSummaryView.as_view(), name='visit_summary'),
+    path('<int:visit_id>/summary/', views.visit_summary, name='visit_summary'),
     path('<int:visit_id>/ai-documentation/', views.AIDocumentationView.as_view(), name='ai_documentation'),
     path('<int:visit_id>/transcript-to-note/', views.TranscriptToNoteView.as_view(), name='transcript_to_note'),
     path('<int:visit_id>/voice-to-text/', views.VoiceToTextView.as_view(), name='voice_to_text'),
+    path('<int:visit_id>/voice-to-text/<uuid:session_id>/', views.VoiceSessionView.as_view(), name='voice_session'),
+    path('<int:visit_id>/voice-to-text/<uuid:session_id>/chunks/<int:sequence>/',
+         views.VoiceChunkView.as_view(), name='voice_chunk'),
+    path('<int:visit_id>/voice-to-text/<uuid:session_id>/finalize/',
+         views.VoiceFinalizeView.as_view(), name='voice_finalize'),
     
     # Dynamic templates
     path('<int:visit_id>/template/', views.VisitTemplateView.as_view(), name='visit_template'),
@@ -3,77 +3,97 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from datetime import timedelta
 from django.utils import timezone
-from .models import Visit, VisitNote, DocumentationTemplate
+from django.utils.dateparse import parse_date
+from .models import Visit, VisitNote, DocumentationTemplate, SummaryStatus, VoiceSession
 from .serializers import (
     VisitSerializer, VisitNoteSerializer, 
-    DocumentationTemplateSerializer, VisitSummaryRequestSerializer
+    DocumentationTemplateSerializer, VisitSummaryRequestSerializer,
+    RouteOptimizationRequestSerializer
 )
+from .registry import documentation_templates
+from .routing import optimize_day
+from .summaries import SUMMARY_FIELDS, await_summary, request_summary, summary_payload
+from .voice import (
+    AUDIO_FORMATS, ChunkOutOfOrder, SessionClosed, append_chunk, finalize_session, session_payload, start_session
+)
+from .transitions import DURATION_GROUPS, TransitionConflict, duration_analytics, transition_visit
+from .schedule import SCHEDULE_VIEWS, clinician_schedule, schedule_window, unassigned_visits
+from core.async_views import async_api_view, json_response, wait_seconds
+from core.extraction import extract_note
+from core.conditional import ConditionalGetMixin
+from core.ratelimit import rate_limited
+from core.template_registry import template_response
+
 
+# VisitSerializer embeds the patient's and clinician's names
+VISIT_VALIDATOR_FIELDS = ('updated_at', 'patient__updated_at', 'clinician__updated_at')
 
-class VisitListCreateView(generics.ListCreateAPIView):
+
+class VisitListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     queryset = Visit.objects.all()
     serializer_class = VisitSerializer
     permission_classes = [IsAuthenticated]
+    last_modified_fields = VISIT_VALIDATOR_FIELDS
 
 
-class VisitDetailView(generics.RetrieveUpdateDestroyAPIView):
+class VisitDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Visit.objects.all()
     serializer_class = VisitSerializer
     permission_classes = [IsAuthenticated]
+    last_modified_fields = VISIT_VALIDATOR_FIELDS
 
 
-class VisitViewSet(viewsets.ModelViewSet):
+class VisitViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = VisitSerializer
     permission_classes = [IsAuthenticated]
+    last_modified_fields = VISIT_VALIDATOR_FIELDS
 
     def get_queryset(self):
         """Filter visits based on user role"""
         user = self.request.user
+        visits = Visit.objects.select_related('patient', 'clinician')
         if user.role == 'admin':
-            return Visit.objects.all()
+            return visits
         elif user.role == 'physician':
             # Physicians see visits for their patients
-            return Visit.objects.filter(patient__assigned_physician=user)
+            return visits.filter(patient__assigned_physician=user)
         else:
             # Clinicians see their own visits
-            return Visit.objects.filter(clinician=user)
+            return visits.filter(clinician=user)
 
     @action(detail=True, methods=['post'])
     def start_visit(self, request, pk=None):
         """Start a visit - set start_time and status"""
-        visit = self.get_object()
-        if visit.status != 'scheduled':
-            return Response(
-                {'error': 'Visit must be scheduled to start'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        visit.start_time = timezone.now()
-        visit.status = 'in_progress'
-        visit.save()
-        
-        serializer = self.get_serializer(visit)
-        return Response(serializer.data)
+        return self._transition(request, 'start')
 
     @action(detail=True, methods=['post'])
     def end_visit(self, request, pk=None):
-        """End a visit - set end_time and status"""
-        visit = self.get_object()
-        if visit.status != 'in_progress':
+        """End a visit - set end_time and status, then queue the AI summary"""
+        return self._transition(request, 'end', on_success=request_summary)
+
+    def _transition(self, request, name, on_success=None):
+        """Apply a status transition atomically; a concurrent change answers 409"""
+        visit = get_object_or_404(
+            self.get_queryset().select_related(None).only('id', 'status', 'clinician_id', 'visit_type'),
+            pk=self.kwargs['pk']
+        )
+        try:
+            with transaction.atomic():
+                transition_visit(visit, name, actor=request.user)
+                if on_success:
+                    on_success(visit.id)
+        except TransitionConflict as e:
             return Response(
-                {'error': 'Visit must be in progress to end'}, 
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': str(e), 'current_status': e.current_status},
+                status=status.HTTP_409_CONFLICT
             )
-        
-        visit.end_time = timezone.now()
-        visit.status = 'completed'
-        visit.save()
-        
-        # TODO: Trigger AI summary generation here
-        
-        serializer = self.get_serializer(visit)
+
+        serializer = self.get_serializer(self.get_queryset().get(pk=visit.pk))
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
@@ -95,54 +115,31 @@ class VisitViewSet(viewsets.ModelViewSet):
         serializer = VisitNoteSerializer(notes, many=True, context={'request': request})
         return Response(serializer.data)
 
+    @rate_limited('ai')
     @action(detail=True, methods=['post'])
     def summary(self, request, pk=None):
-        """Generate AI summary for a visit"""
-        visit = self.get_object()
+        """Queue AI summary generation for a visit"""
+        visit = get_object_or_404(self.get_queryset().select_related(None).only('id'), pk=pk)
         serializer = VisitSummaryRequestSerializer(data=request.data)
         
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        # TODO: Implement AI summary generation
-        # For now, return a mock summary
-        summary_data = {
-            'visit_id': visit.id,
-            'patient': visit.patient.full_name,
-            'date': visit.scheduled_date.date(),
-            'type': visit.get_visit_type_display(),
-            'summary': f"Mock AI summary for {visit.patient.full_name} {visit.get_visit_type_display()} visit.",
-            'recommendations': [
-                "Continue current medication regimen",
-                "Schedule follow-up in 1 week",
-                "Monitor vital signs"
-            ],
-            'generated_at': timezone.now()
-        }
-        
-        # Save the summary to the visit
-        visit.ai_summary = summary_data['summary']
-        visit.ai_recommendations = summary_data['recommendations']
-        visit.save()
-        
-        return Response(summary_data)
+        request_summary(visit.id, **serializer.validated_data)
+        visit = Visit.objects.only(*SUMMARY_FIELDS).get(id=visit.id)
+        return Response(summary_payload(visit), status=status.HTTP_202_ACCEPTED)
 
     @action(detail=True, methods=['get'])
     def template(self, request, pk=None):
         """Get documentation template for visit type"""
         visit = self.get_object()
-        try:
-            template = DocumentationTemplate.objects.get(
-                discipline=visit.visit_type, 
-                is_active=True
-            )
-            serializer = DocumentationTemplateSerializer(template)
-            return Response(serializer.data)
-        except DocumentationTemplate.DoesNotExist:
+        templates = documentation_templates.get(discipline=visit.visit_type)
+        if not templates.data:
             return Response(
                 {'error': 'No template found for this visit type'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
+        return template_response(request, templates, data=templates.data[0])
 
 
 class VisitNoteViewSet(viewsets.ModelViewSet):
@@ -210,25 +207,23 @@ class UnstructuredNotesView(APIView):
         return Response(serializer.data)
 
 
-class VisitSummaryView(APIView):
-    permission_classes = [IsAuthenticated]
-    
-    def get(self, request, visit_id):
-        visit = get_object_or_404(Visit, id=visit_id)
-        serializer = VisitSummaryRequestSerializer(data=request.query_params)
-        
-        if serializer.is_valid():
-            # Generate AI summary based on request parameters
-            summary_data = {
-                'visit_id': visit.id,
-                'patient': visit.patient.full_name if hasattr(visit.patient, 'full_name') else str(visit.patient),
-                'summary': visit.ai_summary or 'AI summary will be generated here',
-                'recommendations': visit.ai_recommendations or [],
-                'summary_type': serializer.validated_data.get('summary_type', 'brief')
-            }
-            return Response(summary_data)
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+@async_api_view(['GET'])
+async def visit_summary(request, visit_id):
+    """
+    Stored AI summary for a visit; 202 while generation is still pending.
+    ?wait=<seconds> holds a pending request until the summary is ready.
+    """
+    try:
+        visit = await Visit.objects.only(*SUMMARY_FIELDS).aget(id=visit_id)
+        wait = wait_seconds(request)
+        if visit.ai_summary_status == SummaryStatus.PENDING and wait:
+            visit = await await_summary(visit_id, wait)
+    except Visit.DoesNotExist:
+        return json_response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    payload = summary_payload(visit)
+    if visit.ai_summary_status == SummaryStatus.PENDING:
+        return json_response(payload, status=status.HTTP_202_ACCEPTED)
+    return json_response(payload)
 
 
 class AIDocumentationView(APIView):
@@ -246,33 +241,218 @@ class AIDocumentationView(APIView):
 
 
 class TranscriptToNoteView(APIView):
+    """Store a finished transcript as a voice_transcript note"""
     permission_classes = [IsAuthenticated]
     
     def post(self, request, visit_id):
-        visit = get_object_or_404(Visit, id=visit_id)
+        visit = get_object_or_404(Visit.objects.only('id'), id=visit_id)
         transcript = request.data.get('transcript', '')
+        if not isinstance(transcript, str):
+            return Response({'error': 'transcript must be a string'}, status=status.HTTP_400_BAD_REQUEST)
+        transcript = transcript.strip()
+        if not transcript:
+            return Response({'error': 'transcript is required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Convert transcript to structured note
-        note_content = f"Converted from transcript: {transcript}"
-        
+        note = VisitNote.objects.create(
+            visit=visit,
+            note_type='voice_transcript',
+            title=request.data.get('title') or 'Voice transcript',
+            content=transcript,
+            structured_data=extract_note(transcript),
+            created_by=request.user
+        )
         return Response({
             'visit_id': visit.id,
             'original_transcript': transcript,
-            'structured_note': note_content,
-            'confidence': 0.92
-        })
+            'note': VisitNoteSerializer(note).data
+        }, status=status.HTTP_201_CREATED)
 
 
 class VoiceToTextView(APIView):
+    """Start a streaming dictation session; audio is then sent chunk by chunk"""
     permission_classes = [IsAuthenticated]
     
     def post(self, request, visit_id):
-        visit = get_object_or_404(Visit, id=visit_id)
-        # Voice to text conversion logic
+        visit = get_object_or_404(Visit.objects.only('id'), id=visit_id)
+        try:
+            sample_rate = int(request.data.get('sample_rate', 16000))
+        except (TypeError, ValueError):
+            return Response({'error': 'sample_rate must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        audio_format = request.data.get('audio_format', 'pcm16')
+        if audio_format not in AUDIO_FORMATS:
+            return Response({'error': f'audio_format must be one of {", ".join(AUDIO_FORMATS)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        session = start_session(visit, request.user, audio_format, sample_rate)
+        return Response(session_payload(session), status=status.HTTP_201_CREATED)
+
+
+class VoiceSessionView(APIView):
+    """Transcript so far for a dictation session"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, visit_id, session_id):
+        session = get_object_or_404(VoiceSession.objects.defer('asr_state'), id=session_id, visit_id=visit_id)
+        return Response(session_payload(session))
+
+
+class VoiceChunkView(APIView):
+    """
+    PUT raw audio bytes for chunk <sequence> (0, 1, 2, ...). The response
+    carries the text committed by this chunk plus the current partial
+    hypothesis, so the client can render words while the clinician talks.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, visit_id, session_id, sequence):
+        get_object_or_404(VoiceSession.objects.only('id'), id=session_id, visit_id=visit_id)
+        audio = request.body
+        if not audio:
+            return Response({'error': 'Empty audio chunk'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(audio) > settings.VOICE_MAX_CHUNK_BYTES:
+            return Response(
+                {'error': f'Chunks are limited to {settings.VOICE_MAX_CHUNK_BYTES} bytes'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        try:
+            session, chunk = append_chunk(session_id, sequence, audio)
+        except ChunkOutOfOrder as e:
+            return Response(
+                {'error': str(e), 'expected_sequence': e.expected},
+                status=status.HTTP_409_CONFLICT
+            )
+        except SessionClosed as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+
         return Response({
-            'visit_id': visit.id,
-            'transcribed_text': 'Voice transcription will appear here',
-            'processing_status': 'completed'
+            **session_payload(session),
+            'sequence': chunk.sequence,
+            'final_text': chunk.final_text,
+        })
+
+
+class VoiceFinalizeView(APIView):
+    """Close a dictation session and save its transcript as a VisitNote"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, visit_id, session_id):
+        get_object_or_404(VoiceSession.objects.only('id'), id=session_id, visit_id=visit_id)
+        try:
+            session = finalize_session(session_id, request.user, request.data.get('title'))
+        except SessionClosed as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response({
+            **session_payload(session),
+            'note': VisitNoteSerializer(session.note).data,
+        }, status=status.HTTP_201_CREATED)
+
+
+class ClinicianScheduleView(APIView):
+    """
+    Day or week calendar for a clinician with overlapping bookings flagged.
+    ?date=YYYY-MM-DD&view=day|week&clinician=<id>&include_cancelled=true
+    Admins also get the unassigned visits for the same window.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        view = request.GET.get('view', 'day')
+        if view not in SCHEDULE_VIEWS:
+            return Response({'error': 'view must be day or week'}, status=status.HTTP_400_BAD_REQUEST)
+
+        day = timezone.localdate()
+        if request.GET.get('date'):
+            try:
+                day = parse_date(request.GET['date'])
+            except ValueError:  # well formed but not a real date, e.g. 2024-02-30
+                day = None
+            if day is None:
+                return Response({'error': 'date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        clinician_id = request.GET.get('clinician', request.user.id)
+        try:
+            clinician_id = int(clinician_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'clinician must be a user id'}, status=status.HTTP_400_BAD_REQUEST)
+        if clinician_id != request.user.id and request.user.role != 'admin':
+            return Response(
+                {'error': "Only admins can view another clinician's schedule"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        start, end = schedule_window(day, view)
+        include_cancelled = request.GET.get('include_cancelled', '').lower() == 'true'
+        data = {
+            'clinician_id': clinician_id,
+            'view': view,
+            'start': start,
+            'end': end,
+            **clinician_schedule(clinician_id, start, end, include_cancelled),
+        }
+        if request.user.role == 'admin':
+            data['unassigned'] = unassigned_visits(start, end)
+        return Response(data)
+
+
+class RouteOptimizationView(APIView):
+    """
+    Plan a day's routes: order each clinician's visits to cut drive time
+    within their time windows, optionally placing unassigned visits.
+    Clinicians may only plan their own route; nothing is saved unless apply=true.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = RouteOptimizationRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        options = serializer.validated_data
+        if request.user.role != 'admin':
+            if options['assign_unassigned'] or set(options['clinician_ids']) - {request.user.id}:
+                return Response(
+                    {'error': 'Only admins can plan other clinicians or assign visits'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            options['clinician_ids'] = [request.user.id]
+
+        plan = optimize_day(
+            options['date'],
+            clinician_ids=options['clinician_ids'],
+            assign_unassigned=options['assign_unassigned'],
+            apply=options['apply'],
+        )
+        return Response(plan)
+
+
+class VisitDurationAnalyticsView(APIView):
+    """
+    Visit duration statistics from the transition history.
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD&group_by=visit_type|clinician|day
+    Non-admins only see their own visits.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        group_by = request.GET.get('group_by', 'visit_type')
+        if group_by not in DURATION_GROUPS:
+            return Response(
+                {'error': f"group_by must be one of: {', '.join(DURATION_GROUPS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            end = parse_date(request.GET.get('end', '')) or timezone.localdate()
+            start = parse_date(request.GET.get('start', '')) or end - timedelta(days=30)
+        except ValueError:  # well formed but not a real date, e.g. 2024-02-30
+            return Response({'error': 'start and end must be valid YYYY-MM-DD dates'}, status=status.HTTP_400_BAD_REQUEST)
+        clinician_id = None if request.user.role == 'admin' else request.user.id
+
+        return Response({
+            'start': start,
+            'end': end,
+            'group_by': group_by,
+            'results': duration_analytics(start, end, group_by, clinician_id=clinician_id),
         })
 
 
@@ -280,25 +460,15 @@ class VisitTemplateView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request, visit_id):
-        visit = get_object_or_404(Visit, id=visit_id)
-        templates = DocumentationTemplate.objects.filter(
-            discipline=getattr(visit, 'discipline', 'general'),
-            is_active=True
-        )
-        serializer = DocumentationTemplateSerializer(templates, many=True)
-        return Response(serializer.data)
+        visit = get_object_or_404(Visit.objects.only('id', 'visit_type'), id=visit_id)
+        return template_response(request, documentation_templates.get(discipline=visit.visit_type))
 
 
 class DisciplineTemplateView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request, discipline):
-        templates = DocumentationTemplate.objects.filter(
-            discipline=discipline,
-            is_active=True
-        )
-        serializer = DocumentationTemplateSerializer(templates, many=True)
-        return Response(serializer.data)
+        return template_response(request, documentation_templates.get(discipline=discipline))
 
 
 class SpecificTemplateView(APIView):
@@ -0,0 +1,196 @@
+import re
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min
+from django.utils import timezone
+
+from .models import VitalMetric, VitalSign, VitalSignRollup
+
+
+# Free-form vital_signs / OCR keys mapped onto normalized metrics
+METRIC_ALIASES = {
+    'hr': VitalMetric.HEART_RATE,
+    'heart_rate': VitalMetric.HEART_RATE,
+    'pulse': VitalMetric.HEART_RATE,
+    'temp': VitalMetric.TEMPERATURE,
+    'temperature': VitalMetric.TEMPERATURE,
+    'rr': VitalMetric.RESPIRATORY_RATE,
+    'resp': VitalMetric.RESPIRATORY_RATE,
+    'respiratory_rate': VitalMetric.RESPIRATORY_RATE,
+    'o2': VitalMetric.OXYGEN_SATURATION,
+    'spo2': VitalMetric.OXYGEN_SATURATION,
+    'o2_sat': VitalMetric.OXYGEN_SATURATION,
+    'oxygen_saturation': VitalMetric.OXYGEN_SATURATION,
+    'weight': VitalMetric.WEIGHT,
+    'wt': VitalMetric.WEIGHT,
+    'glucose': VitalMetric.BLOOD_GLUCOSE,
+    'blood_glucose': VitalMetric.BLOOD_GLUCOSE,
+    'bg': VitalMetric.BLOOD_GLUCOSE,
+    'pain': VitalMetric.PAIN,
+    'pain_score': VitalMetric.PAIN,
+    'systolic': VitalMetric.BP_SYSTOLIC,
+    'diastolic': VitalMetric.BP_DIASTOLIC,
+}
+BLOOD_PRESSURE_KEYS = {'bp', 'blood_pressure'}
+
+NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
+BLOOD_PRESSURE_PATTERN = re.compile(r'(\d{2,3})\s*/\s*(\d{2,3})')
+
+ROLLUP_PERIODS = ('day', 'week')
+
+
+def parse_vitals(vital_signs: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """Turn a free-form vitals dict into (metric, value) pairs, skipping anything unparseable"""
+    readings = []
+    if not isinstance(vital_signs, dict):
+        return readings
+
+    for key, raw in vital_signs.items():
+        key = str(key).strip().lower().replace(' ', '_')
+        if key in BLOOD_PRESSURE_KEYS:
+            match = BLOOD_PRESSURE_PATTERN.search(str(raw))
+            if match:
+                readings.append((VitalMetric.BP_SYSTOLIC, float(match.group(1))))
+                readings.append((VitalMetric.BP_DIASTOLIC, float(match.group(2))))
+            continue
+
+        metric = METRIC_ALIASES.get(key)
+        if metric is None:
+            continue
+        if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+            readings.append((metric, float(raw)))
+            continue
+        match = NUMBER_PATTERN.search(str(raw))
+        if match:
+            readings.append((metric, float(match.group())))
+    return readings
+
+
+def period_start(recorded_at, period: str):
+    day = timezone.localtime(recorded_at).date() if timezone.is_aware(recorded_at) else recorded_at.date()
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def period_bounds(start, period: str):
+    """Aware datetime range covering a rollup bucket"""
+    length = timedelta(days=7 if period == 'week' else 1)
+    tz = timezone.get_current_timezone()
+    lower = timezone.make_aware(datetime.combine(start, time.min), tz)
+    return lower, lower + length
+
+
+def refresh_rollups(buckets: Iterable[Tuple[int, str, str, Any]]) -> None:
+    """Recompute (patient_id, metric, period, period_start) buckets from raw readings"""
+    for patient_id, metric, period, start in set(buckets):
+        lower, upper = period_bounds(start, period)
+        stats = VitalSign.objects.filter(
+            patient_id=patient_id, metric=metric, recorded_at__gte=lower, recorded_at__lt=upper
+        ).aggregate(count=Count('id'), min_value=Min('value'), max_value=Max('value'), mean_value=Avg('value'))
+
+        if not stats['count']:
+            VitalSignRollup.objects.filter(
+                patient_id=patient_id, metric=metric, period=period, period_start=start
+            ).delete()
+            continue
+        VitalSignRollup.objects.update_or_create(
+            patient_id=patient_id, metric=metric, period=period, period_start=start, defaults=stats
+        )
+
+
+def _buckets(readings: Iterable[VitalSign]):
+    for reading in readings:
+        for period in ROLLUP_PERIODS:
+            yield reading.patient_id, reading.metric, period, period_start(reading.recorded_at, period)
+
+
+def replace_readings(existing, patient_id: int, recorded_at, parsed: List[Tuple[str, float]], **source) -> int:
+    """Swap the readings for one source (a visit or a file) and refresh affected rollups"""
+    with transaction.atomic():
+        stale = list(existing.only('patient_id', 'metric', 'recorded_at'))
+        existing.delete()
+        created = VitalSign.objects.bulk_create([
+            VitalSign(patient_id=patient_id, recorded_at=recorded_at, metric=metric, value=value, **source)
+            for metric, value in parsed
+        ])
+        refresh_rollups(list(_buckets(stale)) + list(_buckets(created)))
+    return len(created)
+
+
+def sync_visit_vitals(visit) -> int:
+    """Rebuild normalized readings from Visit.vital_signs"""
+    return replace_readings(
+        VitalSign.objects.filter(visit_id=visit.id),
+        visit.patient_id,
+        visit.start_time or visit.scheduled_date,
+        parse_vitals(visit.vital_signs),
+        visit_id=visit.id,
+    )
+
+
+def sync_file_vitals(uploaded_file, structured_data: Dict[str, Any]) -> int:
+    """Store readings that OCRProcessor extracted from an uploaded document"""
+    return replace_readings(
+        VitalSign.objects.filter(source_file_id=uploaded_file.id),
+        uploaded_file.patient_id,
+        uploaded_file.created_at or timezone.now(),
+        parse_vitals(structured_data),
+        source_file_id=uploaded_file.id,
+    )
+
+
+def pick_resolution(start, end) -> str:
+    """Choose raw points for short ranges and rollups for long ones"""
+    span = end - start
+    if span > timedelta(days=90):
+        return 'week'
+    if span > timedelta(days=14):
+        return 'day'
+    return 'raw'
+
+
+def vitals_series(patient_id: int, metrics: List[str], start, end, resolution: str) -> Dict[str, Dict[str, list]]:
+    """Return columnar series per metric for the chart endpoint"""
+    series = defaultdict(lambda: defaultdict(list))
+
+    if resolution == 'raw':
+        rows = VitalSign.objects.filter(
+            patient_id=patient_id, metric__in=metrics, recorded_at__gte=start, recorded_at__lte=end
+        ).order_by('metric', 'recorded_at').values_list('metric', 'recorded_at', 'value')
+        for metric, recorded_at, value in rows:
+            series[metric]['t'].append(recorded_at)
+            series[metric]['value'].append(value)
+        return series
+
+    rows = VitalSignRollup.objects.filter(
+        patient_id=patient_id, metric__in=metrics, period=resolution,
+        period_start__gte=period_start(start, resolution), period_start__lte=period_start(end, resolution)
+    ).order_by('metric', 'period_start').values_list(
+        'metric', 'period_start', 'count', 'min_value', 'max_value', 'mean_value'
+    )
+    for metric, start_date, count, min_value, max_value, mean_value in rows:
+        columns = series[metric]
+        columns['t'].append(start_date)
+        columns['count'].append(count)
+        columns['min'].append(min_value)
+        columns['max'].append(max_value)
+        columns['mean'].append(round(mean_value, 2))
+    return series
+
+
+def on_visit_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Keep normalized readings in step with Visit.vital_signs"""
+    if update_fields is not None and not set(instance.VITALS_SOURCE_FIELDS) & set(update_fields):
+        return
+    if created and not instance.vital_signs:
+        return
+    # Unknown (created, or loaded with a source field deferred) counts as changed
+    source = instance.vitals_source()
+    if getattr(instance, '_loaded_vitals_source', None) == source:
+        return
+    sync_visit_vitals(instance)
+    instance._loaded_vitals_source = source
@@ -0,0 +1,204 @@
+import json
+import threading
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.extraction import extract_note
+
+from .models import VisitNote, VoiceChunk, VoiceSession
+
+SENTENCE_ENDINGS = '.?!'
+# Accepted session formats; also the extension of each stored chunk
+AUDIO_FORMATS = ('pcm16', 'wav', 'webm', 'ogg', 'opus', 'mp3', 'flac', 'm4a')
+
+
+class TranscriptUpdate(NamedTuple):
+    final: str  # newly committed text
+    partial: str  # current uncommitted hypothesis
+
+
+class ChunkOutOfOrder(Exception):
+    """Raised when a chunk arrives ahead of the next expected sequence number"""
+
+    def __init__(self, expected):
+        super().__init__(f"Expected chunk {expected}")
+        self.expected = expected
+
+
+class SessionClosed(Exception):
+    """Raised when audio is sent to a session that is no longer recording"""
+
+
+class StubASR:
+    """
+    Offline stand-in recognizer. UTF-8 text chunks are treated as already
+    recognized speech, which lets clients and tests exercise the streaming
+    flow: text is committed a sentence at a time and the unfinished sentence
+    is reported as the partial. Binary audio only advances a duration counter.
+    """
+
+    def feed(self, session: VoiceSession, audio: bytes) -> TranscriptUpdate:
+        state = session.asr_state
+        try:
+            text = audio.decode('utf-8')
+        except UnicodeDecodeError:
+            text = ''
+            state['audio_seconds'] = state.get('audio_seconds', 0) + len(audio) / (session.sample_rate * 2)
+
+        pending = state.get('pending', '') + text
+        cut = max(pending.rfind(mark) for mark in SENTENCE_ENDINGS) + 1
+        final, state['pending'] = pending[:cut].strip(), pending[cut:]
+        partial = state['pending'].strip()
+        if not partial and state.get('audio_seconds'):
+            partial = f"[{state['audio_seconds']:.1f}s of audio received]"
+        return TranscriptUpdate(final, partial)
+
+    def finish(self, session: VoiceSession) -> TranscriptUpdate:
+        return TranscriptUpdate(session.asr_state.pop('pending', '').strip(), '')
+
+
+class VoskASR:
+    """
+    Offline recognition with Vosk (pip install vosk, VOICE_VOSK_MODEL_PATH
+    pointing at a downloaded model). Expects 16-bit mono PCM. Recognizers
+    are kept in process memory, so a session's chunks must reach the same
+    worker (sticky sessions or a single ASR worker).
+    """
+    _model = None
+    _recognizers = {}
+    _lock = threading.Lock()
+
+    def __init__(self):
+        try:
+            import vosk
+        except ImportError:
+            raise ImproperlyConfigured("VoskASR requires the 'vosk' package")
+        with self._lock:
+            if VoskASR._model is None:
+                VoskASR._model = vosk.Model(settings.VOICE_VOSK_MODEL_PATH)
+        self._vosk = vosk
+
+    def _recognizer(self, session: VoiceSession):
+        with self._lock:
+            if session.id not in self._recognizers:
+                self._recognizers[session.id] = self._vosk.KaldiRecognizer(self._model, session.sample_rate)
+            return self._recognizers[session.id]
+
+    def feed(self, session: VoiceSession, audio: bytes) -> TranscriptUpdate:
+        recognizer = self._recognizer(session)
+        if recognizer.AcceptWaveform(audio):
+            return TranscriptUpdate(json.loads(recognizer.Result()).get('text', ''), '')
+        return TranscriptUpdate('', json.loads(recognizer.PartialResult()).get('partial', ''))
+
+    def finish(self, session: VoiceSession) -> TranscriptUpdate:
+        with self._lock:
+            recognizer = self._recognizers.pop(session.id, None)
+        if recognizer is None:
+            return TranscriptUpdate('', '')
+        return TranscriptUpdate(json.loads(recognizer.FinalResult()).get('text', ''), '')
+
+
+def get_asr_backend():
+    return import_string(getattr(settings, 'VOICE_ASR_BACKEND', 'visits.voice.StubASR'))()
+
+
+def _join(*parts: str) -> str:
+    return ' '.join(part for part in parts if part)
+
+
+def start_session(visit, user, audio_format: str = 'pcm16', sample_rate: int = 16000) -> VoiceSession:
+    return VoiceSession.objects.create(
+        visit=visit, created_by=user, audio_format=audio_format, sample_rate=sample_rate
+    )
+
+
+def append_chunk(session_id, sequence: int, audio: bytes):
+    """
+    Transcribe the next chunk of a session and return (session, chunk).
+    Re-sending an already accepted sequence number returns the stored
+    result instead of feeding the audio twice, so clients can retry freely.
+    """
+    stored_audio = []
+    try:
+        return _append_chunk(session_id, sequence, audio, stored_audio)
+    except BaseException:
+        # Storage isn't transactional: drop audio written by the rolled-back attempt
+        for field in stored_audio:
+            field.delete(save=False)
+        raise
+
+
+def _append_chunk(session_id, sequence: int, audio: bytes, stored_audio: list):
+    with transaction.atomic():
+        session = VoiceSession.objects.select_for_update().get(id=session_id)
+        if sequence < session.next_sequence:
+            return session, session.chunks.get(sequence=sequence)
+        if session.status != 'recording':
+            raise SessionClosed("Voice session is not recording")
+        if sequence > session.next_sequence:
+            raise ChunkOutOfOrder(session.next_sequence)
+
+        update = get_asr_backend().feed(session, audio)
+        session.transcript = _join(session.transcript, update.final)
+        session.partial_transcript = update.partial
+        session.next_sequence += 1
+
+        chunk = VoiceChunk(
+            session=session, sequence=sequence, byte_size=len(audio),
+            final_text=update.final, partial_text=update.partial,
+        )
+        if getattr(settings, 'VOICE_STORE_AUDIO', True):
+            chunk.audio.save(f'{sequence:06d}.{session.audio_format}', ContentFile(audio), save=False)
+            stored_audio.append(chunk.audio)
+        chunk.save()
+        session.save(update_fields=[
+            'transcript', 'partial_transcript', 'asr_state', 'next_sequence', 'updated_at'
+        ])
+    return session, chunk
+
+
+def finalize_session(session_id, user, title: Optional[str] = None) -> VoiceSession:
+    """Flush the recognizer and store the transcript as a voice_transcript VisitNote"""
+    with transaction.atomic():
+        session = VoiceSession.objects.select_for_update().select_related('note').get(id=session_id)
+        if session.status == 'finalized':
+            return session
+        if session.status != 'recording':
+            raise SessionClosed("Voice session is not recording")
+
+        update = get_asr_backend().finish(session)
+        session.transcript = _join(session.transcript, update.final)
+        session.partial_transcript = ''
+        session.status = 'finalized'
+        session.note = VisitNote.objects.create(
+            visit_id=session.visit_id,
+            note_type='voice_transcript',
+            title=title or f"Voice transcript {timezone.localtime():%Y-%m-%d %H:%M}",
+            content=session.transcript,
+            structured_data={
+                **extract_note(session.transcript),
+                'voice_session': str(session.id),
+                'chunks': session.next_sequence,
+            },
+            created_by=user,
+        )
+        session.save(update_fields=['transcript', 'partial_transcript', 'status', 'note', 'asr_state', 'updated_at'])
+    return session
+
+
+def session_payload(session: VoiceSession) -> dict:
+    return {
+        'session_id': session.id,
+        'visit_id': session.visit_id,
+        'status': session.status,
+        'next_sequence': session.next_sequence,
+        'transcript': session.transcript,
+        'partial_transcript': session.partial_transcript,
+        'note_id': session.note_id,
+    }